@@ -1,5 +1,6 @@
 import streamlit as st
 import sys
+import importlib
 from pathlib import Path
 
 # --- 경로 설정: gayoung 폴더의 모듈을 인식하도록 ---
@@ -13,17 +14,27 @@ except Exception as e:
 st.set_page_config(page_title="🛡️ SRM & SCM 통합 관리 시스템", layout="wide")
 
 # -----------------------------
-# 🔹 페이지 모듈 import
+# 🔹 페이지 레지스트리 (지연 로딩)
 # -----------------------------
-from mypages.p1_plan import page1
-from mypages.p2_purchase import page2
-from mypages.p3_customs import page3
-from mypages.p4_logistics import page4
-from mypages.p5_quality import page5
-from mypages.p6_finance import page6
-from mypages.p7_inventory import page7
-# page8 대신 p8_agent_main 함수를 임포트합니다.
-from mypages.p8_agent import p8_agent_main
+# 페이지 모듈과 무거운 라이브러리(shap, plotly, openai 등)는
+# 해당 메뉴가 선택되었을 때만 import 합니다.
+PAGE_REGISTRY = {
+    "1.": ("mypages.p1_plan", "page1"),
+    "2.": ("mypages.p2_purchase", "page2"),
+    "3.": ("mypages.p3_customs", "page3"),
+    "4.": ("mypages.p4_logistics", "page4"),
+    "5.": ("mypages.p5_quality", "page5"),
+    "6.": ("mypages.p6_finance", "page6"),
+    "7.": ("mypages.p7_inventory", "page7"),
+    # page8 대신 p8_agent_main 함수를 사용합니다.
+    "8.": ("mypages.p8_agent", "p8_agent_main"),
+}
+
+def load_page(menu_key):
+    """선택된 메뉴의 페이지 함수를 처음 사용할 때 import 하여 반환합니다."""
+    module_name, func_name = PAGE_REGISTRY[menu_key]
+    module = importlib.import_module(module_name)
+    return getattr(module, func_name)
 
 # -----------------------------
 # 🔹 사이드바 메뉴
@@ -52,30 +63,15 @@ menu = menu_options[selected_page_title]
 # -----------------------------
 # 🔹 선택된 페이지 실행
 # -----------------------------
-if menu.startswith("1."):
-    page1()
-
-elif menu.startswith("2."):
-    page2()
-
-elif menu.startswith("3."):
-    page3()
-
-elif menu.startswith("4."):
-    page4()
-
-elif menu.startswith("5."):
-    page5()
-
-elif menu.startswith("6."):
-    page6()
-
-elif menu.startswith("7."):
-    page7()
+if not menu.startswith("8."):
+    load_page(menu)()
 
 # 8번 메뉴 선택 시, 새로운 챗봇 인터페이스를 실행합니다.
-elif menu.startswith("8."):
+else:
     st.title("8. 🤖 AI 의사결정 에이전트")
+    if st.sidebar.button("🔄 에이전트 결과 캐시 초기화", help="이전 질문에서 계산된 에이전트 결과를 버리고 다음 질문에서 모두 다시 실행합니다."):
+        importlib.import_module("mypages.agent_cache").invalidate()
+        st.sidebar.success("에이전트 결과 캐시를 비웠습니다.")
     st.caption("p1~p7 페이지들의 데이터를 종합하여 AI가 의사결정을 돕습니다. '재고 분석해줘'와 같이 자연어로 질문하세요.")
     st.markdown("---")
 
@@ -99,6 +95,7 @@ elif menu.startswith("8."):
         with st.chat_message("assistant"):
             # p8_agent_main 함수는 내부적으로 st.markdown을 사용하여 결과를 출력합니다.
             # 이 함수의 출력을 별도 변수에 저장할 필요 없이 그냥 호출하면 됩니다.
+            p8_agent_main = load_page("8.")
             p8_agent_main(prompt)
             
             # AI의 실제 응답은 p8_agent_main 함수 안에서 st.markdown으로 화면에 그려집니다.
@@ -1,10 +1,14 @@
 # /Users/gwongayoung/캡디 팀플/니켈_캡스톤/gayoung/inventory_manager.py
 
 import os
-import pandas as pd
-from datetime import datetime
+import math
+import threading
+from datetime import date
 from dotenv import load_dotenv
-from openai import OpenAI
+from mypages.llm_gateway import get_gateway
+from gayoung.inventory_store import InventoryStore
+from mypages import stockout_risk
+from mypages.stockout_risk import DEMAND_HISTORY_DAYS
 
 # --- 1. 환경 설정 및 상수 ---
 # .env 파일 로드를 위해 프로젝트 루트 경로를 기준으로 설정
@@ -16,132 +20,223 @@ except Exception:
     project_root = os.getcwd() # Fallback
 
 API_KEY = os.getenv("OPENAI_API_KEY")
-client = OpenAI(api_key=API_KEY) if API_KEY else None
 
-# DB 파일 경로를 프로젝트 루트의 'data' 폴더로 변경
-DB_FILE = os.path.join(project_root, 'data', 'inventory_db.csv')
+def get_client():
+    """공유 LLM 게이트웨이를 반환합니다. (키가 없으면 None)"""
+    gateway = get_gateway()
+    return gateway if gateway.configured else None
+
+# 재고 원장은 P5(입고), P7(투입/발주 제안), P8(run_p7_inventory)이 모두 이 파일 하나를 사용합니다.
+STORE_FILE = os.path.join(project_root, 'data', 'inventory.sqlite3')
+# 예전 CSV 원장 (DB가 비어 있을 때 한 번만 가져옴. P5/P7 원장이 둘 다 있으면 날짜순 병합 + FIFO 재계산)
+LEGACY_CSV_FILES = [
+    os.path.join(project_root, 'data', 'inventory_db.csv'),
+    os.path.join(project_root, 'mypages', 'inventory_db.csv'),
+]
 COLUMNS = ['날짜', '구분', '품목', '수량', '내용', 'Lot_No', '잔여수량']
 ITEM_NAME = '니켈' # 관리 품목명 고정
+LEAD_TIME, SAFETY_STOCK_DAYS = 14, 7
+SERVICE_LEVEL_Z = 1.65  # 서비스 수준 95%
+
+# --- 2. 재고 서비스 ---
+
+class InventoryService:
+    """
+    재고 원장 서비스 (프로세스당 하나).
+    저장소 핸들 하나를 공유하고, 조회 결과는 원장이 바뀌기 전까지 메모리에 캐시합니다.
+    - 이 서비스를 통한 기록은 즉시 캐시를 비웁니다.
+    - 다른 프로세스의 기록은 DB/WAL 파일 버전(수정 시각, 크기)이 바뀐 것으로 감지합니다.
+    """
+
+    def __init__(self, store_path=STORE_FILE, legacy_csv_files=LEGACY_CSV_FILES):
+        self.store_path = store_path
+        self.legacy_csv_files = legacy_csv_files
+        self._lock = threading.RLock()
+        self._store = None
+        self._cache = {}
+        self._cache_version = None
+
+    @property
+    def store(self):
+        with self._lock:
+            if self._store is None:
+                legacy_csv = [p for p in self.legacy_csv_files if os.path.exists(p)]
+                self._store = InventoryStore(self.store_path, csv_path=legacy_csv)
+            return self._store
+
+    def _version(self):
+        versions = []
+        for path in (self.store_path, f"{self.store_path}-wal"):
+            try:
+                stat = os.stat(path)
+                versions.append((stat.st_mtime_ns, stat.st_size))
+            except OSError:
+                versions.append(None)
+        return tuple(versions)
+
+    def _cached(self, key, compute):
+        with self._lock:
+            version = self._version()
+            if version != self._cache_version:
+                self._cache.clear()
+                self._cache_version = version
+            if key not in self._cache:
+                self._cache[key] = compute()
+            return self._cache[key]
+
+    def invalidate(self):
+        with self._lock:
+            self._cache.clear()
+            self._cache_version = None
+
+    # --- 조회 ---
+    def ledger(self):
+        return self._cached('ledger', self.store.to_frame).copy()
+
+    def real_inventory(self):
+        return self._cached('real_inventory', lambda: int(self.store.total_remaining()))
+
+    def detailed_stock(self):
+        return self._cached('detailed_stock', self.store.open_lots).copy()
+
+    def usage_stats(self):
+        today = date.today()
+        return dict(self._cached(('usage_stats', today), lambda: self.store.usage_stats(ITEM_NAME, as_of=today)))
+
+    def migration_notes(self):
+        return list(self._cached('migration_notes', self.store.migration_notes))
+
+    def usage_history(self, days):
+        today = date.today()
+        return list(self._cached(('usage_history', today, days),
+                                 lambda: self.store.daily_usage_series(ITEM_NAME, days, as_of=today)))
+
+    # --- 기록 ---
+    def inbound(self, date_str, supplier, qty, lot_no):
+        with self._lock:
+            try:
+                self.store.post_inbound(date_str, ITEM_NAME, qty, supplier, lot_no)
+            finally:
+                self.invalidate()
+
+    def production_input(self, date_str, qty_to_use):
+        with self._lock:
+            try:
+                return self.store.post_production(date_str, ITEM_NAME, qty_to_use)
+            finally:
+                self.invalidate()
+
+
+_service = None
+_service_lock = threading.Lock()
+
+def get_service():
+    """프로세스 공유 InventoryService를 반환합니다."""
+    global _service
+    if _service is None:
+        with _service_lock:
+            if _service is None:
+                _service = InventoryService()
+    return _service
 
-# --- 2. 데이터베이스 관리 함수 ---
+# --- 3. 데이터베이스 관리 함수 ---
 
 def load_or_create_inventory_db():
     """
-    재고 데이터베이스 파일을 로드하거나 새로 생성합니다.
-    파일이 이미 존재하지만 '잔여수량' 컬럼이 없는 경우, 컬럼을 추가하여 호환성을 유지합니다.
+    재고 원장 저장소(SQLite)를 열거나 새로 생성합니다.
+    기존 CSV 원장(LEGACY_CSV_FILES)이 있으면 처음 한 번만 가져옵니다. (여러 개면 날짜순 병합)
     """
-    if not os.path.exists(DB_FILE):
-        os.makedirs(os.path.dirname(DB_FILE), exist_ok=True)
-        pd.DataFrame(columns=COLUMNS).to_csv(DB_FILE, index=False, encoding='utf-8-sig')
-    else:
-        try:
-            df = pd.read_csv(DB_FILE)
-            if '잔여수량' not in df.columns:
-                df['잔여수량'] = 0
-                df.loc[df['구분'] == '입고', '잔여수량'] = df['수량']
-                df.to_csv(DB_FILE, index=False, encoding='utf-8-sig')
-        except (pd.errors.EmptyDataError, FileNotFoundError):
-             pd.DataFrame(columns=COLUMNS).to_csv(DB_FILE, index=False, encoding='utf-8-sig')
+    return get_service().store
 
+def get_migration_notes():
+    """예전 CSV 원장 병합 메모 목록 (P5/P7 원장을 함께 가져온 경우, 화면 경고용)."""
+    return get_service().migration_notes()
 
 def get_inventory_df():
-    """데이터베이스 파일을 읽어 DataFrame으로 반환합니다."""
-    load_or_create_inventory_db()
-    try:
-        return pd.read_csv(DB_FILE)
-    except (pd.errors.EmptyDataError, FileNotFoundError):
-        return pd.DataFrame(columns=COLUMNS)
-
-def save_inventory_df(df):
-    """데이터프레임을 CSV 파일에 덮어쓰기하여 저장합니다."""
-    df.to_csv(DB_FILE, index=False, encoding='utf-8-sig')
+    """원장 전체를 DataFrame으로 반환합니다."""
+    return get_service().ledger()
 
-# --- 3. 핵심 API 함수 ---
+# --- 4. 핵심 API 함수 ---
 
 def get_real_inventory():
     """
     '잔여수량'의 총합을 계산하여 현재 총 재고량을 반환합니다.
     """
-    df = get_inventory_df()
-    if df.empty:
-        return 0
-    return int(df['잔여수량'].sum())
+    return get_service().real_inventory()
 
 def get_detailed_stock():
     """
     현재 재고를 Lot별 상세 내역(잔여수량 > 0)으로 반환합니다.
     FIFO 순서(날짜 오름차순)로 정렬됩니다.
     """
-    df = get_inventory_df()
-    detailed_stock = df[(df['구분'] == '입고') & (df['잔여수량'] > 0)].sort_values(by='날짜', ascending=True)
-    return detailed_stock
+    return get_service().detailed_stock()
 
 def process_inbound(date, supplier, qty, lot_no):
     """
     품질 합격 시 호출되는 함수. DB에 '입고' 내역을 기록합니다.
     """
-    df = get_inventory_df()
-    new_record = {
-        '날짜': date.strftime('%Y-%m-%d'), '구분': '입고', '품목': ITEM_NAME,
-        '수량': qty, '내용': supplier, 'Lot_No': lot_no, '잔여수량': qty
-    }
-    df_new = pd.concat([df, pd.DataFrame([new_record])], ignore_index=True)
-    save_inventory_df(df_new)
+    get_service().inbound(date.strftime('%Y-%m-%d'), supplier, qty, lot_no)
     return "입고 완료"
 
 def process_production_input(date, qty_to_use):
     """
     생산 라인 투입 시 호출되는 함수. FIFO에 따라 재고를 차감하고 Lot 추적 정보를 기록합니다.
+    재고 확인, Lot 차감, 투입 기록은 하나의 트랜잭션으로 처리됩니다. (재고 부족 시 ValueError)
     """
-    current_inventory = get_real_inventory()
-    if current_inventory < qty_to_use:
-        raise ValueError(f"재고 부족: 현재 재고({current_inventory:,.0f}kg)보다 투입량({qty_to_use:,.0f}kg)이 많습니다.")
-    
-    df = get_inventory_df()
-    available_stock = df[(df['구분'] == '입고') & (df['잔여수량'] > 0)].sort_values(by='날짜', ascending=True)
-    
-    qty_needed = qty_to_use
-    used_lots_info = []
-    
-    for index, lot in available_stock.iterrows():
-        if qty_needed <= 0: break
-        amount_to_take = min(lot['잔여수량'], qty_needed)
-        df.loc[index, '잔여수량'] -= amount_to_take
-        qty_needed -= amount_to_take
-        used_lots_info.append(f"{lot['Lot_No']}({amount_to_take:g}kg)")
-
-    used_lots_str = ", ".join(used_lots_info)
-    description = f"생산 투입 (사용 Lot: {used_lots_str})"
-    
-    new_out_record = {
-        '날짜': date.strftime('%Y-%m-%d'), '구분': '투입', '품목': ITEM_NAME,
-        '수량': -qty_to_use, '내용': description, 'Lot_No': '-', '잔여수량': 0
-    }
-    df_new = pd.concat([df, pd.DataFrame([new_out_record])], ignore_index=True)
-    save_inventory_df(df_new)
+    get_service().production_input(date.strftime('%Y-%m-%d'), qty_to_use)
     return "투입 완료"
 
+def get_usage_stats():
+    """
+    최근 7/30/90일 일평균 소모량·표준편차와 EWMA를 반환합니다. (투입 기록 시 갱신되는 일별 시계열 기반)
+    """
+    return get_service().usage_stats()
+
+def get_usage_history(days=DEMAND_HISTORY_DAYS):
+    """
+    최근 days일의 일별 소모량 리스트를 반환합니다. (오래된 날부터, 소모가 없던 날은 0)
+    """
+    return get_service().usage_history(days)
+
 def get_weekly_average_usage():
     """
     최근 7일간의 평균 일일 투입량(소모량)을 계산합니다.
     """
-    df = get_inventory_df()
-    if df.empty: return 0
-    df['날짜'] = pd.to_datetime(df['날짜'])
-    seven_days_ago = datetime.now() - pd.Timedelta(days=7)
-    recent_inputs = df[(df['구분'] == '투입') & (df['날짜'] >= seven_days_ago)]
-    if recent_inputs.empty: return 0
-    total_usage = recent_inputs['수량'].sum() * -1
-    return total_usage / 7
+    return get_usage_stats()['avg_7']
 
-def get_purchase_recommendation():
+def get_purchase_recommendation(plan_values: dict = None):
     """
     평균 소모량과 현재고를 바탕으로 발주 필요 여부를 분석하고 제안합니다.
+    plan_values가 제공되면 시뮬레이션 값으로, 아니면 DB 값으로 분석합니다.
+    결정적 재주문점과 함께 몬테카를로 결품 확률(stockout_risk)을 계산합니다.
     """
-    avg_daily_usage = get_weekly_average_usage()
-    current_inventory = get_real_inventory()
-    LEAD_TIME, SAFETY_STOCK_DAYS = 14, 7
-    reorder_point = avg_daily_usage * (LEAD_TIME + SAFETY_STOCK_DAYS)
+    # plan_values가 있으면 시뮬레이션 값 사용, 없으면 DB에서 실제 값 조회
+    if plan_values and all(k in plan_values for k in ['current_stock', 'weekly_usage', 'safety_stock', 'lead_time']):
+        current_inventory = plan_values.get('current_stock', 0)
+        weekly_usage = plan_values.get('weekly_usage', 0)
+        safety_stock = plan_values.get('safety_stock', 0)
+        lead_time = plan_values.get('lead_time', 14)
+        avg_daily_usage = weekly_usage / 7 if weekly_usage > 0 else 0
+        usage_std, ewma_daily_usage = None, None
+        
+        # ROP 계산 = 안전재고 + 리드타임 동안의 사용량
+        reorder_point = safety_stock + (avg_daily_usage * lead_time)
+        # 소모 이력의 변동 모양은 유지하고 수준(일평균)과 리드타임은 계획값에 맞춤
+        risk = stockout_risk.assess_stockout_risk(current_inventory, get_usage_history(),
+                                                  mean_daily=avg_daily_usage, lead_time=lead_time)
+    else:
+        stats = get_usage_stats()
+        avg_daily_usage = stats['avg_7']
+        usage_std, ewma_daily_usage = stats['std_30'], stats['ewma']
+        current_inventory = get_real_inventory()
+        # 원본 로직에서는 safety_stock을 고정값으로 사용했으나, plan_values가 없을 경우 ROP 계산이 어려움
+        # 여기서는 DB 기반 분석 시 기본 리드타임과 안전재고 기간을 가정하고,
+        # 소모 변동이 크면 z·σ·√리드타임 만큼 안전재고를 늘림
+        safety_stock = max(avg_daily_usage * SAFETY_STOCK_DAYS, SERVICE_LEVEL_Z * usage_std * math.sqrt(LEAD_TIME))
+        reorder_point = avg_daily_usage * LEAD_TIME + safety_stock
+        # 소모 이력과 P4 선적 이력의 리드타임으로 결품 확률 평가
+        risk = stockout_risk.assess_stockout_risk(current_inventory, get_usage_history())
+
     is_needed = current_inventory < reorder_point
     shortage_qty = reorder_point - current_inventory
     
@@ -153,34 +248,47 @@ def get_purchase_recommendation():
         details = f"현재 재고({current_inventory:,.0f}kg)가 재주문점({reorder_point:,.0f}kg)보다 많습니다."
     
     return {
-        "avg_daily_usage": avg_daily_usage, "reorder_point": reorder_point,
+        "avg_daily_usage": avg_daily_usage, "usage_std": usage_std, "ewma_daily_usage": ewma_daily_usage,
+        "safety_stock": safety_stock, "reorder_point": reorder_point,
         "current_inventory": current_inventory, "is_needed": is_needed,
         "recommendation": recommendation, "details": details,
-        "shortage_qty": shortage_qty if is_needed else 0
+        "shortage_qty": shortage_qty if is_needed else 0,
+        "stockout_probability": risk['stockout_probability'],
+        "service_reorder_point": risk['service_reorder_point'],
+        "risk": risk,
     }
 
 def generate_purchase_request_email(recommendation_data):
     """
     RAG(검색 증강 생성)를 활용하여 구매팀에 보낼 발주 요청 메일 초안을 생성합니다.
+    모든 수량 단위는 톤(t)으로 변환하여 표시합니다.
     """
+    client = get_client()
     if not client:
         return "OpenAI API 키가 설정되지 않아 메일을 생성할 수 없습니다."
 
-    # RAG - 1. 검색(Retrieve) 단계: 메일에 필요한 데이터를 요약/정리합니다.
+    # Convert kg values from recommendation_data to tons for the email content
+    current_inventory_t = recommendation_data['current_inventory'] / 1000
+    reorder_point_t = recommendation_data['reorder_point'] / 1000
+    avg_daily_usage_t = recommendation_data['avg_daily_usage'] / 1000
+    shortage_t = recommendation_data['shortage_qty'] / 1000
+
+    # RAG - 1. 검색(Retrieve) 단계: 메일에 필요한 데이터를 톤 단위로 요약/정리합니다.
     context = f"""
     - 품목: {ITEM_NAME}
-    - 현재 재고량: {recommendation_data['current_inventory']:,.0f} kg
-    - 재주문점 (ROP): {recommendation_data['reorder_point']:,.0f} kg
-    - 최근 7일간 일 평균 소모량: {recommendation_data['avg_daily_usage']:,.1f} kg/일
-    - 재주문점 대비 부족 수량: {recommendation_data['shortage_qty']:,.0f} kg
+    - 현재 재고량: {current_inventory_t:,.2f} t
+    - 재주문점 (ROP): {reorder_point_t:,.2f} t
+    - 최근 7일간 일 평균 소모량: {avg_daily_usage_t:,.3f} t/일
+    - 재주문점 대비 부족 수량: {shortage_t:,.2f} t
     """
     
-    shortage = recommendation_data['shortage_qty']
-    suggested_order_qty = (shortage // 100 + 1) * 100 if shortage > 0 else 0
+    # Suggest order quantity in tons, rounding up to the nearest 0.1 ton
+    suggested_order_qty_t = math.ceil(shortage_t / 0.1) * 0.1 if shortage_t > 0 else 0
 
     # RAG - 2. 생성(Generate) 단계: 검색된 정보를 바탕으로 LLM에 메일 생성을 요청합니다.
     prompt = f"""
     당신은 제조 기업의 생산관리 담당자입니다. 아래의 재고 분석 데이터를 바탕으로, 구매팀에 보낼 원자재 발주 요청 메일을 공식적이고 정중한 톤으로 작성해주세요.
+    모든 단위는 톤(t)으로 작성해야 합니다.
 
     **재고 분석 데이터 (RAG 컨텍스트):**
     {context}
@@ -189,22 +297,22 @@ def generate_purchase_request_email(recommendation_data):
     1. 제목: '원자재 긴급 발주 요청 ({ITEM_NAME})' 와 같이 명확하게 작성하세요.
     2. 본문:
         - 발주가 필요한 이유를 재고 데이터에 근거하여 명확히 설명하세요 (현재고가 재주문점 하회).
-        - 제안 발주 수량은 {suggested_order_qty:,.0f} kg 로 명시하세요.
+        - 제안 발주 수량은 {suggested_order_qty_t:,.1f} t 으로 명시하세요.
         - 생산 차질이 발생하지 않도록 신속한 발주 진행을 요청하는 내용을 포함하세요.
     """
 
     try:
-        response = client.chat.completions.create(
-            model="gpt-3.5-turbo",
-            messages=[
-                {"role": "system", "content": "You are an expert assistant for writing professional business emails."},
+        return client.chat(
+            [
+                {"role": "system", "content": "You are an expert assistant for writing professional business emails in Korean."},
                 {"role": "user", "content": prompt}
             ],
+            model="gpt-3.5-turbo",
+            site="inventory.purchase_email",
             temperature=0.7,
         )
-        return response.choices[0].message.content
     except Exception as e:
         return f"OpenAI API 호출 중 오류가 발생했습니다: {e}"
 
 # 초기화
-load_or_create_inventory_db()
\ No newline at end of file
+load_or_create_inventory_db()
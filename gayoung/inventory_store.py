@@ -0,0 +1,389 @@
+# gayoung/inventory_store.py
+"""
+재고 원장(ledger) SQLite 저장소 (WAL 모드).
+
+기존 CSV 방식은 입고/투입 한 건마다 전체 파일을 읽고(pd.read_csv) 다시 쓰므로(to_csv)
+원장 크기에 비례하는 비용이 들고, 여러 Streamlit 세션이 동시에 쓰면 기록이 유실될 수 있습니다.
+
+- 입고: INSERT 한 건 (인덱스 갱신만, O(log n))
+- 투입: BEGIN IMMEDIATE 트랜잭션 안에서 (날짜, id) 순으로 열린 Lot만 인덱스로 한 번 읽고,
+        누적합 + searchsorted(allocate_fifo)로 차감량을 한 번에 계산해 기록
+- 현재고: 품목별 잔량(stock_balance)을 기록과 같은 트랜잭션에서 갱신하므로 조회는 O(1)
+- 열린 Lot: 잔여수량이 남은 입고 행만 (품목, 날짜, id) 순으로 담는 부분 인덱스(idx_ledger_open_lots_item)로
+            투입 시 해당 품목의 열린 Lot만 O(열린 Lot 수) 조회
+- 소모 통계: 일별 투입량(daily_usage)에 누적합/제곱 누적합을 함께 저장하고 EWMA(usage_ewma)를 갱신하므로
+            7/30/90일 평균·표준편차와 EWMA는 이력을 훑지 않고 인덱스 조회 몇 번으로 계산
+- 기존 CSV 원장은 DB가 비어 있을 때 한 번만 가져옵니다. (meta 테이블에 기록)
+  P5(data/)와 P7(mypages/) 원장이 둘 다 있으면 날짜순으로 병합하고 FIFO 잔량을 다시 계산합니다.
+
+DataFrame으로 내보낼 때는 기존 CSV와 같은 컬럼명(COLUMNS)을 사용합니다.
+"""
+import os
+import csv
+import sqlite3
+import math
+import threading
+from datetime import date
+from contextlib import contextmanager
+import numpy as np
+
+COLUMNS = ['날짜', '구분', '품목', '수량', '내용', 'Lot_No', '잔여수량']
+KIND_INBOUND, KIND_INPUT = '입고', '투입'
+USAGE_WINDOWS = (7, 30, 90)
+EWMA_SPAN = 14
+EWMA_ALPHA = 2 / (EWMA_SPAN + 1)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS ledger (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    date TEXT NOT NULL,
+    kind TEXT NOT NULL,
+    item TEXT NOT NULL,
+    qty REAL NOT NULL,
+    memo TEXT,
+    lot_no TEXT,
+    remaining REAL NOT NULL DEFAULT 0
+);
+CREATE INDEX IF NOT EXISTS idx_ledger_kind_date ON ledger(kind, date, id);
+CREATE INDEX IF NOT EXISTS idx_ledger_lot_no ON ledger(lot_no);
+DROP INDEX IF EXISTS idx_ledger_open_lots;
+CREATE INDEX IF NOT EXISTS idx_ledger_open_lots_item ON ledger(item, date, id) WHERE kind = '입고' AND remaining > 0;
+CREATE TABLE IF NOT EXISTS stock_balance (
+    item TEXT PRIMARY KEY,
+    on_hand REAL NOT NULL DEFAULT 0
+);
+CREATE TABLE IF NOT EXISTS daily_usage (
+    item TEXT NOT NULL,
+    day INTEGER NOT NULL,
+    qty REAL NOT NULL,
+    cum_qty REAL NOT NULL,
+    cum_sq REAL NOT NULL,
+    PRIMARY KEY (item, day)
+);
+CREATE TABLE IF NOT EXISTS usage_ewma (
+    item TEXT PRIMARY KEY,
+    ref_day INTEGER NOT NULL,
+    value REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT
+);
+"""
+_SELECT = "SELECT date, kind, item, qty, memo, lot_no, remaining FROM ledger"
+# 부분 인덱스(idx_ledger_open_lots_item)를 타려면 WHERE 조건이 인덱스 정의와 같은 리터럴이어야 합니다.
+_OPEN_LOTS = f"WHERE kind = '{KIND_INBOUND}' AND remaining > 0"
+
+
+def _day(date_str):
+    """'YYYY-MM-DD' → 일 단위 정수(ordinal)"""
+    return date.fromisoformat(str(date_str)[:10]).toordinal()
+
+
+def allocate_fifo(remaining, qty):
+    """
+    FIFO 순서로 정렬된 Lot 잔여수량 배열에서 qty만큼 차감할 양을 계산합니다.
+    누적합에서 qty에 처음 도달하는 Lot(searchsorted)까지 전량 차감하고, 마지막 Lot만 일부 차감합니다.
+    반환값은 앞쪽 Lot부터의 차감량 배열입니다. (길이 = 사용한 Lot 수, 재고가 부족하면 ValueError)
+    """
+    remaining = np.asarray(remaining, dtype=float)
+    if qty <= 0:
+        return remaining[:0]
+    cumulative = np.cumsum(remaining)
+    total = cumulative[-1] if len(cumulative) else 0.0
+    if total < qty:
+        raise ValueError(f"재고 부족: 현재 재고({total:,.0f}kg)보다 투입량({qty:,.0f}kg)이 많습니다.")
+    cut = int(np.searchsorted(cumulative, qty, side='left'))
+    takes = remaining[:cut + 1].copy()
+    takes[cut] = qty - (cumulative[cut - 1] if cut > 0 else 0.0)
+    return takes
+
+
+class InventoryStore:
+    """재고 원장 SQLite 저장소. 호출마다 짧은 연결을 열어 스레드/세션 간에 안전하게 사용합니다."""
+
+    def __init__(self, db_path, csv_path=None):
+        """csv_path: 처음 한 번 가져올 예전 CSV 원장 경로 (하나 또는 여러 개)"""
+        self.db_path = db_path
+        self._init_lock = threading.Lock()
+        os.makedirs(os.path.dirname(db_path) or '.', exist_ok=True)
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.executescript(_SCHEMA)
+        with self.transaction() as conn:
+            if not conn.execute("SELECT 1 FROM meta WHERE key = 'balance_built'").fetchone():
+                self._rebuild_balance(conn)
+            if not conn.execute("SELECT 1 FROM meta WHERE key = 'usage_built'").fetchone():
+                self._rebuild_usage(conn)
+        if csv_path:
+            self.migrate_from_csv(csv_path)
+
+    def _connect(self):
+        conn = sqlite3.connect(self.db_path, timeout=30, isolation_level=None)
+        conn.execute("PRAGMA synchronous=NORMAL")
+        return conn
+
+    @contextmanager
+    def transaction(self):
+        """쓰기 잠금을 먼저 잡는 트랜잭션 (BEGIN IMMEDIATE). 예외가 나면 롤백합니다."""
+        conn = self._connect()
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            yield conn
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        finally:
+            conn.close()
+
+    @contextmanager
+    def reader(self):
+        conn = self._connect()
+        try:
+            yield conn
+        finally:
+            conn.close()
+
+    @staticmethod
+    def _rebuild_balance(conn):
+        """원장에서 품목별 잔량을 다시 계산합니다. (잔량 테이블이 없던 DB 또는 마이그레이션 직후 한 번)"""
+        conn.execute("DELETE FROM stock_balance")
+        conn.execute("INSERT INTO stock_balance (item, on_hand) SELECT item, SUM(remaining) FROM ledger WHERE kind = ? GROUP BY item",
+                     (KIND_INBOUND,))
+        conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES ('balance_built', '1')")
+
+    @staticmethod
+    def _add_balance(conn, item, delta):
+        conn.execute("INSERT INTO stock_balance (item, on_hand) VALUES (?, ?) "
+                     "ON CONFLICT(item) DO UPDATE SET on_hand = on_hand + excluded.on_hand", (item, delta))
+
+    @classmethod
+    def _rebuild_usage(cls, conn):
+        """원장의 투입 기록으로 일별 소모 시계열과 EWMA를 다시 만듭니다."""
+        conn.execute("DELETE FROM daily_usage")
+        conn.execute("DELETE FROM usage_ewma")
+        rows = conn.execute("SELECT item, date, -SUM(qty) FROM ledger WHERE kind = ? GROUP BY item, date ORDER BY item, date",
+                            (KIND_INPUT,)).fetchall()
+        for item, date_str, qty in rows:
+            cls._record_usage(conn, item, _day(date_str), qty)
+        conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES ('usage_built', '1')")
+
+    @staticmethod
+    def _record_usage(conn, item, day, qty):
+        """
+        day의 소모량에 qty를 더하고 누적합/제곱 누적합과 EWMA를 갱신합니다.
+        보통은 가장 최근 날짜에 기록되므로 한 행만 바뀌고, 과거 날짜로 기록하면 그 이후 행의 누적값도 함께 조정합니다.
+        """
+        row = conn.execute("SELECT qty FROM daily_usage WHERE item = ? AND day = ?", (item, day)).fetchone()
+        old_qty = row[0] if row else 0.0
+        new_qty = old_qty + qty
+        delta_sq = new_qty ** 2 - old_qty ** 2
+        if row:
+            conn.execute("UPDATE daily_usage SET qty = ?, cum_qty = cum_qty + ?, cum_sq = cum_sq + ? WHERE item = ? AND day = ?",
+                         (new_qty, qty, delta_sq, item, day))
+        else:
+            prev = conn.execute("SELECT cum_qty, cum_sq FROM daily_usage WHERE item = ? AND day < ? ORDER BY day DESC LIMIT 1",
+                                (item, day)).fetchone() or (0.0, 0.0)
+            conn.execute("INSERT INTO daily_usage (item, day, qty, cum_qty, cum_sq) VALUES (?, ?, ?, ?, ?)",
+                         (item, day, new_qty, prev[0] + qty, prev[1] + delta_sq))
+        conn.execute("UPDATE daily_usage SET cum_qty = cum_qty + ?, cum_sq = cum_sq + ? WHERE item = ? AND day > ?",
+                     (qty, delta_sq, item, day))
+
+        # EWMA는 일별 소모량에 대해 선형이므로, day의 기여분 α·qty를 기준일까지 (1-α)^경과일 만큼 감쇠해 더합니다.
+        ewma = conn.execute("SELECT ref_day, value FROM usage_ewma WHERE item = ?", (item,)).fetchone()
+        if ewma is None:
+            ref_day, value = day, EWMA_ALPHA * qty
+        elif day >= ewma[0]:
+            ref_day, value = day, ewma[1] * (1 - EWMA_ALPHA) ** (day - ewma[0]) + EWMA_ALPHA * qty
+        else:
+            ref_day, value = ewma[0], ewma[1] + EWMA_ALPHA * qty * (1 - EWMA_ALPHA) ** (ewma[0] - day)
+        conn.execute("INSERT OR REPLACE INTO usage_ewma (item, ref_day, value) VALUES (?, ?, ?)", (item, ref_day, value))
+
+    # --- 마이그레이션 ---
+    @staticmethod
+    def _read_csv_rows(csv_path):
+        rows = []
+        with open(csv_path, 'r', encoding='utf-8-sig', newline='') as f:
+            for rec in csv.DictReader(f):
+                if not rec.get('날짜'):
+                    continue
+                qty = float(rec.get('수량') or 0)
+                remaining = rec.get('잔여수량')
+                # '잔여수량' 컬럼이 없던 예전 원장은 입고 수량을 잔여수량으로 간주
+                remaining = float(remaining) if remaining not in (None, '') else (qty if rec.get('구분') == KIND_INBOUND else 0.0)
+                rows.append((str(rec['날짜'])[:10], rec.get('구분'), rec.get('품목'), qty,
+                             rec.get('내용'), rec.get('Lot_No'), remaining))
+        return rows
+
+    @classmethod
+    def _merge_csv_ledgers(cls, csv_paths):
+        """
+        여러 CSV 원장을 날짜순으로 합치고 FIFO 잔량을 처음부터 다시 계산합니다. (파일별 잔여수량은 서로 맞지 않으므로 무시)
+        같은 날짜는 입고를 투입보다 먼저, 그 안에서는 파일/행 순서를 유지합니다.
+        파일 사이에 똑같은 입고(날짜, 품목, 수량, Lot)는 한 번만 넣습니다. 반환: (행 목록, 병합 메모 목록)
+        """
+        entries = []
+        for file_no, path in enumerate(csv_paths):
+            for row_no, row in enumerate(cls._read_csv_rows(path)):
+                entries.append(((row[0], 0 if row[1] == KIND_INBOUND else 1, file_no, row_no), row))
+        entries.sort(key=lambda entry: entry[0])
+
+        rows, open_lots, seen_inbound = [], {}, set()
+        duplicates, shortfall = 0, 0.0
+        for _, (day, kind, item, qty, memo, lot_no, _) in entries:
+            if kind == KIND_INBOUND:
+                if (day, item, qty, lot_no) in seen_inbound:
+                    duplicates += 1
+                    continue
+                seen_inbound.add((day, item, qty, lot_no))
+                rows.append([day, kind, item, qty, memo, lot_no, qty])
+                open_lots.setdefault(item, []).append(len(rows) - 1)
+                continue
+            rows.append([day, kind, item, qty, memo, lot_no, 0.0])
+            if kind != KIND_INPUT:
+                continue
+            lots = [i for i in open_lots.get(item, []) if rows[i][6] > 0]
+            available = sum(rows[i][6] for i in lots)
+            take = min(abs(qty), available)
+            shortfall += abs(qty) - take
+            for i, amount in zip(lots, allocate_fifo([rows[i][6] for i in lots], take)):
+                rows[i][6] -= float(amount)
+
+        notes = [f"재고 원장 CSV {len(csv_paths)}개({', '.join(csv_paths)})를 날짜순으로 병합하고 FIFO 잔여수량을 다시 계산했습니다."]
+        if duplicates:
+            notes.append(f"파일 간 중복 입고 {duplicates}건은 한 번만 반영했습니다.")
+        if shortfall > 0:
+            notes.append(f"병합 후 입고보다 많은 투입 {shortfall:,.0f}kg은 차감할 Lot이 없어 잔여수량에 반영하지 못했습니다. 원장을 확인하세요.")
+        return [tuple(row) for row in rows], notes
+
+    def migrate_from_csv(self, csv_paths):
+        """
+        DB가 비어 있고 아직 가져온 적이 없으면 CSV 원장을 한 번만 가져옵니다. 가져온 행 수를 반환합니다.
+        csv_paths: 경로 하나 또는 여러 개. 여러 파일이 있으면 날짜순으로 병합하고 FIFO를 다시 계산하며,
+        병합 내용은 meta('csv_migration_notes')에 남깁니다. (migration_notes()로 조회)
+        """
+        paths = [csv_paths] if isinstance(csv_paths, str) else list(csv_paths or [])
+        paths = [p for p in paths if p and os.path.exists(p)]
+        if not paths:
+            return 0
+        with self._init_lock, self.transaction() as conn:
+            if conn.execute("SELECT 1 FROM meta WHERE key = 'csv_migrated'").fetchone():
+                return 0
+            label = os.pathsep.join(paths)
+            if conn.execute("SELECT 1 FROM ledger LIMIT 1").fetchone():
+                conn.execute("INSERT INTO meta (key, value) VALUES ('csv_migrated', ?)", (label,))
+                return 0
+            if len(paths) == 1:
+                rows, notes = self._read_csv_rows(paths[0]), []
+            else:
+                rows, notes = self._merge_csv_ledgers(paths)
+            conn.executemany("INSERT INTO ledger (date, kind, item, qty, memo, lot_no, remaining) VALUES (?, ?, ?, ?, ?, ?, ?)", rows)
+            conn.execute("INSERT INTO meta (key, value) VALUES ('csv_migrated', ?)", (label,))
+            if notes:
+                conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES ('csv_migration_notes', ?)", ("\n".join(notes),))
+            self._rebuild_balance(conn)
+            self._rebuild_usage(conn)
+            return len(rows)
+
+    def migration_notes(self):
+        """CSV 원장 병합 시 남긴 메모 목록. (병합하지 않았으면 빈 리스트)"""
+        with self.reader() as conn:
+            row = conn.execute("SELECT value FROM meta WHERE key = 'csv_migration_notes'").fetchone()
+        return row[0].split("\n") if row and row[0] else []
+
+    # --- 조회 ---
+    @staticmethod
+    def _frame(rows):
+        import pandas as pd
+        return pd.DataFrame(rows, columns=COLUMNS)
+
+    def to_frame(self):
+        """원장 전체를 기록 순서대로 DataFrame(COLUMNS)으로 반환합니다."""
+        with self.reader() as conn:
+            return self._frame(conn.execute(f"{_SELECT} ORDER BY id").fetchall())
+
+    def open_lots(self, item=None):
+        """잔여수량이 남은 입고 Lot을 FIFO 순서(날짜, 기록 순)로 반환합니다. item을 주면 해당 품목만."""
+        with self.reader() as conn:
+            if item is None:
+                rows = conn.execute(f"{_SELECT} {_OPEN_LOTS} ORDER BY date, id").fetchall()
+            else:
+                rows = conn.execute(f"{_SELECT} {_OPEN_LOTS} AND item = ? ORDER BY date, id", (item,)).fetchall()
+        return self._frame(rows)
+
+    def total_remaining(self, item=None):
+        """현재고(잔여수량 합계). item을 주면 해당 품목만. 원장을 읽지 않고 잔량 테이블에서 바로 조회합니다."""
+        with self.reader() as conn:
+            if item is None:
+                return conn.execute("SELECT COALESCE(SUM(on_hand), 0) FROM stock_balance").fetchone()[0]
+            row = conn.execute("SELECT on_hand FROM stock_balance WHERE item = ?", (item,)).fetchone()
+            return row[0] if row else 0.0
+
+    def usage_stats(self, item, as_of=None, windows=USAGE_WINDOWS):
+        """
+        as_of(기본: 오늘)까지 최근 N일(소모가 없던 날은 0) 일평균 소모량과 표준편차, EWMA를 반환합니다.
+        예: {'avg_7': ..., 'std_7': ..., 'avg_30': ..., ..., 'ewma': ...}
+        """
+        today = (as_of or date.today()).toordinal()
+        stats = {}
+        with self.reader() as conn:
+            def prefix(day):
+                row = conn.execute("SELECT cum_qty, cum_sq FROM daily_usage WHERE item = ? AND day <= ? ORDER BY day DESC LIMIT 1",
+                                   (item, day)).fetchone()
+                return row or (0.0, 0.0)
+
+            end_qty, end_sq = prefix(today)
+            for n in windows:
+                start_qty, start_sq = prefix(today - n)
+                mean = (end_qty - start_qty) / n
+                variance = (end_sq - start_sq) / n - mean ** 2
+                stats[f'avg_{n}'] = mean
+                stats[f'std_{n}'] = math.sqrt(max(variance, 0.0))
+            ewma = conn.execute("SELECT ref_day, value FROM usage_ewma WHERE item = ?", (item,)).fetchone()
+        stats['ewma'] = ewma[1] * (1 - EWMA_ALPHA) ** max(today - ewma[0], 0) if ewma else 0.0
+        return stats
+
+    def daily_usage_series(self, item, days, as_of=None):
+        """as_of(기본: 오늘)까지 최근 days일의 일별 소모량 리스트 (오래된 날부터, 소모가 없던 날은 0)."""
+        today = (as_of or date.today()).toordinal()
+        with self.reader() as conn:
+            rows = conn.execute("SELECT day, qty FROM daily_usage WHERE item = ? AND day > ? AND day <= ?",
+                                (item, today - days, today)).fetchall()
+        series = [0.0] * days
+        for day, qty in rows:
+            series[day - today + days - 1] = qty
+        return series
+
+    # --- 기록 ---
+    def post_inbound(self, date_str, item, qty, supplier, lot_no):
+        """입고 한 건을 기록합니다."""
+        with self.transaction() as conn:
+            conn.execute("INSERT INTO ledger (date, kind, item, qty, memo, lot_no, remaining) VALUES (?, ?, ?, ?, ?, ?, ?)",
+                         (date_str, KIND_INBOUND, item, float(qty), supplier, lot_no, float(qty)))
+            self._add_balance(conn, item, float(qty))
+
+    def post_production(self, date_str, item, qty_to_use):
+        """
+        FIFO로 item의 열린 Lot에서 차감하고 투입 기록과 잔량을 갱신합니다. (하나의 트랜잭션)
+        재고가 부족하면 아무것도 바꾸지 않고 ValueError를 발생시킵니다. 사용한 Lot 목록 [(lot_no, 수량)]을 반환합니다.
+        """
+        qty_to_use = float(qty_to_use)
+        with self.transaction() as conn:
+            row = conn.execute("SELECT on_hand FROM stock_balance WHERE item = ?", (item,)).fetchone()
+            current = row[0] if row else 0.0
+            if current < qty_to_use:
+                raise ValueError(f"재고 부족: 현재 재고({current:,.0f}kg)보다 투입량({qty_to_use:,.0f}kg)이 많습니다.")
+
+            lots = conn.execute(f"SELECT id, lot_no, remaining FROM ledger {_OPEN_LOTS} AND item = ? ORDER BY date, id",
+                                (item,)).fetchall()
+            takes = allocate_fifo([lot[2] for lot in lots], qty_to_use)
+            used = [(lot_id, lot_no, float(take)) for (lot_id, lot_no, _), take in zip(lots, takes)]
+            conn.executemany("UPDATE ledger SET remaining = remaining - ? WHERE id = ?", [(take, lot_id) for lot_id, _, take in used])
+
+            description = f"생산 투입 (사용 Lot: {', '.join(f'{lot_no}({take:g}kg)' for _, lot_no, take in used)})"
+            conn.execute("INSERT INTO ledger (date, kind, item, qty, memo, lot_no, remaining) VALUES (?, ?, ?, ?, ?, ?, 0)",
+                         (date_str, KIND_INPUT, item, -qty_to_use, description, '-'))
+            self._add_balance(conn, item, -qty_to_use)
+            self._record_usage(conn, item, _day(date_str), qty_to_use)
+        return [(lot_no, take) for _, lot_no, take in used]
@@ -3,10 +3,11 @@
 import os
 import pandas as pd
 from dotenv import load_dotenv
-from openai import OpenAI
+from mypages.llm_gateway import get_gateway
 import json
-from pypdf import PdfReader
+import threading
 from datetime import datetime
+from gayoung.quality_store import QualityStore
 
 # --- 1. 환경 변수 및 경로 설정 ---
 try:
@@ -19,16 +20,15 @@ except Exception:
     script_dir = os.getcwd()
 
 API_KEY = os.getenv("OPENAI_API_KEY")
-client = OpenAI(api_key=API_KEY) if API_KEY else None
+
+def get_client():
+    """공유 LLM 게이트웨이를 반환합니다. (키가 없으면 None)"""
+    gateway = get_gateway()
+    return gateway if gateway.configured else None
 
 # --- 2. 상수 및 기본 설정 ---
-DB_FILE = os.path.join(script_dir, 'quality_db.csv')
-COLUMNS = [
-    '날짜', '공급사명', 'Lot No', '수량',
-    'coa_ni', 'coa_moisture', 'coa_fe', 'coa_s', 'coa_p',
-    'actual_ni', 'actual_moisture', 'actual_fe', 'actual_s', 'actual_p',
-    '판정', '비고'
-]
+DB_FILE = os.path.join(script_dir, 'quality_db.csv')  # 기존 CSV 이력 (최초 1회 STORE_FILE로 가져옴)
+STORE_FILE = os.path.join(script_dir, os.pardir, 'data', 'quality.sqlite3')
 SPECS = {
     'ni': {'label': '니켈'},
     'moisture': {'label': '수분'},
@@ -37,15 +37,26 @@ SPECS = {
     'p': {'label': '인'}
 }
 
+_store = None
+_store_lock = threading.Lock()
+
+def get_store():
+    """품질 이력 저장소(QualityStore)를 반환합니다. 처음 호출할 때 DB를 만들고 기존 CSV 이력을 가져옵니다."""
+    global _store
+    with _store_lock:
+        if _store is None:
+            _store = QualityStore(os.path.abspath(STORE_FILE), csv_path=DB_FILE)
+        return _store
+
 def load_or_create_db():
-    """데이터베이스 파일을 로드하거나 없으면 새로 생성합니다."""
-    if not os.path.exists(DB_FILE):
-        pd.DataFrame(columns=COLUMNS).to_csv(DB_FILE, index=False, encoding='utf-8-sig')
-    return pd.read_csv(DB_FILE)
+    """전체 검사 이력을 DataFrame(COLUMNS)으로 반환합니다. 조회 화면에서는 인덱스 조회 함수를 사용하세요."""
+    return get_store().records()
 
 # --- 3. PDF 데이터 추출 기능 (기존 유지) ---
 def extract_data_from_pdf(pdf_file):
     """pypdf로 PDF 텍스트를 추출하고, OpenAI API를 이용해 주요 정보를 JSON 형태로 파싱합니다."""
+    from pypdf import PdfReader
+    client = get_client()
     if not client:
         print("DEBUG: OpenAI client is not initialized.")
         raise ConnectionError("OpenAI API 키가 설정되지 않았습니다.")
@@ -64,16 +75,17 @@ def extract_data_from_pdf(pdf_file):
         prompt = f"다음 텍스트에서 공급사(supplier), Lot 번호(lot_no), 총 중량(quantity), 니켈(ni), 수분(moisture), 철(fe), 황(s), 인(p) 값을 JSON으로 추출해줘.\n- 규칙: 숫자만 추출하고 단위(%)는 제거. 찾을 수 없으면 null.\n- 텍스트: {text[:4000]}\n- JSON 출력:"
         
         print("DEBUG: Sending prompt to OpenAI API...")
-        response = client.chat.completions.create(
-            model="gpt-3.5-turbo",
-            response_format={"type": "json_object"},
-            messages=[
+        response_content = client.chat(
+            [
                 {"role": "system", "content": "You are a helpful assistant designed to output JSON."},
                 {"role": "user", "content": prompt}
-            ]
+            ],
+            model="gpt-3.5-turbo",
+            site="quality.coa_extraction",
+            cache=True,
+            validate=json.loads,
+            response_format={"type": "json_object"},
         )
-        
-        response_content = response.choices[0].message.content
         print(f"DEBUG: Received response from OpenAI: {response_content}")
         
         return json.loads(response_content), "추출 성공"
@@ -89,7 +101,7 @@ def extract_data_from_pdf(pdf_file):
 # --- 4. 품질 평가 및 저장 기능 (SRM 로직 강화) ---
 def assess_and_save_quality(date, supplier, lot_no, quantity, coa_values, actual_values):
     """
-    실측값(actual)과 COA 값을 비교하여 '데이터 신뢰성'을 평가하고 결과를 CSV에 저장합니다.
+    실측값(actual)과 COA 값을 비교하여 '데이터 신뢰성'을 평가하고 결과를 품질 이력 DB에 저장합니다.
     - 니켈(Ni): 실측 >= COA 이어야 합격
     - 그 외(수분, Fe, S, P): 실측 <= COA 이어야 합격
     """
@@ -118,52 +130,45 @@ def assess_and_save_quality(date, supplier, lot_no, quantity, coa_values, actual
 
     final_remark = ", ".join(remarks) if remarks else "정상"
     
-    new_record_data = {
-        '날짜': [date.strftime('%Y-%m-%d')], 
-        '공급사명': [supplier], 
-        'Lot No': [lot_no], 
-        '수량': [quantity], 
-        **{f'coa_{k}': [v] for k, v in coa_values.items()}, 
-        **{f'actual_{k}': [v] for k, v in actual_values.items()},
-        '판정': [final_status], 
-        '비고': [final_remark]
+    new_record = {
+        '날짜': date.strftime('%Y-%m-%d'),
+        '공급사명': supplier,
+        'Lot No': lot_no,
+        '수량': quantity,
+        **{f'coa_{k}': v for k, v in coa_values.items()},
+        **{f'actual_{k}': v for k, v in actual_values.items()},
+        '판정': final_status,
+        '비고': final_remark
     }
-    
-    # DataFrame 생성 시 컬럼 순서를 COLUMNS 리스트에 맞게 지정
-    df_new = pd.DataFrame(new_record_data, columns=COLUMNS)
-    
-    df_new.to_csv(DB_FILE, mode='a', header=False, index=False, encoding='utf-8-sig')
+    get_store().add_inspection(new_record)
     
     return {'status': final_status, 'remark': final_remark, 'quantity': quantity}
 
 # --- 5. 데이터 조회 및 SRM 분석 함수 (3-Strike Rule 구현) ---
+SRM_STAGES = {
+    3: {'stage': 3, 'status': '비상(Critical)', 'action': 'New Business Hold (신규 수주 금지 및 거래 중단)'},
+    2: {'stage': 2, 'status': '경고(Warning)', 'action': '현장 실사(Audit) 통보 및 페널티 부여'},
+    1: {'stage': 1, 'status': '주의(Caution)', 'action': 'SCAR(시정조치요구서) 발송'},
+    0: {'stage': 0, 'status': '안전(Safe)', 'action': '정상 거래'},
+}
+
+def _srm_stage(streak):
+    """연속 불합격 상태(streak)를 SRM 단계 dict로 변환합니다. 3회 이상 연속이면 3단계."""
+    failures = streak['consecutive_failures'] if streak else 0
+    return {**SRM_STAGES[min(failures, 3)], 'consecutive_failures': failures,
+            'last_date': streak['last_date'] if streak else None}
+
 def get_supplier_risk_and_stage(supplier):
-    """공급사의 '연속' 불량 이력을 추적하여 SRM 단계와 조치를 반환합니다."""
-    df = load_or_create_db()
-    s_history = df[df['공급사명'] == supplier].sort_values(by='날짜', ascending=False)
-    
-    if s_history.empty or s_history.iloc[0]['판정'] == '합격':
-        return {'stage': 0, 'status': '안전(Safe)', 'action': '정상 거래'}
-
-    # 연속 불량 횟수 카운트
-    consecutive_failures = 0
-    for index, row in s_history.iterrows():
-        if row['판정'] == '불합격':
-            consecutive_failures += 1
-        else:
-            break # 합격 이력이 나오면 중단
-
-    if consecutive_failures >= 3:
-        return {'stage': 3, 'status': '비상(Critical)', 'action': 'New Business Hold (신규 수주 금지 및 거래 중단)'}
-    elif consecutive_failures == 2:
-        return {'stage': 2, 'status': '경고(Warning)', 'action': '현장 실사(Audit) 통보 및 페널티 부여'}
-    elif consecutive_failures == 1:
-        return {'stage': 1, 'status': '주의(Caution)', 'action': 'SCAR(시정조치요구서) 발송'}
-    
-    return {'stage': 0, 'status': '안전(Safe)', 'action': '정상 거래'} # 이론상 도달하지 않음
+    """공급사의 '연속' 불량 이력을 추적하여 SRM 단계와 조치를 반환합니다. (저장된 연속 불합격 상태 한 행 조회)"""
+    return _srm_stage(get_store().supplier_streak(supplier))
+
+def get_all_supplier_stages():
+    """모든 공급사의 SRM 단계를 한 번에 반환합니다. {공급사: {'stage', 'status', 'action', ...}} (대시보드/P8용)"""
+    return {supplier: _srm_stage(streak) for supplier, streak in get_store().all_streaks().items()}
 
 def generate_action_email(supplier, lot_no, stage, details):
     """SRM 단계(Stage)에 따라 각기 다른 AI 메일/보고서를 생성합니다."""
+    client = get_client()
     if not client: return "OpenAI API 키가 설정되지 않았습니다."
 
     prompts = {
@@ -189,39 +194,42 @@ def generate_action_email(supplier, lot_no, stage, details):
     info = prompts[stage]
     prompt = f"수신자: {info['recipient']}\n제목: {info['title']}\n\n위 정보를 바탕으로, 매우 전문적이고 상황에 맞는 공식적인 톤앤매너의 문서(이메일 또는 보고서)를 한국어로 작성해줘. 내용은 아래와 같아.\n\n{info['body']}"
     
-    return client.chat.completions.create(model="gpt-3.5-turbo", messages=[{"role": "user", "content": prompt}]).choices[0].message.content
+    return client.chat([{"role": "user", "content": prompt}], model="gpt-3.5-turbo", site="quality.scar_email")
 
 # --- 기존 데이터 조회 함수들 ---
 def get_unique_suppliers():
-    return load_or_create_db()['공급사명'].unique().tolist()
+    """공급사 목록 (처음 기록된 순서, 캐시됨)."""
+    return get_store().suppliers()
 
 def get_records_by_supplier(supplier):
-    return load_or_create_db()[load_or_create_db()['공급사명'] == supplier]
+    return get_store().records(supplier=supplier)
 
-def get_records_by_date_range(start_date, end_date):
-    df = load_or_create_db()
+def get_records_by_date_range(start_date, end_date, supplier=None):
+    """기간(양 끝 포함) 검사 이력. supplier를 주면 해당 공급사만 인덱스로 조회합니다."""
+    df = get_store().records(supplier=supplier, start_date=start_date, end_date=end_date)
     df['날짜'] = pd.to_datetime(df['날짜'])
-    return df[(df['날짜'] >= pd.to_datetime(start_date)) & (df['날짜'] <= pd.to_datetime(end_date))]
+    return df
 
 def generate_inbound_approval_message(supplier, lot_no, assessment_result):
     """품질 검사 결과에 따라 입고 승인 메시지를 생성하거나 입고 보류를 알립니다."""
     if assessment_result['status'] == '합격':
+        client = get_client()
         if not client:
             return "⚠️ OpenAI API 키가 설정되지 않아 AI 메시지 생성을 건너뛰고 기본 메시지를 반환합니다.\n✅ [입고 승인] 공급처: {supplier} (LOT: {lot_no}) 품질 검사 합격. 물류/창고 담당자는 전산상 입고 처리를 진행해 주시기 바랍니다."
 
         prompt = f"공급처 '{supplier}'의 LOT 번호 '{lot_no}'에 대한 품질 검사가 '합격'으로 최종 판정되었습니다. 물류 및 창고 담당자가 해당 LOT에 대해 즉시 전산상 '입고(Inbound)' 처리를 진행하도록, 명확하고 친절한 알림 메시지를 이모지를 사용하여 작성해주세요."
         
         try:
-            response = client.chat.completions.create(
-                model="gpt-3.5-turbo",
-                messages=[
+            return client.chat(
+                [
                     {"role": "system", "content": "You are a helpful assistant creating clear, friendly, and actionable notifications for a warehouse management system."},
                     {"role": "user", "content": prompt}
                 ],
+                model="gpt-3.5-turbo",
+                site="quality.inbound_approval",
                 temperature=0.5,
                 max_tokens=200
             )
-            return response.choices[0].message.content
         except Exception as e:
             # OpenAI API 호출 실패 시 대체 메시지
             return f"⚠️ GPT-4o 호출 중 오류 발생: {e}\n✅ [입고 승인] 공급처: {supplier} (LOT: {lot_no}) 품질 검사 합격. 물류/창고 담당자는 전산상 입고 처리를 진행해 주시기 바랍니다."
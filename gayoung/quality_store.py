@@ -0,0 +1,259 @@
+# gayoung/quality_store.py
+"""
+품질 검사 이력 SQLite 저장소 (WAL 모드).
+
+기존 quality_db.csv 방식은 공급사 목록, 공급사별 이력, 기간 조회마다 파일 전체를 읽었습니다.
+- 검사 기록: (공급사, 날짜) / (날짜) 인덱스를 두어 공급사별·기간별 조회가 전체 이력 크기와 무관하게 동작
+- 공급사 목록: 기록할 때 suppliers 테이블을 함께 갱신하고, 조회 결과는 DB 파일이 바뀌기 전까지 메모리에 캐시
+- 연속 불합격 상태: 공급사별 (연속 불합격 수, 마지막 판정, 마지막 날짜)를 supplier_streak 테이블에 두고
+  검사 기록과 같은 트랜잭션에서 갱신하므로, SRM 단계 조회는 이력 길이와 무관하게 한 행만 읽습니다.
+  마지막 날짜보다 이전 날짜의 기록이 늦게 들어오면 그 공급사만 최신 이력부터 다시 셉니다.
+- 기존 CSV는 DB가 비어 있을 때 한 번만 가져옵니다. (meta 테이블에 기록)
+
+DataFrame으로 내보낼 때는 기존 CSV와 같은 컬럼명(COLUMNS)을 사용합니다.
+"""
+import os
+import csv
+import sqlite3
+import threading
+from contextlib import contextmanager
+
+# (CSV 컬럼명, DB 컬럼명, DB 타입)
+FIELDS = [
+    ('날짜', 'date', 'TEXT NOT NULL'),
+    ('공급사명', 'supplier', 'TEXT NOT NULL'),
+    ('Lot No', 'lot_no', 'TEXT'),
+    ('수량', 'quantity', 'REAL'),
+    *[(f'{kind}_{item}', f'{kind}_{item}', 'REAL')
+      for kind in ('coa', 'actual') for item in ('ni', 'moisture', 'fe', 's', 'p')],
+    ('판정', 'result', 'TEXT'),
+    ('비고', 'remark', 'TEXT'),
+]
+COLUMNS = [f[0] for f in FIELDS]
+_DB_COLUMNS = [f[1] for f in FIELDS]
+
+_SCHEMA = f"""
+CREATE TABLE IF NOT EXISTS inspections (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    {', '.join(f'{name} {kind}' for _, name, kind in FIELDS)}
+);
+CREATE INDEX IF NOT EXISTS idx_inspections_supplier_date ON inspections(supplier, date, id);
+CREATE INDEX IF NOT EXISTS idx_inspections_date ON inspections(date, id);
+CREATE TABLE IF NOT EXISTS suppliers (
+    name TEXT PRIMARY KEY,
+    first_id INTEGER NOT NULL,
+    inspections INTEGER NOT NULL DEFAULT 0,
+    last_date TEXT
+);
+CREATE TABLE IF NOT EXISTS supplier_streak (
+    supplier TEXT PRIMARY KEY,
+    consecutive_failures INTEGER NOT NULL DEFAULT 0,
+    last_result TEXT,
+    last_date TEXT
+);
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT
+);
+"""
+_SELECT = f"SELECT {', '.join(_DB_COLUMNS)} FROM inspections"
+FAIL_RESULT = '불합격'
+_INSERT = f"INSERT INTO inspections ({', '.join(_DB_COLUMNS)}) VALUES ({', '.join('?' for _ in _DB_COLUMNS)})"
+
+
+def _to_float(value):
+    try:
+        return float(value) if value not in (None, '') else None
+    except (TypeError, ValueError):
+        return None
+
+
+class QualityStore:
+    """품질 검사 이력 SQLite 저장소. 호출마다 짧은 연결을 열어 스레드/세션 간에 안전하게 사용합니다."""
+
+    def __init__(self, db_path, csv_path=None):
+        self.db_path = db_path
+        self._lock = threading.Lock()
+        self._cache = {}
+        self._cache_version = None
+        os.makedirs(os.path.dirname(db_path) or '.', exist_ok=True)
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.executescript(_SCHEMA)
+        # supplier_streak 도입 이전에 만들어진 DB는 한 번만 이력에서 다시 계산
+        with self.transaction() as conn:
+            if not conn.execute("SELECT 1 FROM meta WHERE key = 'streak_built'").fetchone():
+                self._rebuild_streaks(conn)
+        if csv_path:
+            self.migrate_from_csv(csv_path)
+
+    def _connect(self):
+        conn = sqlite3.connect(self.db_path, timeout=30, isolation_level=None)
+        conn.execute("PRAGMA synchronous=NORMAL")
+        return conn
+
+    @contextmanager
+    def transaction(self):
+        """쓰기 잠금을 먼저 잡는 트랜잭션 (BEGIN IMMEDIATE). 예외가 나면 롤백합니다."""
+        conn = self._connect()
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            yield conn
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        finally:
+            conn.close()
+            self.invalidate()
+
+    @contextmanager
+    def reader(self):
+        conn = self._connect()
+        try:
+            yield conn
+        finally:
+            conn.close()
+
+    # --- 캐시 (다른 프로세스의 기록은 DB/WAL 파일 버전으로 감지) ---
+    def _version(self):
+        versions = []
+        for path in (self.db_path, f"{self.db_path}-wal"):
+            try:
+                stat = os.stat(path)
+                versions.append((stat.st_mtime_ns, stat.st_size))
+            except OSError:
+                versions.append(None)
+        return tuple(versions)
+
+    def _cached(self, key, compute):
+        with self._lock:
+            version = self._version()
+            if version != self._cache_version:
+                self._cache.clear()
+                self._cache_version = version
+            if key not in self._cache:
+                self._cache[key] = compute()
+            return self._cache[key]
+
+    def invalidate(self):
+        with self._lock:
+            self._cache.clear()
+            self._cache_version = None
+
+    # --- 마이그레이션 ---
+    def migrate_from_csv(self, csv_path):
+        """DB가 비어 있고 아직 가져온 적이 없으면 CSV 이력을 한 번만 가져옵니다. 가져온 행 수를 반환합니다."""
+        if not os.path.exists(csv_path):
+            return 0
+        with self.transaction() as conn:
+            if conn.execute("SELECT 1 FROM meta WHERE key = 'csv_migrated'").fetchone():
+                return 0
+            count = 0
+            if not conn.execute("SELECT 1 FROM inspections LIMIT 1").fetchone():
+                with open(csv_path, 'r', encoding='utf-8-sig', newline='') as f:
+                    for rec in csv.DictReader(f):
+                        if rec.get('날짜') and rec.get('공급사명'):
+                            self._insert(conn, rec)
+                            count += 1
+            conn.execute("INSERT INTO meta (key, value) VALUES ('csv_migrated', ?)", (csv_path,))
+            self._rebuild_streaks(conn)
+            return count
+
+    # --- 기록 ---
+    @staticmethod
+    def _insert(conn, record):
+        values = []
+        for column, _, kind in FIELDS:
+            value = record.get(column)
+            values.append(_to_float(value) if kind.startswith('REAL') else (str(value)[:10] if column == '날짜' else value))
+        cursor = conn.execute(_INSERT, values)
+        conn.execute("INSERT INTO suppliers (name, first_id, inspections, last_date) VALUES (?, ?, 1, ?) "
+                     "ON CONFLICT(name) DO UPDATE SET inspections = inspections + 1, last_date = MAX(last_date, excluded.last_date)",
+                     (values[1], cursor.lastrowid, values[0]))
+        QualityStore._update_streak(conn, values[1], values[0], values[-2])
+        return cursor.lastrowid
+
+    # --- 연속 불합격 상태 ---
+    @staticmethod
+    def _update_streak(conn, supplier, date, result):
+        """새 기록 한 건을 공급사의 연속 불합격 상태에 반영합니다. 기록 순서대로 들어오면 O(1)."""
+        row = conn.execute("SELECT consecutive_failures, last_date FROM supplier_streak WHERE supplier = ?",
+                           (supplier,)).fetchone()
+        if row is not None and date < row[1]:
+            QualityStore._recount_streak(conn, supplier)
+            return
+        failures = (row[0] if row else 0) + 1 if result == FAIL_RESULT else 0
+        conn.execute("INSERT OR REPLACE INTO supplier_streak (supplier, consecutive_failures, last_result, last_date) "
+                     "VALUES (?, ?, ?, ?)", (supplier, failures, result, date))
+
+    @staticmethod
+    def _recount_streak(conn, supplier):
+        """공급사 이력을 최신 순으로 읽어 첫 합격 전까지의 불합격 수를 다시 셉니다."""
+        failures, latest = 0, None
+        cursor = conn.execute("SELECT date, result FROM inspections WHERE supplier = ? ORDER BY date DESC, id DESC",
+                              (supplier,))
+        for date, result in cursor:
+            latest = latest or (date, result)
+            if result != FAIL_RESULT:
+                break
+            failures += 1
+        if latest is None:
+            conn.execute("DELETE FROM supplier_streak WHERE supplier = ?", (supplier,))
+            return
+        conn.execute("INSERT OR REPLACE INTO supplier_streak (supplier, consecutive_failures, last_result, last_date) "
+                     "VALUES (?, ?, ?, ?)", (supplier, failures, latest[1], latest[0]))
+
+    @staticmethod
+    def _rebuild_streaks(conn):
+        conn.execute("DELETE FROM supplier_streak")
+        for (supplier,) in conn.execute("SELECT name FROM suppliers").fetchall():
+            QualityStore._recount_streak(conn, supplier)
+        conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES ('streak_built', '1')")
+
+    def add_inspection(self, record):
+        """검사 결과 한 건(COLUMNS 키의 dict)을 기록합니다."""
+        with self.transaction() as conn:
+            return self._insert(conn, record)
+
+    # --- 조회 ---
+    @staticmethod
+    def _frame(rows):
+        import pandas as pd
+        return pd.DataFrame(rows, columns=COLUMNS)
+
+    def suppliers(self):
+        """공급사 목록 (처음 기록된 순서). suppliers 테이블에서 읽고 메모리에 캐시합니다."""
+        def load():
+            with self.reader() as conn:
+                return [row[0] for row in conn.execute("SELECT name FROM suppliers ORDER BY first_id")]
+        return list(self._cached('suppliers', load))
+
+    def records(self, supplier=None, start_date=None, end_date=None):
+        """공급사 / 기간(YYYY-MM-DD, 양 끝 포함) 조건의 검사 이력을 기록 순서대로 반환합니다. 인덱스 범위 조회."""
+        clauses, params = [], []
+        if supplier is not None:
+            clauses.append("supplier = ?"); params.append(supplier)
+        if start_date is not None:
+            clauses.append("date >= ?"); params.append(str(start_date)[:10])
+        if end_date is not None:
+            clauses.append("date <= ?"); params.append(str(end_date)[:10])
+        where = f" WHERE {' AND '.join(clauses)}" if clauses else ""
+        with self.reader() as conn:
+            return self._frame(conn.execute(f"{_SELECT}{where} ORDER BY id", params).fetchall())
+
+    def supplier_streak(self, supplier):
+        """공급사의 연속 불합격 상태 dict (consecutive_failures, last_result, last_date). 이력이 없으면 None."""
+        with self.reader() as conn:
+            row = conn.execute("SELECT consecutive_failures, last_result, last_date FROM supplier_streak WHERE supplier = ?",
+                               (supplier,)).fetchone()
+        return dict(zip(('consecutive_failures', 'last_result', 'last_date'), row)) if row else None
+
+    def all_streaks(self):
+        """모든 공급사의 연속 불합격 상태 {공급사: dict}. 공급사 목록 순서이며 DB가 바뀌기 전까지 캐시합니다."""
+        def load():
+            with self.reader() as conn:
+                rows = conn.execute("SELECT t.supplier, t.consecutive_failures, t.last_result, t.last_date "
+                                    "FROM supplier_streak t JOIN suppliers s ON s.name = t.supplier ORDER BY s.first_id").fetchall()
+            return {r[0]: dict(zip(('consecutive_failures', 'last_result', 'last_date'), r[1:])) for r in rows}
+        return {k: dict(v) for k, v in self._cached('streaks', load).items()}
@@ -0,0 +1,111 @@
+# mypages/agent_cache.py
+"""
+P8 대화 턴 간 전문 에이전트 결과 캐시.
+
+각 에이전트가 실제로 읽는 입력(p1_plan 필드, 데이터 파일 버전, 선택 국가, 날짜, 선행 에이전트 결과)만으로
+캐시 키를 만들고, 입력이 그대로면 TTL 동안 이전 결과를 재사용합니다.
+캐시는 st.session_state에 저장되므로 사용자 세션별로 분리됩니다.
+"""
+import os
+import time
+import json
+import hashlib
+from datetime import date
+import streamlit as st
+
+from mypages.model_bundle import DF_MODEL_PATH, MODEL_PATH, SCALER_PATH, FEATURE_COLS_PATH
+
+# --- 경로 설정 ---
+try:
+    script_dir = os.path.dirname(os.path.abspath(__file__))
+    project_root = os.path.abspath(os.path.join(script_dir, os.pardir))
+except NameError:
+    project_root = os.getcwd()
+
+SESSION_KEY = 'agent_result_cache'
+INVENTORY_FILES = [os.path.join(project_root, 'data', 'inventory.sqlite3'),
+                   os.path.join(project_root, 'data', 'inventory.sqlite3-wal')]
+QUALITY_FILES = [os.path.join(project_root, 'data', 'quality.sqlite3'),
+                 os.path.join(project_root, 'data', 'quality.sqlite3-wal')]
+TARIFF_DATA_DIR = os.path.join(project_root, '관세율2', 'data')
+
+# 에이전트별 결과 유효 시간(초)
+AGENT_TTLS = {
+    'p2': 30 * 60,        # 뉴스 분석 포함
+    'p3': 24 * 60 * 60,   # 관세율은 자주 바뀌지 않음
+    'p4': 60 * 60,
+    'p5': 60 * 60,
+    'p6': 60 * 60,
+    'p7': 10 * 60,
+}
+
+
+def file_version(path):
+    """파일(또는 디렉터리 내 파일들)의 (수정 시각, 크기) 버전 정보. 없으면 None."""
+    if os.path.isdir(path):
+        return sorted((name, file_version(os.path.join(path, name))) for name in os.listdir(path))
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    return [stat.st_mtime_ns, stat.st_size]
+
+
+def _plan(state, *fields):
+    plan = state.get('p1_plan') or {}
+    return {f: plan.get(f) for f in fields}
+
+
+def _output(state, agent, *fields):
+    out = (state.get('agent_outputs') or {}).get(agent) or {}
+    return {f: out.get(f) for f in fields}
+
+
+# 에이전트별로 실제로 읽는 입력
+AGENT_INPUTS = {
+    'p2': lambda state: {"data": [file_version(p) for p in (DF_MODEL_PATH, MODEL_PATH, SCALER_PATH, FEATURE_COLS_PATH)]},
+    'p3': lambda state: {"country": st.session_state.get('p3_selected_country', '중국'),
+                         "tariff_data": file_version(TARIFF_DATA_DIR)},
+    'p4': lambda state: {**_plan(state, 'po_number'), "today": date.today().isoformat()},
+    'p5': lambda state: {**_plan(state, 'supplier'), "db": [file_version(p) for p in QUALITY_FILES]},
+    'p6': lambda state: {**_plan(state, 'order_qty'), **_output(state, 'p2', 'predicted_price'),
+                         **_output(state, 'p3', 'mfn_rate')},
+    'p7': lambda state: {**_plan(state, 'current_stock', 'weekly_usage', 'safety_stock', 'lead_time'),
+                         "db": [file_version(p) for p in INVENTORY_FILES], "today": date.today().isoformat()},
+}
+
+
+def make_key(agent, state):
+    """에이전트 입력으로 캐시 키를 만듭니다. 입력 정의가 없는 에이전트는 None (캐시하지 않음)."""
+    inputs = AGENT_INPUTS.get(agent)
+    if inputs is None:
+        return None
+    raw = json.dumps(inputs(state), sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha256(f"{agent}|{raw}".encode('utf-8')).hexdigest()
+
+
+def _store():
+    return st.session_state.setdefault(SESSION_KEY, {})
+
+
+def get(agent, state):
+    """입력이 같고 TTL 이내인 이전 결과를 반환합니다. 없으면 None."""
+    entry = _store().get(agent)
+    if not entry or time.time() - entry['stored_at'] >= AGENT_TTLS.get(agent, 0):
+        return None
+    return entry['result'] if entry['key'] == make_key(agent, state) else None
+
+
+def put(agent, state, result):
+    """오류가 아닌 결과만 저장합니다."""
+    key = make_key(agent, state)
+    if key is None or not result or result.get('error'):
+        return
+    _store()[agent] = {"key": key, "result": result, "stored_at": time.time()}
+
+
+def invalidate(agent=None):
+    """특정 에이전트(또는 전체)의 캐시를 비웁니다."""
+    store = _store()
+    if agent is None: store.clear()
+    else: store.pop(agent, None)
@@ -0,0 +1,81 @@
+# mypages/analysis_cache.py
+import os
+import json
+import time
+import hashlib
+import threading
+from mypages.explain_utils import CACHE_DIR
+
+# --- 상수 정의 ---
+ANALYSIS_CACHE_DIR = os.path.join(CACHE_DIR, 'price_analysis')
+NEWS_TTL_SECONDS = 6 * 60 * 60  # 뉴스 검색 결과는 6시간 동안만 유효
+
+_memory = {}
+_lock = threading.Lock()
+
+
+def make_key(model_key, selected_date):
+    """(모델 산출물 해시 - 모델/스케일러/df_model/feature_cols, 날짜)로 캐시 키를 만듭니다."""
+    date_str = str(selected_date)[:10]
+    raw = f"{model_key}|{date_str}"
+    return f"{date_str}_{hashlib.sha256(raw.encode('utf-8')).hexdigest()[:16]}"
+
+
+def _entry_path(key):
+    return os.path.join(ANALYSIS_CACHE_DIR, f"{key}.json")
+
+
+def load_entry(key):
+    """
+    캐시 항목을 반환합니다. (메모리 → 디스크 순서로 조회, 없으면 None)
+    항목 구조: top_features, shap_keywords, news_items, news_fetched_at, result
+    """
+    with _lock:
+        if key in _memory:
+            return _memory[key]
+    path = _entry_path(key)
+    if not os.path.exists(path):
+        return None
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            entry = json.load(f)
+    except (OSError, ValueError):
+        return None
+    with _lock:
+        _memory[key] = entry
+    return entry
+
+
+def save_entry(key, top_features, shap_keywords, news_items, result):
+    """분석 결과를 메모리와 디스크에 함께 저장합니다."""
+    entry = {
+        "top_features": list(top_features),
+        "shap_keywords": sorted(shap_keywords),
+        "news_items": news_items,
+        "news_fetched_at": time.time(),
+        "result": result,
+    }
+    os.makedirs(ANALYSIS_CACHE_DIR, exist_ok=True)
+    path = _entry_path(key)
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(entry, f, ensure_ascii=False)
+    os.replace(tmp_path, path)
+    with _lock:
+        _memory[key] = entry
+    return entry
+
+
+def is_news_fresh(entry, ttl=NEWS_TTL_SECONDS):
+    """뉴스 부분이 TTL 이내에 조회된 것인지 확인합니다."""
+    return entry is not None and (time.time() - entry.get('news_fetched_at', 0)) < ttl
+
+
+def clear():
+    """메모리 및 디스크 캐시를 모두 삭제합니다."""
+    with _lock:
+        _memory.clear()
+    if os.path.isdir(ANALYSIS_CACHE_DIR):
+        for name in os.listdir(ANALYSIS_CACHE_DIR):
+            if name.endswith('.json'):
+                os.remove(os.path.join(ANALYSIS_CACHE_DIR, name))
@@ -0,0 +1,132 @@
+# mypages/backtest.py
+"""
+니켈 가격 예측 모델의 구매 타이밍 백테스트 (벡터화 walk-forward).
+
+각 기준일 t에 대해 그날까지의 피처만으로 7일 후 가격을 예측하고(run_p2_purchase와 동일),
+±threshold 규칙으로 up/down/stable 추세를 판정한 뒤 다음과 같이 구매 시점을 시뮬레이션합니다.
+    - up / stable : 기준일 t에 즉시 구매
+    - down        : horizon일 뒤(t + h)까지 기다렸다가 구매
+비교 기준(naive)은 항상 기준일 t에 구매하는 전략입니다.
+
+모든 날짜의 예측은 한 번의 배치 연산으로 계산하고, 여러 threshold/horizon 조합은
+(horizon, threshold, date) 배열 브로드캐스팅으로 한 번에 평가합니다.
+※ final_model.pkl이 학습에 사용한 기간과 겹치는 구간은 in-sample 결과임에 유의하세요.
+
+사용법:
+    python -m mypages.backtest --thresholds 0.005 0.01 0.02 --horizons 7 14
+"""
+import argparse
+import time
+import numpy as np
+import pandas as pd
+
+from mypages import model_bundle as mb
+from mypages.inference import get_predictor
+
+DEFAULT_THRESHOLD = 0.01   # run_p2_purchase의 ±1% 규칙
+DEFAULT_HORIZON = 7        # 모델 예측 기간 (7일 후)
+TREND_UP, TREND_STABLE, TREND_DOWN = 1, 0, -1
+
+
+def classify_trend(current, predicted, threshold=DEFAULT_THRESHOLD):
+    """
+    run_p2_purchase의 추세 판정 규칙을 배열에 적용합니다.
+    threshold가 (P, 1) 형태면 결과는 (P, N) 배열이 됩니다. (1=up, 0=stable, -1=down)
+    """
+    current = np.asarray(current, dtype=np.float64)
+    predicted = np.asarray(predicted, dtype=np.float64)
+    threshold = np.asarray(threshold, dtype=np.float64)
+    up = predicted > current * (1 + threshold)
+    down = predicted < current * (1 - threshold)
+    return up.astype(np.int8) - down.astype(np.int8)
+
+
+def forward_index(dates, horizon_days):
+    """각 날짜의 horizon일 뒤(해당일이 없으면 그 이후 첫 거래일) 행 번호. 범위를 벗어나면 -1."""
+    dates = pd.DatetimeIndex(dates)
+    target = dates.values + np.timedelta64(int(horizon_days), 'D')
+    idx = np.searchsorted(dates.values, target, side='left')
+    return np.where(idx < len(dates), idx, -1)
+
+
+def batch_predict(bundle):
+    """번들의 전체 피처 행렬을 한 번에 예측합니다."""
+    return get_predictor(bundle.model, bundle.scaler).predict(bundle.features)
+
+
+def run_backtest(bundle=None, thresholds=(DEFAULT_THRESHOLD,), horizons=(DEFAULT_HORIZON,),
+                 start=None, end=None, predictions=None):
+    """
+    threshold × horizon 조합별 백테스트 결과를 DataFrame으로 반환합니다.
+    결과 DataFrame의 attrs['runtime_sec']에 전체 실행 시간이 기록됩니다.
+    """
+    t0 = time.perf_counter()
+    bundle = bundle or mb.load_bundle()
+    dates = bundle.dates
+    prices = np.asarray(bundle.column('Ni_price'), dtype=np.float64)
+    preds = batch_predict(bundle) if predictions is None else np.asarray(predictions, dtype=np.float64)
+
+    in_range = np.ones(len(dates), dtype=bool)
+    if start is not None: in_range &= dates >= pd.Timestamp(start)
+    if end is not None: in_range &= dates <= pd.Timestamp(end)
+
+    thr = np.asarray(thresholds, dtype=np.float64).reshape(-1, 1)         # (P, 1)
+    signals = classify_trend(prices, preds, thr)                          # (P, N)
+
+    rows = []
+    for h in horizons:
+        fwd = forward_index(dates, h)
+        valid = in_range & (fwd >= 0)                                     # (N,)
+        p_now = prices[valid]
+        p_later = prices[fwd[valid]]
+        sig = signals[:, valid]                                           # (P, M)
+        actual = classify_trend(p_now, p_later, thr)                      # (P, M)
+
+        naive_cost = p_now.sum()
+        strategy_cost = np.where(sig == TREND_DOWN, p_later, p_now).sum(axis=1)
+        oracle_cost = np.minimum(p_now, p_later).sum()
+        directional = sig != TREND_STABLE
+        n_dir = directional.sum(axis=1)
+        dir_hits = (directional & (np.sign(p_later - p_now) == sig)).sum(axis=1)
+        n_up = (sig == TREND_UP).sum(axis=1)
+        n_down = (sig == TREND_DOWN).sum(axis=1)
+        hit_rate = (sig == actual).mean(axis=1) if sig.shape[1] else np.full(len(thr), np.nan)
+
+        for k, threshold in enumerate(thr[:, 0]):
+            savings = naive_cost - strategy_cost[k]
+            rows.append({
+                "horizon_days": int(h),
+                "threshold": float(threshold),
+                "n_decisions": int(valid.sum()),
+                "n_up": int(n_up[k]),
+                "n_down": int(n_down[k]),
+                "hit_rate": float(hit_rate[k]),
+                "directional_hit_rate": float(dir_hits[k] / n_dir[k]) if n_dir[k] else np.nan,
+                "naive_cost": float(naive_cost),
+                "strategy_cost": float(strategy_cost[k]),
+                "savings": float(savings),
+                "savings_pct": float(savings / naive_cost * 100) if naive_cost else 0.0,
+                "oracle_savings_pct": float((naive_cost - oracle_cost) / naive_cost * 100) if naive_cost else 0.0,
+            })
+
+    result = pd.DataFrame(rows)
+    result.attrs['runtime_sec'] = time.perf_counter() - t0
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="니켈 구매 타이밍 walk-forward 백테스트")
+    parser.add_argument('--thresholds', type=float, nargs='+', default=[DEFAULT_THRESHOLD])
+    parser.add_argument('--horizons', type=int, nargs='+', default=[DEFAULT_HORIZON])
+    parser.add_argument('--start')
+    parser.add_argument('--end')
+    args = parser.parse_args()
+
+    result = run_backtest(thresholds=args.thresholds, horizons=args.horizons, start=args.start, end=args.end)
+    with pd.option_context('display.max_columns', None, 'display.width', 200):
+        print(result.to_string(index=False, float_format=lambda v: f"{v:,.4f}"))
+    print(f"\n실행 시간: {result.attrs['runtime_sec']:.3f}초 ({len(result)}개 조합)")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,153 @@
+# mypages/explain_utils.py
+import os
+import hashlib
+import numpy as np
+import pandas as pd
+from mypages.inference import get_predictor
+
+# --- 경로 설정 ---
+try:
+    script_dir = os.path.dirname(os.path.abspath(__file__))
+    project_root = os.path.abspath(os.path.join(script_dir, os.pardir))
+except NameError:
+    project_root = os.getcwd()
+
+CACHE_DIR = os.path.join(project_root, 'cache')
+SHAP_CACHE_PATH = os.path.join(CACHE_DIR, 'shap_attributions.npz')
+PERMUTATION_BACKGROUND_SIZE = 50
+
+
+# --- 공통 헬퍼 ---
+def file_hash(path):
+    """파일 내용의 SHA-256 해시(앞 16자리)를 반환합니다. 파일이 없으면 None."""
+    if not path or not os.path.exists(path):
+        return None
+    h = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b''):
+            h.update(chunk)
+    return h.hexdigest()[:16]
+
+
+def detect_model_kind(model):
+    """모델 구조에 맞는 SHAP 설명 방식('linear' / 'tree' / 'permutation')을 판별합니다."""
+    coef = getattr(model, 'coef_', None)
+    if coef is not None and np.ndim(coef) <= 2 and hasattr(model, 'intercept_'):
+        return 'linear'
+    if any(hasattr(model, attr) for attr in ('tree_', 'estimators_', 'get_booster', 'booster_')):
+        return 'tree'
+    return 'permutation'
+
+
+# --- 모델 인식형 Explainer ---
+class FastExplainer:
+    """
+    KernelExplainer를 대체하는 모델 인식형 SHAP Explainer.
+    - linear: 스케일러를 포함한 선형 모델의 정확한 SHAP 값을 닫힌 형태로 계산 (w * (x - E[x]))
+    - tree: shap.TreeExplainer 사용
+    - permutation: shap.PermutationExplainer 사용, 결과는 행 단위로 캐싱
+    날짜별 사전 계산 결과(attach_attributions)가 있으면 재계산 없이 바로 조회합니다.
+    """
+
+    def __init__(self, model, scaler, background_data):
+        self.model = model
+        self.scaler = scaler
+        self.feature_names = list(background_data.columns)
+        self.kind = detect_model_kind(model)
+        self._table = None
+        self._row_cache = {}
+
+        self._predictor = get_predictor(model, scaler)
+        background = background_data.to_numpy(dtype=np.float64)
+        if self.kind == 'linear':
+            # 스케일러가 계수에 흡수된 원본 공간 가중치 사용 (inference.FusedPredictor)
+            self._weights = self._predictor.weights
+            self._expected_x = background.mean(axis=0)
+            self.expected_value = self._predictor.predict_one(self._expected_x)
+        elif self.kind == 'tree':
+            import shap
+            self._explainer = shap.TreeExplainer(model, scaler.transform(background))
+            self.expected_value = self._explainer.expected_value
+        else:
+            import shap
+            background_summary = shap.sample(background_data, PERMUTATION_BACKGROUND_SIZE)
+            self._explainer = shap.PermutationExplainer(self._predict_raw, background_summary.to_numpy(dtype=np.float64))
+            self.expected_value = None
+
+    def _predict_raw(self, X):
+        return self._predictor.predict(X)
+
+    def _compute(self, X):
+        if self.kind == 'linear':
+            return (X - self._expected_x) * self._weights
+        if self.kind == 'tree':
+            values = self._explainer.shap_values(self.scaler.transform(X))
+            if isinstance(values, list): values = values[0]
+            return np.asarray(values)
+        rows = []
+        for row in X:
+            key = row.tobytes()
+            if key not in self._row_cache:
+                self._row_cache[key] = np.asarray(self._explainer(row.reshape(1, -1)).values).reshape(-1)
+            rows.append(self._row_cache[key])
+        return np.vstack(rows)
+
+    def attach_attributions(self, table):
+        """사전 계산된 날짜별 SHAP 값(DataFrame, index=date)을 연결합니다."""
+        self._table = table
+
+    def shap_values(self, X, dates=None):
+        """
+        입력 행렬의 SHAP 값을 (n_samples, n_features) 배열로 반환합니다.
+        dates가 주어지고 사전 계산 테이블에 모두 있으면 테이블에서 바로 조회합니다.
+        """
+        if dates is not None and self._table is not None:
+            idx = pd.DatetimeIndex(pd.to_datetime(dates))
+            if idx.isin(self._table.index).all():
+                return self._table.loc[idx, self.feature_names].to_numpy()
+        if isinstance(X, pd.DataFrame):
+            X = X[self.feature_names].to_numpy(dtype=np.float64)
+        X = np.atleast_2d(np.asarray(X, dtype=np.float64))
+        return self._compute(X)
+
+
+def build_explainer(model, scaler, background_data):
+    """모델 유형에 맞는 FastExplainer를 생성합니다."""
+    if model is None or scaler is None or background_data is None:
+        return None
+    return FastExplainer(model, scaler, background_data)
+
+
+# --- 전체 이력 SHAP 사전 계산 및 저장 ---
+def load_or_build_attributions(explainer, feature_data, model_key, cache_path=SHAP_CACHE_PATH):
+    """
+    전체 과거 날짜의 SHAP 값을 계산해 .npz로 저장하고, 이미 저장된 결과가 있으면 재사용합니다.
+    model_key(모델 파일 해시 등)나 피처 목록, 날짜 범위가 달라지면 다시 계산합니다.
+    """
+    if explainer is None or feature_data is None or feature_data.empty:
+        return None
+    dates = feature_data.index.values.astype('datetime64[ns]')
+    feature_names = list(feature_data.columns)
+
+    if os.path.exists(cache_path):
+        try:
+            with np.load(cache_path, allow_pickle=False) as cached:
+                if (str(cached['model_key']) == str(model_key)
+                        and cached['feature_names'].tolist() == feature_names
+                        and np.array_equal(cached['dates'], dates)):
+                    table = pd.DataFrame(cached['values'], index=pd.DatetimeIndex(dates), columns=feature_names)
+                    explainer.attach_attributions(table)
+                    return table
+        except (OSError, KeyError, ValueError):
+            pass  # 손상된 캐시는 무시하고 재계산
+
+    values = explainer.shap_values(feature_data)
+    os.makedirs(os.path.dirname(cache_path), exist_ok=True)
+    tmp_path = cache_path + '.tmp.npz'
+    np.savez_compressed(tmp_path, values=values.astype(np.float32), dates=dates,
+                        feature_names=np.array(feature_names), model_key=np.array(str(model_key)))
+    os.replace(tmp_path, cache_path)
+
+    table = pd.DataFrame(values, index=pd.DatetimeIndex(dates), columns=feature_names)
+    explainer.attach_attributions(table)
+    return table
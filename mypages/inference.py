@@ -0,0 +1,81 @@
+# mypages/inference.py
+"""
+스케일러 + 모델을 한 번에 계산하는 결합(fused) 추론 경로.
+
+- 선형 모델(coef_/intercept_): StandardScaler의 mean/scale을 계수에 흡수하여
+  원본 피처에 대해 바로 y = X @ w' + b' 를 계산합니다.
+      w' = coef / scale,  b' = intercept - sum(coef * mean / scale)
+- 그 외 모델: (X - mean) / scale 변환을 numba 커널(없으면 NumPy)로 수행한 뒤 model.predict를 호출합니다.
+
+pandas를 거치지 않고 float32/float64 NumPy 배열을 그대로 받습니다.
+"""
+import numpy as np
+
+try:
+    from numba import njit, prange
+    NUMBA_AVAILABLE = True
+except ImportError:  # numba가 없는 환경에서는 NumPy 경로 사용
+    NUMBA_AVAILABLE = False
+
+
+if NUMBA_AVAILABLE:
+    @njit(parallel=True, cache=True, fastmath=False)
+    def _standardize_kernel(X, mean, inv_scale, out):
+        n_rows, n_cols = X.shape
+        for i in prange(n_rows):
+            for j in range(n_cols):
+                out[i, j] = (X[i, j] - mean[j]) * inv_scale[j]
+        return out
+
+
+def _standardize(X, mean, inv_scale):
+    out = np.empty(X.shape, dtype=np.float64)
+    if NUMBA_AVAILABLE:
+        return _standardize_kernel(X, mean, inv_scale, out)
+    np.subtract(X, mean, out=out)
+    np.multiply(out, inv_scale, out=out)
+    return out
+
+
+class FusedPredictor:
+    """스케일러 변환과 모델 예측을 하나의 단계로 수행하는 예측기."""
+
+    def __init__(self, model, scaler):
+        self.model = model
+        coef = getattr(model, 'coef_', None)
+        self.is_linear = coef is not None and np.ndim(coef) <= 2 and hasattr(model, 'intercept_')
+
+        mean = np.asarray(getattr(scaler, 'mean_', 0.0), dtype=np.float64)
+        scale = np.asarray(getattr(scaler, 'scale_', 1.0), dtype=np.float64)
+        if self.is_linear:
+            coef = np.asarray(coef, dtype=np.float64).reshape(-1)
+            self.weights = coef / scale
+            self.bias = float(np.asarray(model.intercept_, dtype=np.float64).reshape(-1)[0] - (coef * mean / scale).sum())
+        else:
+            self.mean = np.broadcast_to(mean, (int(getattr(model, 'n_features_in_', mean.size)),)).copy()
+            self.inv_scale = 1.0 / np.broadcast_to(scale, self.mean.shape)
+
+    def predict(self, X):
+        """X: (n_samples, n_features) 또는 (n_features,) 배열. 예측값 1차원 배열을 반환합니다."""
+        X = np.asarray(X)
+        if X.ndim == 1:
+            X = X.reshape(1, -1)
+        if self.is_linear:
+            return X.astype(np.float64, copy=False) @ self.weights + self.bias
+        return np.asarray(self.model.predict(_standardize(X, self.mean, self.inv_scale)))
+
+    def predict_one(self, row):
+        return float(self.predict(row)[0])
+
+
+_predictors = {}
+
+
+def get_predictor(model, scaler):
+    """(model, scaler) 쌍별로 FusedPredictor를 한 번만 만들어 재사용합니다."""
+    key = (id(model), id(scaler))
+    cached = _predictors.get(key)
+    if cached is None or cached[0] is not model or cached[1] is not scaler:
+        cached = (model, scaler, FusedPredictor(model, scaler))
+        _predictors[key] = cached
+    return cached[2]
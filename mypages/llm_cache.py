@@ -0,0 +1,232 @@
+# mypages/llm_cache.py
+"""
+LLM 응답 캐시(SQLite)와 호출 위치(site)별 사용량 집계.
+
+- responses   : 내용 주소 기반(content-addressed) 응답 캐시. 키 = SHA-256(model, messages, params)
+                항목 수 / 총 바이트 한도를 넘으면 마지막 사용 시각이 오래된 순(LRU)으로 제거합니다.
+                적중 시 사용 시각/적중 수 갱신은 메모리에 모았다가 HIT_FLUSH_SIZE건 또는 HIT_FLUSH_SECONDS마다,
+                그리고 저장/제거 직전에 한 번에 반영합니다. (적중마다 쓰기 커밋을 하지 않음)
+- call_metrics: site × model별 호출 수, 캐시 적중 수, 오류 수, 토큰 사용량, 누적 지연 시간
+                캐시 적중 집계도 같은 방식으로 모아서 반영하고, 실제 API 호출 집계는 바로 반영합니다.
+
+두 테이블은 같은 DB 파일(cache/llm_cache.sqlite3)에 저장되므로 프로세스/세션이 바뀌어도 누적됩니다.
+
+사용법:
+    python -m mypages.llm_cache            # site별 사용량 리포트
+    python -m mypages.llm_cache --clear    # 응답 캐시 비우기
+"""
+import os
+import time
+import atexit
+import sqlite3
+import argparse
+import threading
+
+from mypages.explain_utils import CACHE_DIR
+
+# --- 상수 정의 ---
+LLM_CACHE_PATH = os.path.join(CACHE_DIR, 'llm_cache.sqlite3')
+MAX_ENTRIES = 5000
+MAX_BYTES = 50 * 1024 * 1024
+HIT_FLUSH_SIZE = 64
+HIT_FLUSH_SECONDS = 30.0
+
+# 모델별 1M 토큰당 가격(USD, 입력/출력) - 비용 추정용
+MODEL_PRICES = {
+    "gpt-4o-mini": (0.15, 0.60),
+    "gpt-4o": (2.50, 10.00),
+    "gpt-3.5-turbo": (0.50, 1.50),
+}
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS responses (
+    key TEXT PRIMARY KEY,
+    site TEXT,
+    model TEXT,
+    content TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    created_at REAL NOT NULL,
+    last_access REAL NOT NULL,
+    hits INTEGER NOT NULL DEFAULT 0
+);
+CREATE INDEX IF NOT EXISTS idx_responses_last_access ON responses(last_access);
+CREATE TABLE IF NOT EXISTS call_metrics (
+    site TEXT NOT NULL,
+    model TEXT NOT NULL,
+    calls INTEGER NOT NULL DEFAULT 0,
+    cache_hits INTEGER NOT NULL DEFAULT 0,
+    errors INTEGER NOT NULL DEFAULT 0,
+    prompt_tokens INTEGER NOT NULL DEFAULT 0,
+    completion_tokens INTEGER NOT NULL DEFAULT 0,
+    latency_ms REAL NOT NULL DEFAULT 0,
+    PRIMARY KEY (site, model)
+);
+"""
+
+
+def estimate_cost(model, prompt_tokens, completion_tokens):
+    """모델 가격표로 호출 비용(USD)을 추정합니다. 가격표에 없는 모델은 0."""
+    price_in, price_out = next((p for name, p in sorted(MODEL_PRICES.items(), key=lambda kv: -len(kv[0]))
+                                if model.startswith(name)), (0.0, 0.0))
+    return (prompt_tokens * price_in + completion_tokens * price_out) / 1_000_000
+
+
+class LLMCache:
+    """SQLite 기반 LLM 응답 캐시 + site별 사용량 집계기. (스레드 간 연결 공유, 잠금으로 직렬화)"""
+
+    def __init__(self, path=LLM_CACHE_PATH, max_entries=MAX_ENTRIES, max_bytes=MAX_BYTES):
+        self.path = path
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._pending_hits = {}
+        self._pending_metrics = {}
+        self._last_flush = time.time()
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False, timeout=30)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(_SCHEMA)
+        self._conn.commit()
+        atexit.register(self._flush_at_exit)
+
+    # --- 응답 캐시 ---
+    def get(self, key):
+        with self._lock:
+            row = self._conn.execute("SELECT content FROM responses WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                return None
+            now = time.time()
+            self._pending_hits[key] = (now, self._pending_hits.get(key, (0, 0))[1] + 1)
+            if len(self._pending_hits) >= HIT_FLUSH_SIZE or now - self._last_flush >= HIT_FLUSH_SECONDS:
+                self._flush_hits()
+                self._conn.commit()
+            return row[0]
+
+    def _flush_hits(self):
+        """모아 둔 적중 기록(사용 시각, 적중 수)과 사용량 집계를 반영합니다. 잠금을 잡은 상태에서 호출하며 커밋은 호출부에서 합니다."""
+        if self._pending_hits:
+            self._conn.executemany(
+                "UPDATE responses SET last_access = MAX(last_access, ?), hits = hits + ? WHERE key = ?",
+                [(at, count, key) for key, (at, count) in self._pending_hits.items()])
+            self._pending_hits.clear()
+        if self._pending_metrics:
+            self._conn.executemany(
+                "INSERT INTO call_metrics (site, model, calls, cache_hits, errors, prompt_tokens, completion_tokens, latency_ms) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?) "
+                "ON CONFLICT(site, model) DO UPDATE SET calls = calls + excluded.calls, cache_hits = cache_hits + excluded.cache_hits, "
+                "errors = errors + excluded.errors, prompt_tokens = prompt_tokens + excluded.prompt_tokens, "
+                "completion_tokens = completion_tokens + excluded.completion_tokens, latency_ms = latency_ms + excluded.latency_ms",
+                [(site, model, *totals) for (site, model), totals in self._pending_metrics.items()])
+            self._pending_metrics.clear()
+        self._last_flush = time.time()
+
+    def flush(self):
+        with self._lock:
+            self._flush_hits()
+            self._conn.commit()
+
+    def _flush_at_exit(self):
+        try:
+            self.flush()
+        except Exception:
+            pass
+
+    def put(self, key, content, site=None, model=None):
+        size = len(content.encode('utf-8'))
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO responses (key, site, model, content, size, created_at, last_access, hits) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, 0)", (key, site, model, content, size, now, now))
+            self._pending_hits.pop(key, None)
+            self._flush_hits()
+            self._evict()
+            self._conn.commit()
+
+    def _evict(self):
+        count, total = self._conn.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM responses").fetchone()
+        if count <= self.max_entries and total <= self.max_bytes:
+            return
+        over_bytes = total - self.max_bytes
+        over_count = count - self.max_entries
+        doomed, freed = [], 0
+        for key, size in self._conn.execute("SELECT key, size FROM responses ORDER BY last_access ASC"):
+            if len(doomed) >= over_count and freed >= over_bytes:
+                break
+            doomed.append((key,))
+            freed += size
+        self._conn.executemany("DELETE FROM responses WHERE key = ?", doomed)
+
+    def delete(self, key):
+        with self._lock:
+            self._pending_hits.pop(key, None)
+            self._conn.execute("DELETE FROM responses WHERE key = ?", (key,))
+            self._conn.commit()
+
+    def clear(self):
+        with self._lock:
+            self._pending_hits.clear()
+            self._conn.execute("DELETE FROM responses")
+            self._conn.commit()
+
+    # --- 사용량 집계 ---
+    def record(self, site, model, latency_ms, cache_hit=False, error=False, prompt_tokens=0, completion_tokens=0):
+        """호출 1건을 집계합니다. 캐시 적중은 모아 두었다가 반영하고, API 호출은 바로 반영합니다."""
+        delta = (1, int(cache_hit), int(error), int(prompt_tokens or 0), int(completion_tokens or 0), float(latency_ms))
+        with self._lock:
+            totals = self._pending_metrics.get((site, model), (0, 0, 0, 0, 0, 0.0))
+            self._pending_metrics[(site, model)] = tuple(a + b for a, b in zip(totals, delta))
+            if (not cache_hit or len(self._pending_hits) >= HIT_FLUSH_SIZE
+                    or time.time() - self._last_flush >= HIT_FLUSH_SECONDS):
+                self._flush_hits()
+                self._conn.commit()
+
+    def report(self):
+        """site × model별 사용량을 비용 추정치가 큰 순서로 반환합니다. (dict 리스트)"""
+        with self._lock:
+            self._flush_hits()
+            self._conn.commit()
+            rows = self._conn.execute(
+                "SELECT site, model, calls, cache_hits, errors, prompt_tokens, completion_tokens, latency_ms FROM call_metrics"
+            ).fetchall()
+        result = []
+        for site, model, calls, hits, errors, p_tok, c_tok, latency in rows:
+            result.append({
+                "site": site, "model": model, "calls": calls, "cache_hits": hits,
+                "hit_rate": hits / calls if calls else 0.0, "errors": errors,
+                "prompt_tokens": p_tok, "completion_tokens": c_tok,
+                "est_cost_usd": estimate_cost(model, p_tok, c_tok),
+                "total_latency_s": latency / 1000,
+                "avg_latency_ms": latency / calls if calls else 0.0,
+            })
+        return sorted(result, key=lambda r: (r["est_cost_usd"], r["total_latency_s"]), reverse=True)
+
+    def reset_metrics(self):
+        with self._lock:
+            self._pending_metrics.clear()
+            self._conn.execute("DELETE FROM call_metrics")
+            self._conn.commit()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="LLM 호출 위치별 사용량 리포트")
+    parser.add_argument('--path', default=LLM_CACHE_PATH)
+    parser.add_argument('--clear', action='store_true', help="응답 캐시 비우기")
+    parser.add_argument('--reset-metrics', action='store_true', help="사용량 집계 초기화")
+    args = parser.parse_args()
+
+    store = LLMCache(args.path)
+    if args.clear: store.clear()
+    if args.reset_metrics: store.reset_metrics()
+    header = f"{'site':<28}{'model':<16}{'calls':>7}{'hit%':>7}{'err':>5}{'in_tok':>10}{'out_tok':>10}{'cost$':>10}{'avg_ms':>9}{'total_s':>9}"
+    print(header)
+    print('-' * len(header))
+    for r in store.report():
+        print(f"{r['site']:<28}{r['model']:<16}{r['calls']:>7}{r['hit_rate'] * 100:>6.1f}%{r['errors']:>5}"
+              f"{r['prompt_tokens']:>10}{r['completion_tokens']:>10}{r['est_cost_usd']:>10.4f}"
+              f"{r['avg_latency_ms']:>9.0f}{r['total_latency_s']:>9.1f}")
+
+
+if __name__ == '__main__':
+    main()
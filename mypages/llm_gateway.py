@@ -0,0 +1,223 @@
+# mypages/llm_gateway.py
+"""
+모든 에이전트가 공유하는 LLM 호출 게이트웨이.
+
+- 프로세스당 하나의 OpenAI 클라이언트와 keep-alive httpx 연결 풀 (TLS 연결 비용은 한 번만)
+- 동시 호출 수 제한 (세마포어)
+- 재시도 가능한 오류(연결/타임아웃/429/5xx)에 대한 지수 백오프 재시도
+- 호출별 타임아웃
+- 응답 캐시 (결정적 프롬프트만: cache=True 또는 temperature=0) - 메모리 LRU + SQLite(mypages.llm_cache)
+- 호출 위치(site)별 토큰 사용량 / 지연 시간 / 캐시 적중률 집계 (python -m mypages.llm_cache 로 확인)
+- 캐시/집계 저장소(SQLite) 오류는 로그만 남기고 캐시 없이 진행 (LLM 호출 자체는 실패시키지 않음)
+- validate: 호출부가 응답을 검증하는 함수 (예: json.loads). 통과한 응답만 캐시하고, 캐시된 응답이 실패하면 제거 후 다시 호출
+
+사용법:
+    from mypages.llm_gateway import get_gateway
+    gateway = get_gateway()
+    if gateway.configured:
+        text = gateway.chat(messages, model="gpt-4o-mini", site="p3.router", cache=True, validate=json.loads)
+"""
+import os
+import json
+import time
+import logging
+import random
+import hashlib
+import threading
+from collections import OrderedDict
+
+from mypages.llm_cache import LLMCache
+
+# --- 상수 정의 ---
+DEFAULT_MODEL = "gpt-4o-mini"
+MAX_CONCURRENCY = 8
+DEFAULT_TIMEOUT = 60.0
+MAX_RETRIES = 3
+BACKOFF_SECONDS = 0.5
+CACHE_SIZE = 256
+
+logger = logging.getLogger(__name__)
+
+
+def cache_key(model, messages, params):
+    """모델, 메시지, 호출 파라미터로 응답 캐시 키(SHA-256)를 만듭니다."""
+    raw = json.dumps({"model": model, "messages": messages, "params": params},
+                     sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha256(raw.encode('utf-8')).hexdigest()
+
+
+class LLMGateway:
+    """연결 풀, 동시성 제한, 재시도, 타임아웃, 응답 캐시를 갖는 chat completion 게이트웨이."""
+
+    def __init__(self, api_key=None, max_concurrency=MAX_CONCURRENCY, timeout=DEFAULT_TIMEOUT,
+                 max_retries=MAX_RETRIES, backoff=BACKOFF_SECONDS, cache_size=CACHE_SIZE, store=None):
+        self.api_key = api_key if api_key is not None else os.getenv("OPENAI_API_KEY")
+        self.max_concurrency = max_concurrency
+        self.timeout = timeout
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.cache_size = cache_size
+        self._client = None
+        self._lock = threading.Lock()
+        self._semaphore = threading.BoundedSemaphore(max_concurrency)
+        self._cache = OrderedDict()
+        self._store = store
+        self._store_failed = False
+
+    @property
+    def store(self):
+        """SQLite 응답 캐시 및 사용량 집계 저장소. (처음 사용할 때 연결, 열 수 없으면 None)"""
+        if self._store is None and not self._store_failed:
+            with self._lock:
+                if self._store is None and not self._store_failed:
+                    try:
+                        self._store = LLMCache()
+                    except Exception:
+                        logger.warning("LLM 캐시 저장소를 열 수 없어 캐시/사용량 집계 없이 진행합니다.", exc_info=True)
+                        self._store_failed = True
+        return self._store
+
+    def _store_call(self, method, *args, **kwargs):
+        """저장소 메서드를 호출합니다. 실패(DB 잠김 등)하면 로그만 남기고 None을 반환합니다."""
+        store = self.store
+        if store is None:
+            return None
+        try:
+            return getattr(store, method)(*args, **kwargs)
+        except Exception:
+            logger.warning("LLM 캐시 저장소 %s 실패 - 건너뜁니다.", method, exc_info=True)
+            return None
+
+    @property
+    def configured(self):
+        """API 키가 설정되어 있고 플레이스홀더가 아닌지 확인합니다."""
+        return bool(self.api_key) and "YOUR_OPENAI_API_KEY" not in self.api_key
+
+    @property
+    def client(self):
+        """공유 OpenAI 클라이언트. (httpx 연결 풀 재사용, SDK 자체 재시도는 끄고 게이트웨이에서 재시도)"""
+        if self._client is None:
+            with self._lock:
+                if self._client is None:
+                    import httpx
+                    from openai import OpenAI
+                    http_client = httpx.Client(
+                        limits=httpx.Limits(max_connections=self.max_concurrency * 2,
+                                            max_keepalive_connections=self.max_concurrency,
+                                            keepalive_expiry=300),
+                        timeout=self.timeout,
+                    )
+                    self._client = OpenAI(api_key=self.api_key, http_client=http_client,
+                                          max_retries=0, timeout=self.timeout)
+        return self._client
+
+    # --- 응답 캐시 ---
+    def _cache_get(self, key):
+        with self._lock:
+            if key in self._cache:
+                self._cache.move_to_end(key)
+                return self._cache[key]
+        value = self._store_call('get', key)
+        if value is not None:
+            self._memory_put(key, value)
+        return value
+
+    def _memory_put(self, key, value):
+        with self._lock:
+            self._cache[key] = value
+            self._cache.move_to_end(key)
+            while len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+
+    def _cache_put(self, key, value, site, model):
+        self._memory_put(key, value)
+        self._store_call('put', key, value, site=site, model=model)
+
+    def _cache_evict(self, key):
+        with self._lock:
+            self._cache.pop(key, None)
+        self._store_call('delete', key)
+
+    def clear_cache(self):
+        with self._lock:
+            self._cache.clear()
+        self._store_call('clear')
+
+    @staticmethod
+    def _is_valid(content, validate):
+        if validate is None:
+            return True
+        try:
+            return validate(content) is not False
+        except Exception:
+            return False
+
+    # --- 호출 ---
+    def _is_retryable(self, error):
+        import openai
+        return isinstance(error, (openai.APIConnectionError, openai.APITimeoutError,
+                                  openai.RateLimitError, openai.InternalServerError))
+
+    def _create(self, model, messages, timeout, params):
+        attempt = 0
+        while True:
+            try:
+                with self._semaphore:
+                    return self.client.chat.completions.create(
+                        model=model, messages=messages, timeout=timeout or self.timeout, **params)
+            except Exception as e:
+                if attempt >= self.max_retries or not self._is_retryable(e):
+                    raise
+                time.sleep(self.backoff * (2 ** attempt) * (1 + random.random()))
+                attempt += 1
+
+    def chat(self, messages, model=DEFAULT_MODEL, site="default", cache=None, timeout=None, validate=None, **params):
+        """
+        chat completion을 호출하고 응답 텍스트를 반환합니다.
+        site: 호출 위치 이름 (예: 'p2.summary') - 사용량 집계 단위
+        cache: 같은 입력의 응답을 재사용할지 여부 (None이면 temperature=0일 때만 캐시)
+        validate: 응답 검증 함수. 예외를 내거나 False를 반환하면 캐시하지 않음 (응답은 그대로 반환)
+        params: temperature, max_tokens, response_format 등 SDK에 그대로 전달할 인자
+        """
+        if not self.configured:
+            raise ConnectionError("OpenAI API 키가 설정되지 않았습니다.")
+        if cache is None:
+            cache = params.get('temperature') == 0
+        started = time.perf_counter()
+        key = cache_key(model, messages, params) if cache else None
+        if key is not None:
+            cached = self._cache_get(key)
+            if cached is not None and not self._is_valid(cached, validate):
+                self._cache_evict(key)
+                cached = None
+            if cached is not None:
+                self._store_call('record', site, model, (time.perf_counter() - started) * 1000, cache_hit=True)
+                return cached
+
+        try:
+            response = self._create(model, messages, timeout, params)
+        except Exception:
+            self._store_call('record', site, model, (time.perf_counter() - started) * 1000, error=True)
+            raise
+        content = response.choices[0].message.content
+        usage = getattr(response, 'usage', None)
+        self._store_call('record', site, model, (time.perf_counter() - started) * 1000,
+                         prompt_tokens=getattr(usage, 'prompt_tokens', 0),
+                         completion_tokens=getattr(usage, 'completion_tokens', 0))
+        if key is not None and content is not None and self._is_valid(content, validate):
+            self._cache_put(key, content, site, model)
+        return content
+
+
+_gateway = None
+_gateway_lock = threading.Lock()
+
+
+def get_gateway():
+    """프로세스 공유 LLMGateway를 반환합니다."""
+    global _gateway
+    if _gateway is None:
+        with _gateway_lock:
+            if _gateway is None:
+                _gateway = LLMGateway()
+    return _gateway
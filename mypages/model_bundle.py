@@ -0,0 +1,219 @@
+# mypages/model_bundle.py
+"""
+니켈 가격 예측용 모델 번들.
+
+df_model.pkl / final_model.pkl / scaler.pkl / feature_cols.pkl 네 개의 pickle을
+하나의 버전 관리 디렉터리로 묶어, 모든 페이지와 P8 에이전트가 같은 로더를 사용하도록 합니다.
+
+번들 구조 (cache/model_bundle/):
+    CURRENT            - 현재 번들 버전 디렉터리 이름 (os.replace로 한 번에 교체)
+    v<시각>-<pid>/      - 번들 버전 하나
+        manifest.json  - 포맷 버전, 컬럼 목록, feature_cols, 스케일러 파라미터, 원본 파일 정보
+        matrix.npy     - 전처리된 데이터 (float32, 행=날짜, 열=[feature_cols..., 기타 수치 컬럼])  ← mmap 로딩
+        dates.npy      - 날짜 인덱스 (datetime64[ns])
+        model.joblib   - 학습된 모델
+
+재생성은 새 버전 디렉터리에 모두 쓴 뒤 CURRENT만 원자적으로 바꾸므로, 다른 프로세스(앱, backtest/sweep)가
+로딩하는 도중에도 번들이 비는 순간이 없고, 두 프로세스가 동시에 재생성해도 서로의 결과를 지우지 않습니다.
+(마지막으로 CURRENT를 바꾼 쪽이 이기며 둘 다 유효한 번들) 이전 버전은 KEEP_OLD_VERSIONS개만 남기고 정리합니다.
+
+사용법:
+    python -m mypages.model_bundle    # 번들 (재)생성
+"""
+import os
+import json
+import shutil
+import time
+from dataclasses import dataclass, field
+import numpy as np
+import pandas as pd
+import joblib
+
+# --- 경로 설정 ---
+try:
+    script_dir = os.path.dirname(os.path.abspath(__file__))
+    project_root = os.path.abspath(os.path.join(script_dir, os.pardir))
+except NameError:
+    project_root = os.getcwd()
+
+DF_MODEL_PATH = os.path.join(project_root, 'df_model.pkl')
+MODEL_PATH = os.path.join(project_root, 'final_model.pkl')
+FEATURE_COLS_PATH = os.path.join(project_root, 'feature_cols.pkl')
+SCALER_PATH = os.path.join(project_root, 'scaler.pkl')
+SOURCE_PATHS = {'df_model': DF_MODEL_PATH, 'model': MODEL_PATH, 'feature_cols': FEATURE_COLS_PATH, 'scaler': SCALER_PATH}
+
+BUNDLE_DIR = os.path.join(project_root, 'cache', 'model_bundle')
+BUNDLE_FORMAT_VERSION = 1
+POINTER_FILE = 'CURRENT'
+KEEP_OLD_VERSIONS = 1  # 교체 직후 아직 읽고 있을 수 있는 직전 버전은 남김
+_LEGACY_FILES = ('manifest.json', 'matrix.npy', 'dates.npy', 'model.joblib')
+
+
+class BundleScaler:
+    """StandardScaler의 mean/scale만 보관하는 경량 스케일러 (sklearn 없이 transform 가능)."""
+
+    def __init__(self, mean, scale):
+        self.mean_ = np.asarray(mean, dtype=np.float64)
+        self.scale_ = np.asarray(scale, dtype=np.float64)
+
+    def transform(self, X):
+        X = X.to_numpy() if isinstance(X, pd.DataFrame) else np.asarray(X)
+        return (X - self.mean_) / self.scale_
+
+
+@dataclass
+class ModelBundle:
+    dates: pd.DatetimeIndex
+    matrix: np.ndarray
+    columns: list
+    feature_cols: list
+    model: object
+    scaler: BundleScaler
+    manifest: dict = field(default_factory=dict)
+
+    @property
+    def features(self):
+        """feature_cols 부분의 float32 행렬 (복사 없는 view)."""
+        return self.matrix[:, :len(self.feature_cols)]
+
+    def column(self, name):
+        return self.matrix[:, self.columns.index(name)]
+
+    def frame(self):
+        """기존 load_full_processed_data와 같은 형태(date 인덱스)의 DataFrame을 반환합니다."""
+        return pd.DataFrame(self.matrix, index=self.dates, columns=self.columns, copy=False)
+
+    def row_index(self, date):
+        """주어진 날짜 이전(포함)의 마지막 행 번호를 반환합니다. 없으면 None."""
+        pos = int(self.dates.searchsorted(pd.Timestamp(date), side='right')) - 1
+        return pos if pos >= 0 else None
+
+
+# --- 번들 생성 ---
+def _source_info():
+    info = {}
+    for key, path in SOURCE_PATHS.items():
+        st_ = os.stat(path)
+        info[key] = {'size': st_.st_size, 'mtime_ns': st_.st_mtime_ns}
+    return info
+
+
+def _prepare_frame(df, feature_cols):
+    """p2/purchase_utils에서 사용하던 전처리와 동일하게 정리합니다."""
+    df = df.copy()
+    df['date'] = pd.to_datetime(df['date'], errors='coerce')
+    df.dropna(subset=['Ni_price'], inplace=True)
+    df = df.dropna(subset=feature_cols)
+    return df.sort_values(by='date').drop_duplicates(subset=['date'], keep='first').set_index('date')
+
+
+def build_bundle(bundle_dir=BUNDLE_DIR):
+    """원본 pickle 네 개로부터 번들을 생성합니다."""
+    df = pd.read_pickle(DF_MODEL_PATH)
+    feature_cols = list(joblib.load(FEATURE_COLS_PATH))
+    model = joblib.load(MODEL_PATH)
+    scaler = joblib.load(SCALER_PATH)
+
+    df = _prepare_frame(df, feature_cols)
+    if df.empty:
+        raise ValueError("모델 예측에 사용할 수 있는 유효한 데이터가 없습니다.")
+    numeric_cols = [c for c in df.select_dtypes(include='number').columns if c not in feature_cols]
+    columns = feature_cols + numeric_cols
+
+    os.makedirs(bundle_dir, exist_ok=True)
+    version = f"v{time.time_ns()}-{os.getpid()}"
+    version_dir = os.path.join(bundle_dir, version)
+    os.makedirs(version_dir)
+    np.save(os.path.join(version_dir, 'matrix.npy'), np.ascontiguousarray(df[columns].to_numpy(dtype=np.float32)))
+    np.save(os.path.join(version_dir, 'dates.npy'), df.index.values.astype('datetime64[ns]'))
+    joblib.dump(model, os.path.join(version_dir, 'model.joblib'))
+    manifest = {
+        'format_version': BUNDLE_FORMAT_VERSION,
+        'created_at': time.strftime('%Y-%m-%d %H:%M:%S'),
+        'n_rows': int(len(df)),
+        'dtype': 'float32',
+        'columns': columns,
+        'feature_cols': feature_cols,
+        'scaler': {'mean': np.asarray(scaler.mean_).tolist(), 'scale': np.asarray(scaler.scale_).tolist()},
+        'model_class': f"{type(model).__module__}.{type(model).__name__}",
+        'sources': _source_info(),
+    }
+    with open(os.path.join(version_dir, 'manifest.json'), 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, ensure_ascii=False, indent=2)
+
+    _switch_version(bundle_dir, version)
+    return manifest
+
+
+def _switch_version(bundle_dir, version):
+    """CURRENT 포인터를 version으로 원자적으로 바꾸고 오래된 버전을 정리합니다."""
+    pointer_tmp = os.path.join(bundle_dir, f"{POINTER_FILE}.tmp{os.getpid()}")
+    with open(pointer_tmp, 'w', encoding='utf-8') as f:
+        f.write(version)
+    os.replace(pointer_tmp, os.path.join(bundle_dir, POINTER_FILE))
+
+    # manifest.json은 마지막에 쓰므로, 없는 디렉터리는 다른 프로세스가 아직 만드는 중일 수 있어 건드리지 않음
+    old_versions = sorted((d for d in os.listdir(bundle_dir)
+                           if d.startswith('v') and d != version
+                           and os.path.exists(os.path.join(bundle_dir, d, 'manifest.json'))),
+                          key=lambda d: os.path.getmtime(os.path.join(bundle_dir, d)), reverse=True)
+    for old in old_versions[KEEP_OLD_VERSIONS:]:
+        shutil.rmtree(os.path.join(bundle_dir, old), ignore_errors=True)  # 사용 중(Windows)이면 다음 번에 정리
+    for name in _LEGACY_FILES:  # 버전 디렉터리 도입 이전의 번들 파일
+        try:
+            os.remove(os.path.join(bundle_dir, name))
+        except OSError:
+            pass
+
+
+def current_version_dir(bundle_dir=BUNDLE_DIR):
+    """현재 번들 버전 디렉터리 경로. 포인터가 없으면 이전 형식(bundle_dir 바로 아래 파일) 경로를 반환합니다."""
+    try:
+        with open(os.path.join(bundle_dir, POINTER_FILE), 'r', encoding='utf-8') as f:
+            version = f.read().strip()
+    except OSError:
+        return bundle_dir
+    return os.path.join(bundle_dir, version) if version else bundle_dir
+
+
+def _read_manifest(version_dir):
+    try:
+        with open(os.path.join(version_dir, 'manifest.json'), 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def is_bundle_stale(bundle_dir=BUNDLE_DIR):
+    """번들이 없거나, 포맷 버전 또는 원본 pickle이 바뀌었으면 True."""
+    manifest = _read_manifest(current_version_dir(bundle_dir))
+    if manifest is None or manifest.get('format_version') != BUNDLE_FORMAT_VERSION:
+        return True
+    try:
+        return manifest.get('sources') != _source_info()
+    except FileNotFoundError:
+        return False  # 원본이 없으면 기존 번들을 그대로 사용
+
+
+# --- 번들 로딩 ---
+def load_bundle(bundle_dir=BUNDLE_DIR, mmap=True):
+    """
+    번들을 로드합니다. 번들이 없거나 오래되었으면 원본 pickle로 다시 생성합니다.
+    mmap=True이면 matrix.npy를 메모리 매핑하여 필요한 페이지만 읽습니다.
+    """
+    if is_bundle_stale(bundle_dir):
+        build_bundle(bundle_dir)
+    # 포인터를 한 번만 읽어 같은 버전 디렉터리에서 모든 파일을 로드
+    version_dir = current_version_dir(bundle_dir)
+    manifest = _read_manifest(version_dir)
+    matrix = np.load(os.path.join(version_dir, 'matrix.npy'), mmap_mode='r' if mmap else None)
+    dates = pd.DatetimeIndex(np.load(os.path.join(version_dir, 'dates.npy')), name='date')
+    model = joblib.load(os.path.join(version_dir, 'model.joblib'))
+    scaler = BundleScaler(manifest['scaler']['mean'], manifest['scaler']['scale'])
+    return ModelBundle(dates=dates, matrix=matrix, columns=manifest['columns'],
+                       feature_cols=manifest['feature_cols'], model=model, scaler=scaler, manifest=manifest)
+
+
+if __name__ == '__main__':
+    info = build_bundle()
+    print(f"모델 번들 생성 완료: {current_version_dir()} ({info['n_rows']}행, {len(info['columns'])}열, v{info['format_version']})")
@@ -0,0 +1,167 @@
+# mypages/news_utils.py
+"""
+Google Custom Search 뉴스 조회 계층.
+
+- 재사용 클라이언트: requests.Session 하나로 Custom Search JSON API를 직접 호출 (keep-alive)
+- 디스크 캐시: (검색어, 날짜 구간, 개수) 키별 JSON 파일 (cache/news/), TTL 이후 재조회
+- 요청 병합: 같은 키로 진행 중인 요청이 있으면 새 요청을 보내지 않고 그 결과를 함께 기다림
+- 백그라운드 프리페치: 최신 구간 검색을 미리 실행해 두어 분석 요청 시 캐시에서 바로 응답
+
+GOOGLE_CSE_ENDPOINT 환경 변수로 API 주소를 바꿀 수 있습니다. (로컬 fixture 서버: scripts/news_fixture_server.py)
+"""
+import os
+import json
+import time
+import hashlib
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from datetime import timedelta
+import pandas as pd
+
+from mypages.explain_utils import CACHE_DIR
+from mypages.analysis_cache import NEWS_TTL_SECONDS
+
+# --- 상수 정의 ---
+NEWS_CACHE_DIR = os.path.join(CACHE_DIR, 'news')
+DEFAULT_ENDPOINT = "https://www.googleapis.com/customsearch/v1"
+NEWS_WINDOW_DAYS = 14
+REQUEST_TIMEOUT = 10
+
+
+def news_window(end_date, days=NEWS_WINDOW_DAYS):
+    """기준일로부터 days일 전까지의 (시작일, 종료일) 구간을 반환합니다."""
+    end = pd.to_datetime(end_date).normalize()
+    return end - timedelta(days=days), end
+
+
+class NewsClient:
+    """세션 재사용, 디스크 캐시, 요청 병합, 프리페치를 지원하는 뉴스 검색 클라이언트."""
+
+    def __init__(self, api_key, cse_id, endpoint=None, cache_dir=NEWS_CACHE_DIR,
+                 ttl=NEWS_TTL_SECONDS, timeout=REQUEST_TIMEOUT):
+        self.api_key = api_key
+        self.cse_id = cse_id
+        self.endpoint = endpoint or os.getenv("GOOGLE_CSE_ENDPOINT") or DEFAULT_ENDPOINT
+        self.cache_dir = cache_dir
+        self.ttl = ttl
+        self.timeout = timeout
+        self._session = None
+        self._lock = threading.Lock()
+        self._inflight = {}
+        self._executor = None
+        self.stats = {"network": 0, "disk_hits": 0, "coalesced": 0}
+
+    # --- 내부 헬퍼 ---
+    @property
+    def session(self):
+        if self._session is None:
+            import requests
+            with self._lock:
+                if self._session is None:
+                    self._session = requests.Session()
+        return self._session
+
+    @staticmethod
+    def cache_key(query, start_date, end_date, num):
+        window = f"{pd.to_datetime(start_date):%Y%m%d}:{pd.to_datetime(end_date):%Y%m%d}"
+        raw = f"{query}|{window}|{num}"
+        return f"{pd.to_datetime(end_date):%Y%m%d}_{hashlib.sha256(raw.encode('utf-8')).hexdigest()[:16]}"
+
+    def _cache_path(self, key):
+        return os.path.join(self.cache_dir, f"{key}.json")
+
+    def _read_cache(self, key):
+        path = self._cache_path(key)
+        if not os.path.exists(path):
+            return None
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                entry = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if time.time() - entry.get('fetched_at', 0) >= self.ttl:
+            return None
+        return entry.get('items', [])
+
+    def _write_cache(self, key, query, items):
+        os.makedirs(self.cache_dir, exist_ok=True)
+        path = self._cache_path(key)
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump({"query": query, "fetched_at": time.time(), "items": items}, f, ensure_ascii=False)
+        os.replace(tmp_path, path)
+
+    def _fetch(self, query, start_date, end_date, num):
+        params = {
+            "key": self.api_key, "cx": self.cse_id, "q": query, "num": num, "lr": "lang_ko",
+            "sort": f"date:r:{pd.to_datetime(start_date):%Y%m%d}:{pd.to_datetime(end_date):%Y%m%d}",
+        }
+        self.stats["network"] += 1
+        res = self.session.get(self.endpoint, params=params, timeout=self.timeout)
+        res.raise_for_status()
+        items = res.json().get('items', [])
+        return [{k: item.get(k) for k in ('title', 'link', 'snippet')} for item in items]
+
+    # --- 공개 API ---
+    def search(self, query, start_date, end_date, num=5):
+        """
+        뉴스 검색 결과 리스트를 반환합니다. 오류 시 {"error": ...} 딕셔너리를 반환합니다.
+        디스크 캐시 → 진행 중인 동일 요청 → 네트워크 순서로 조회합니다.
+        """
+        if not self.api_key or not self.cse_id:
+            return {"error": "Google API 키 또는 CSE ID가 설정되지 않았습니다."}
+        key = self.cache_key(query, start_date, end_date, num)
+        items = self._read_cache(key)
+        if items is not None:
+            self.stats["disk_hits"] += 1
+            return items
+
+        with self._lock:
+            future = self._inflight.get(key)
+            owner = future is None
+            if owner:
+                future = Future()
+                self._inflight[key] = future
+            else:
+                self.stats["coalesced"] += 1
+        if not owner:
+            return future.result()
+
+        try:
+            result = self._fetch(query, start_date, end_date, num)
+            self._write_cache(key, query, result)
+        except Exception as e:
+            result = {"error": f"뉴스 검색 중 오류 발생: {e}"}
+        finally:
+            with self._lock:
+                self._inflight.pop(key, None)
+        future.set_result(result)
+        return result
+
+    def prefetch(self, query, start_date, end_date, num=5):
+        """검색을 백그라운드 스레드에서 실행하고 Future를 반환합니다. 결과는 디스크 캐시에 저장됩니다."""
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix="news-prefetch")
+        return self._executor.submit(self.search, query, start_date, end_date, num)
+
+    def prefetch_latest(self, query, latest_date, num=5, days=NEWS_WINDOW_DAYS):
+        """최신 기준일 구간의 검색을 미리 실행합니다. 이미 캐시되어 있으면 아무것도 하지 않습니다."""
+        start_date, end_date = news_window(latest_date, days)
+        if self._read_cache(self.cache_key(query, start_date, end_date, num)) is not None:
+            return None
+        return self.prefetch(query, start_date, end_date, num)
+
+
+_client = None
+_client_lock = threading.Lock()
+
+
+def get_client():
+    """환경 변수 설정으로 만든 공유 NewsClient를 반환합니다."""
+    global _client
+    if _client is None:
+        with _client_lock:
+            if _client is None:
+                _client = NewsClient(os.getenv("GOOGLE_API_KEY"), os.getenv("GOOGLE_CSE_ID"))
+    return _client
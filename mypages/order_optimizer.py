@@ -0,0 +1,119 @@
+# mypages/order_optimizer.py
+"""
+가격 예측 × 수요 계획 × 리드타임을 결합한 발주 일정 최적화 (Wagner-Whitin 동적 계획법).
+
+- 가격: P2 모델의 7일 후 예측가까지 일별 선형 보간, 이후는 예측가 유지 (발주일 가격으로 구매)
+- 수요: P1 계획의 주간 소요량(또는 재고 이력 일평균)을 일 단위로 펼친 뒤, 현재고 - 안전재고로 먼저 충당하고 남는 순소요량
+- 리드타임: d일에 발주하면 d + 리드타임 일에 입고. 리드타임 이전의 소요는 새 발주로 채울 수 없으므로
+  현재고를 넘는 부분은 '불가피한 결품'(unavoidable_shortage), 안전재고를 헐어 쓰는 부분은 'safety_stock_use'로 따로 보고
+
+비용 = 발주 고정비 + 구매가(발주일 단가 × 수량) + 보관비(단가 × 일 보관률 × 보관 일수 × 수량)
+입고일 a에 도착하는 발주가 a..b일의 순소요량을 모두 충당하는 비용 C[a, b]를 누적합으로 한 번에 (H × H) 배열로 만들고,
+F[b+1] = min_a F[a] + C[a, b] 를 b마다 벡터 최솟값으로 풉니다. 기간 H=56일 기준 수 ms 이내라 P8 질문마다 다시 풀 수 있습니다.
+
+사용법:
+    plan = optimize_order_schedule(current_price, predicted_price, daily_demand=50, current_stock=1000,
+                                   safety_stock=200, lead_time=10)
+"""
+from datetime import date, timedelta
+import numpy as np
+
+# --- 상수 정의 (비용 가정) ---
+PLANNING_HORIZON_DAYS = 56
+FORECAST_DAYS = 7                  # P2 예측 시점 (7일 후)
+ORDER_COST = 1000.0                # 발주 1건당 고정비 (가격과 같은 통화)
+HOLDING_RATE_PER_DAY = 0.20 / 365  # 연 20% 보관/자금 비용
+PRICE_UNIT_KG = 1000               # 가격은 톤당, 수량은 kg
+
+
+def price_path(current_price, predicted_price, horizon=PLANNING_HORIZON_DAYS, forecast_days=FORECAST_DAYS):
+    """일별 예상 단가(톤당). 예측 시점까지 선형 보간하고 이후는 예측가를 유지합니다."""
+    days = np.arange(horizon)
+    return current_price + (predicted_price - current_price) * np.minimum(days / forecast_days, 1.0)
+
+
+def net_requirements(daily_demand, current_stock, safety_stock=0.0, horizon=PLANNING_HORIZON_DAYS):
+    """일별 수요에서 (현재고 - 안전재고)로 충당되는 부분을 뺀 순소요량 배열."""
+    demand = np.broadcast_to(np.asarray(daily_demand, dtype=float), (horizon,))
+    available = max(current_stock - safety_stock, 0.0)
+    covered = np.minimum(np.cumsum(demand), available)
+    return demand - np.diff(covered, prepend=0.0)
+
+
+def _coverage_costs(net, unit_cost, lead_time, order_cost, holding_rate):
+    """C[a, b]: a일에 입고(발주일 a - lead_time)되어 a..b일 순소요량을 충당하는 비용. 불가능한 조합은 inf."""
+    horizon = len(net)
+    days = np.arange(horizon)
+    cum_qty = np.concatenate(([0.0], np.cumsum(net)))
+    cum_day_qty = np.concatenate(([0.0], np.cumsum(days * net)))
+    a, b = days[:, None], days[None, :]
+    qty = cum_qty[b + 1] - cum_qty[a]
+    carried = (cum_day_qty[b + 1] - cum_day_qty[a]) - a * qty  # Σ (j - a)·n_j
+    price = unit_cost[np.clip(days - lead_time, 0, horizon - 1)][:, None]
+    cost = order_cost + price * qty + price * holding_rate * carried
+    return np.where((b >= a) & (days[:, None] >= lead_time), cost, np.inf), qty
+
+
+def optimize_order_schedule(current_price, predicted_price, daily_demand, current_stock, safety_stock=0.0,
+                            lead_time=14, horizon=PLANNING_HORIZON_DAYS, order_cost=ORDER_COST,
+                            holding_rate=HOLDING_RATE_PER_DAY, start_date=None):
+    """
+    비용 최소 발주 일정을 계산합니다.
+    반환: schedule(발주 목록), total_cost, 비용 내역, 리드타임 이전 불가피한 결품량 / 안전재고 사용량,
+          오늘 한 번에 기간 전체를 발주(리드타임 후 입고)하는 경우 대비 절감액
+    """
+    start_date = start_date or date.today()
+    lead_time = int(max(lead_time, 0))
+    prices = price_path(current_price, predicted_price, horizon)
+    unit_cost = prices / PRICE_UNIT_KG
+    net = net_requirements(daily_demand, current_stock, safety_stock, horizon)
+
+    # 리드타임 이전 소요는 새 발주로 충당할 수 없음: 현재고를 넘는 부분은 결품, 나머지는 안전재고 사용
+    demand = np.broadcast_to(np.asarray(daily_demand, dtype=float), (horizon,))
+    unavoidable = max(float(demand[:lead_time].sum()) - max(current_stock, 0.0), 0.0)
+    safety_use = float(net[:lead_time].sum()) - unavoidable
+    net = net.copy()
+    net[:lead_time] = 0.0
+    first = next((d for d in range(lead_time, horizon) if net[d] > 0), None)
+    if first is None:
+        return {"schedule": [], "total_cost": 0.0, "purchase_cost": 0.0, "holding_cost": 0.0, "order_cost": 0.0,
+                "unavoidable_shortage": unavoidable, "safety_stock_use": safety_use, "baseline_cost": 0.0, "savings": 0.0,
+                "horizon_days": horizon, "lead_time": lead_time}
+
+    cost, qty = _coverage_costs(net, unit_cost, lead_time, order_cost, holding_rate)
+    # 첫 순소요 전의 0 수요 구간은 비용 없이 건너뜀
+    best = np.full(horizon + 1, np.inf)
+    best[:first + 1] = 0.0
+    choice = np.zeros(horizon + 1, dtype=int)
+    for b in range(first, horizon):
+        if net[b] == 0:
+            best[b + 1], choice[b + 1] = best[b], -1
+            continue
+        candidates = best[:b + 1] + cost[:b + 1, b]
+        a = int(np.argmin(candidates))
+        best[b + 1], choice[b + 1] = candidates[a], a
+
+    schedule, b = [], horizon
+    while b > first:
+        a = choice[b]
+        if a < 0:
+            b -= 1
+            continue
+        order_day = a - lead_time
+        schedule.append({
+            "order_day": order_day, "order_date": start_date + timedelta(days=order_day),
+            "arrival_date": start_date + timedelta(days=a), "covers_until": start_date + timedelta(days=b - 1),
+            "qty": float(qty[a, b - 1]), "unit_price": float(prices[order_day]), "cost": float(cost[a, b - 1]),
+        })
+        b = a
+    schedule.reverse()
+
+    purchase = sum(o["qty"] * o["unit_price"] / PRICE_UNIT_KG for o in schedule)
+    ordering = order_cost * len(schedule)
+    total = float(best[horizon])
+    baseline = float(cost[lead_time, horizon - 1])  # 오늘 단가로 한 번 발주 → 리드타임 후 입고분으로 기간 전체 충당
+    return {
+        "schedule": schedule, "total_cost": total, "purchase_cost": purchase, "order_cost": ordering,
+        "holding_cost": total - purchase - ordering, "unavoidable_shortage": unavoidable, "safety_stock_use": safety_use,
+        "baseline_cost": baseline, "savings": baseline - total, "horizon_days": horizon, "lead_time": lead_time,
+    }
@@ -2,6 +2,21 @@
 import streamlit as st
 import pandas as pd
 from datetime import date, timedelta
+from mypages import stock_simulation as ss
+
+def _parse_options(text, default):
+    """'300, 350' 형식의 후보 값 입력을 float 리스트로 변환합니다. 비어 있으면 [default]."""
+    values = [float(v) for v in text.replace(' ', '').split(',') if v] if text else []
+    return values or [default]
+
+
+def _parse_receipts(text):
+    """'30:500, 60:500' 형식의 추가 입고 일정을 (일차 배열, 수량 배열)로 변환합니다. 비어 있으면 (None, None)."""
+    pairs = [item.split(':') for item in text.replace(' ', '').split(',') if item] if text else []
+    if not pairs:
+        return None, None
+    return [int(day) for day, _ in pairs], [float(qty) for _, qty in pairs]
+
 
 def page1():
     st.title("1. 계획(수요/발주 계획)")
@@ -24,6 +39,13 @@ def page1():
             lead_time = st.number_input("리드타임(입고까지 걸리는 일)", min_value=1, step=1, value=10)
             planning_weeks = st.number_input("시뮬레이션 기간(주)", min_value=4, step=1, value=20)
 
+        with st.expander("🔀 시나리오 비교 (선택)"):
+            st.caption("쉼표로 여러 값을 입력하면 모든 조합을 한 번에 시뮬레이션합니다. 비워두면 위 입력값을 사용합니다.")
+            usage_options = st.text_input("주간 소요량 후보", placeholder="예: 300, 350, 420")
+            lead_time_options = st.text_input("리드타임 후보(일)", placeholder="예: 7, 10, 14")
+            order_qty_options = st.text_input("발주량 후보", placeholder="예: 500, 800")
+            extra_receipts = st.text_input("추가 입고 일정 (일차:수량)", placeholder="예: 30:500, 60:500")
+
         submitted = st.form_submit_button("📦 발주 계획 계산하기")
 
     if not submitted:
@@ -61,9 +83,6 @@ def page1():
         days_until_safety = 0
         safety_stock_date = today
 
-    # 발주 입고 예정일
-    incoming_date = today + timedelta(days=lead_time)
-
     # 권장 발주일 계산
     days_until_order = days_until_safety - lead_time
     if days_until_order <= 0:
@@ -124,28 +143,48 @@ def page1():
     # 🔹 재고 추이 시뮬레이션 (입고 반영)
     # -----------------------------------------
     total_days = planning_weeks * 7
-    dates = []
-    stocks = []
-
-    stock = current_stock
-    for d in range(total_days):
-        current_date = today + timedelta(days=d)
-
-        # 매일 재고 감소
-        stock -= daily_usage
-        if stock < 0:
-            stock = 0
-
-        # 입고일 재고 증가
-        if current_date == incoming_date:
-            stock += order_qty
-
-        dates.append(current_date)
-        stocks.append(stock)
-
-    df = pd.DataFrame({"date": dates, "재고량": stocks})
+    try:
+        receipt_days, receipt_qtys = _parse_receipts(extra_receipts)
+        params = ss.scenario_grid(
+            weekly_usage=_parse_options(usage_options, weekly_usage),
+            lead_time=[int(v) for v in _parse_options(lead_time_options, lead_time)],
+            order_qty=_parse_options(order_qty_options, order_qty),
+        )
+    except ValueError:
+        st.error("시나리오 입력 형식을 확인해주세요. (예: 300, 350 / 30:500)")
+        return
+    base = ss.simulate_stock(current_stock, weekly_usage, lead_time, order_qty, total_days,
+                             safety_stock=safety_stock, receipt_days=receipt_days, receipt_qtys=receipt_qtys)
+    dates = [today + timedelta(days=d) for d in range(total_days)]
+    df = pd.DataFrame({"date": dates, "재고량": base['stock'][0]})
 
     st.subheader("📉 재고 추이 그래프 (입고 반영)")
     st.line_chart(df.set_index("date"))
 
+    n_scenarios = len(params['weekly_usage'])
+    if n_scenarios > 1:
+        result = ss.simulate_stock(current_stock, params['weekly_usage'], params['lead_time'], params['order_qty'],
+                                   total_days, safety_stock=safety_stock,
+                                   receipt_days=receipt_days, receipt_qtys=receipt_qtys)
+        table = ss.summarize(result, params, start_date=today).rename(
+            columns={'weekly_usage': '주간 소요량', 'lead_time': '리드타임(일)', 'order_qty': '발주량'})
+
+        st.subheader(f"🔀 시나리오 비교 ({n_scenarios}개)")
+        stockouts = int((result['stockout_day'] != ss.NO_STOCKOUT).sum())
+        colS1, colS2, colS3 = st.columns(3)
+        colS1.metric("결품 발생 시나리오", f"{stockouts} / {n_scenarios}")
+        colS2.metric("최악 최소 재고", f"{result['min_stock'].min():,.0f}")
+        colS3.metric("평균 안전재고 하회 일수", f"{result['days_below_safety'].mean():.1f}")
+        st.dataframe(table, use_container_width=True)
+
+        # 결품이 가장 빠른 시나리오와 가장 안정적인 시나리오 추이
+        worst, best = table.index[0], table.index[-1]
+        chart = pd.DataFrame({
+            "date": dates,
+            "기본 계획": base['stock'][0],
+            "최악 시나리오": result['stock'][worst],
+            "최선 시나리오": result['stock'][best],
+        })
+        st.line_chart(chart.set_index("date"))
+
     st.caption("※ 모든 계산은 '7일 = 1주' 기준입니다.")
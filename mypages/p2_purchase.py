@@ -2,19 +2,21 @@
 import streamlit as st
 import pandas as pd
 import numpy as np
-import joblib
 import os
 from dotenv import load_dotenv
-import plotly.graph_objects as go
-from datetime import datetime, timedelta
+from datetime import datetime
 import re
-from streamlit_chat import message
-import shap
-import openai
-from googleapiclient.discovery import build
 import time
-import requests
-from bs4 import BeautifulSoup
+from mypages import explain_utils as eu
+from mypages import analysis_cache
+from mypages import inference
+from mypages import news_utils
+from mypages import summarizer
+from mypages import llm_gateway
+from mypages import stock_simulation
+# 데이터/모델 로딩은 purchase_utils의 공유 모델 번들 로더를 사용합니다.
+from mypages.model_bundle import DF_MODEL_PATH, MODEL_PATH, FEATURE_COLS_PATH, SCALER_PATH
+from mypages.purchase_utils import load_full_processed_data, load_model_and_scaler
 
 # --- Path and Environment settings ---
 try:
@@ -25,12 +27,6 @@ try:
 except (NameError, FileNotFoundError):
     project_root = os.getcwd()
 
-# --- Path settings ---
-DF_MODEL_PATH = os.path.join(project_root, 'df_model.pkl')
-MODEL_PATH = os.path.join(project_root, 'final_model.pkl')
-FEATURE_COLS_PATH = os.path.join(project_root, 'feature_cols.pkl')
-SCALER_PATH = os.path.join(project_root, 'scaler.pkl')
-
 # --- Load environment variables ---
 GOOGLE_API_KEY = os.getenv("GOOGLE_API_KEY")
 GOOGLE_CSE_ID = os.getenv("GOOGLE_CSE_ID")
@@ -45,48 +41,35 @@ KEYWORD_MAP = {
 }
 
 # --- Data/Model Loading Functions (with Caching) ---
-@st.cache_data
-def load_full_processed_data():
-    try:
-        df = pd.read_pickle(DF_MODEL_PATH)
-        feature_cols = joblib.load(FEATURE_COLS_PATH)
-    except FileNotFoundError: return None, None
-    df['date'] = pd.to_datetime(df['date'], errors='coerce')
-    df.dropna(subset=['Ni_price'], inplace=True)
-    df_filtered = df.dropna(subset=feature_cols).copy()
-    if df_filtered.empty: return None, None
-    df_filtered = df_filtered.sort_values(by='date').drop_duplicates(subset=['date'], keep='first').set_index('date')
-    return df_filtered, feature_cols
-
-@st.cache_resource
-def load_model_and_scaler():
-    try:
-        model = joblib.load(MODEL_PATH)
-        scaler = joblib.load(SCALER_PATH)
-        return model, scaler
-    except FileNotFoundError: return None, None
+def model_artifacts_key():
+    """
+    Content hash of every artifact that shapes an analysis result (model, scaler, training data, feature list).
+    Used by both the SHAP attribution cache and the per-date price analysis cache.
+    """
+    return ":".join(str(eu.file_hash(p)) for p in (MODEL_PATH, SCALER_PATH, DF_MODEL_PATH, FEATURE_COLS_PATH))
 
 @st.cache_resource
 def load_shap_explainer(_model, _scaler, background_data):
+    """
+    Builds a model-aware explainer (linear/tree, or a cached permutation explainer otherwise)
+    and attaches SHAP attributions precomputed for every historical date.
+    """
     if _model is None or background_data is None or _scaler is None: return None
-    def predict_fn(X):
-        X_df = pd.DataFrame(X, columns=background_data.columns)
-        X_scaled = _scaler.transform(X_df)
-        return _model.predict(X_scaled)
-    background_summary = shap.sample(background_data, 50) 
-    return shap.KernelExplainer(predict_fn, background_summary)
+    explainer = eu.build_explainer(_model, _scaler, background_data)
+    # 모델/스케일러뿐 아니라 학습 데이터(df_model.pkl)와 피처 목록이 바뀌어도 저장된 SHAP 값을 다시 계산
+    eu.load_or_build_attributions(explainer, background_data, model_artifacts_key())
+    return explainer
 
 # --- Analysis/Prediction/Search Functions ---
 def predict_price(model, features, data, scaler):
     if any(v is None for v in [model, features, data, scaler]): return None
-    input_data = data[features].values.reshape(1, -1)
-    scaled_input_data = scaler.transform(input_data)
-    return model.predict(scaled_input_data)[0]
+    input_data = data if isinstance(data, np.ndarray) else data[features].to_numpy()
+    return inference.get_predictor(model, scaler).predict_one(input_data)
 
-def get_top_shap_features(explainer, input_data, feature_names, top_n=3):
+def get_top_shap_features(explainer, input_data, feature_names, top_n=3, date=None):
     if explainer is None: return {"error": "SHAP explainer not loaded."}
     try:
-        shap_values = explainer.shap_values(input_data, nsamples=50)
+        shap_values = explainer.shap_values(input_data, dates=[date] if date is not None else None)
         if isinstance(shap_values, list): shap_values = shap_values[0]
         if len(shap_values.shape) > 1: shap_values = shap_values[0]
         feature_importance = pd.DataFrame(list(zip(feature_names, np.abs(shap_values))), columns=['feature', 'importance'])
@@ -96,61 +79,57 @@ def get_top_shap_features(explainer, input_data, feature_names, top_n=3):
     except Exception as e: return {"error": f"SHAP 분석 오류: {e}"}
 
 def search_google_news(query, start_date, end_date, num=5):
-    if not GOOGLE_API_KEY or not GOOGLE_CSE_ID:
-        return {"error": "Google API 키 또는 CSE ID가 설정되지 않았습니다."}
-    try:
-        service = build("customsearch", "v1", developerKey=GOOGLE_API_KEY)
-        sort_by_date = f"date:r:{start_date.strftime('%Y%m%d')}:{end_date.strftime('%Y%m%d')}"
-        res = service.cse().list(q=query, cx=GOOGLE_CSE_ID, num=num, sort=sort_by_date, lr='lang_ko').execute()
-        return res.get('items', [])
-    except Exception as e: return {"error": f"뉴스 검색 중 오류 발생: {e}"}
+    """Searches news through the shared NewsClient (disk-cached, coalesced)."""
+    return news_utils.get_client().search(query, start_date, end_date, num=num)
+
+def build_news_query(shap_keywords):
+    return "니켈" + (" (" + " OR ".join(sorted(shap_keywords)) + ")" if shap_keywords else "")
 
 def perform_price_analysis(current_context_data, explainer, feature_cols, selected_date):
     """
     Analyzes price fluctuation causes using SHAP and Google News.
     Returns a dictionary with structured data, not a formatted string.
+    Results are cached per (model/scaler/df_model/feature_cols hashes, date); only the news part expires.
     """
     prefix_desc = {"lag": "니켈 가격 자체 동향", "ma": "기술적 분석", "PC_COM": "원자재 시장", "PMI": "제조업 경기", "CPI": "인플레이션", "ret": "투자 심리", "GB": "미국 국채 금리"}
 
-    # 1. SHAP Analysis
-    input_data_df = pd.DataFrame([current_context_data[feature_cols].values], columns=feature_cols)
-    top_features = get_top_shap_features(explainer, input_data_df, feature_cols, top_n=3)
-    if isinstance(top_features, dict) and 'error' in top_features:
-        return top_features
-
-    # 2. Smart Keyword Generation
-    PREFIX_KEYWORD_MAP = {'lag': ['니켈 가격'], 'ma': ['기술적 분석'], 'ret': ['니켈 변동성'], 'PC_fin': ['금융 시장'], 'PC_COM': ['원자재', '비철금속', 'LME'], 'PMI': ['PMI', '제조업'], 'CPI': ['CPI', '물가'], 'PPI': ['PPI'], 'GB': ['국채 금리'], 'VIX': ['VIX 지수'], 'Dollar': ['달러 인덱스'], 'NASDAQ': ['나스닥'], 'Gold': ['금 가격'], 'Cu': ['구리 가격'], 'Al': ['알루미늄 가격'], 'Dubai_Oil': ['유가']}
-    shap_keywords = []
-    for feature in top_features:
-        found_prefix = False
-        for prefix, keywords in PREFIX_KEYWORD_MAP.items():
-            if feature.startswith(prefix):
-                shap_keywords.extend(keywords)
-                found_prefix = True; break
-        if not found_prefix and KEYWORD_MAP.get(feature):
-            shap_keywords.append(KEYWORD_MAP.get(feature))
-    if not shap_keywords: shap_keywords.append('니켈 가격')
-    shap_keywords = list(set(filter(None, shap_keywords)))
+    # 0. Analysis Cache
+    cache_key = analysis_cache.make_key(model_artifacts_key(), selected_date)
+    cached = analysis_cache.load_entry(cache_key)
+    if analysis_cache.is_news_fresh(cached):
+        return cached['result']
+
+    if cached:
+        # 뉴스만 만료된 경우: SHAP/키워드는 재사용하고 뉴스만 다시 조회
+        top_features, shap_keywords = cached['top_features'], cached['shap_keywords']
+    else:
+        # 1. SHAP Analysis
+        input_data_df = pd.DataFrame([current_context_data[feature_cols].values], columns=feature_cols)
+        top_features = get_top_shap_features(explainer, input_data_df, feature_cols, top_n=3, date=current_context_data.name)
+        if isinstance(top_features, dict) and 'error' in top_features:
+            return top_features
+        # 2. Smart Keyword Generation
+        shap_keywords = build_shap_keywords(top_features)
 
     # 3. News Search
-    search_query = "니켈" + (" (" + " OR ".join(shap_keywords) + ")" if shap_keywords else "")
-    end_date = pd.to_datetime(selected_date)
-    start_date = end_date - timedelta(days=14)
+    search_query = build_news_query(shap_keywords)
+    start_date, end_date = news_utils.news_window(selected_date)
     news_items = search_google_news(search_query, start_date, end_date)
     if isinstance(news_items, dict) and 'error' in news_items:
         return news_items
+    news_items = [{k: item.get(k) for k in ('title', 'link', 'snippet')} for item in news_items or []]
 
     # 4. Score and Sort News
     reranked_news = []
     if news_items:
         for item in news_items:
-            search_text = f"{item.get('title', '')} {item.get('snippet', '')}"
+            search_text = f"{item.get('title') or ''} {item.get('snippet') or ''}"
             score = sum(1 for keyword in shap_keywords if keyword in search_text)
             if score > 0:
                 reranked_news.append({
                     "title": item.get('title'),
                     "link": item.get('link'),
-                    "snippet": item.get('snippet', '요약 정보 없음').strip(),
+                    "snippet": (item.get('snippet') or '요약 정보 없음').strip(),
                     "relevance_score": score
                 })
         reranked_news.sort(key=lambda x: x.get('relevance_score', 0), reverse=True)
@@ -159,79 +138,48 @@ def perform_price_analysis(current_context_data, explainer, feature_cols, select
     main_factors_list = list(set([prefix_desc.get(f.split('_')[0], "시장 동향") for f in top_features]))
     main_factors = " 및 ".join(main_factors_list) if main_factors_list else "전반적인 시장 동향"
 
-    return {
+    result = {
         "main_factors_str": f"주요 가격 변동 요인은 **{main_factors}**(으)로 보입니다.",
         "top_features": top_features,
         "relevant_news": reranked_news[:3] # Return top 3 news
     }
+    analysis_cache.save_entry(cache_key, top_features, shap_keywords, news_items, result)
+    return result
 
-def summarize_url_content(url):
-    """Fetches content from a URL and summarizes it using OpenAI."""
-    try:
-        headers = {
-            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/58.0.3029.110 Safari/537.36',
-            'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,image/apng,*/*;q=0.8',
-            'Accept-Language': 'en-US,en;q=0.9,ko;q=0.8'
-        }
-        response = requests.get(url, headers=headers, timeout=15)
-        response.raise_for_status()
-
-        soup = BeautifulSoup(response.content, 'html.parser')
-
-        # Heuristics to find main content, trying common tags for articles
-        main_content = soup.find('article') or soup.find('main') or soup.find("div", class_=re.compile("post|article|content"))
-        
-        if main_content:
-            paragraphs = main_content.find_all('p')
-        else:
-            # As a fallback, get all paragraphs from the body
-            paragraphs = soup.body.find_all('p') if soup.body else []
-
-        text_content = ' '.join([p.get_text(strip=True) for p in paragraphs])
-
-        if not text_content.strip():
-            # If no paragraphs, try to get all text from body and clean it up
-            if soup.body:
-                text_content = ' '.join(soup.body.get_text(separator=' ', strip=True).split())
-            if not text_content.strip():
-                return "기사 본문을 추출할 수 없었습니다. 웹사이트의 구조가 복잡하거나 콘텐츠가 동적으로 로드될 수 있습니다."
-
-        # Truncate for API limit and clarity
-        text_to_summarize = text_content[:8000]
-
-        # Summarize using OpenAI
-        if not OPENAI_API_KEY or "YOUR_OPENAI_API_KEY" in OPENAI_API_KEY:
-            return "OpenAI API 키가 구성되지 않았습니다. 요약 기능을 사용할 수 없습니다."
-        
-        client = openai.OpenAI(api_key=OPENAI_API_KEY)
-        
-        summary_prompt = f"""당신은 원자재, 특히 니켈 구매를 담당하는 전문 매니저를 위한 AI 어시스턴트입니다.
-        다음 뉴스 기사를 두 부분으로 나누어 분석해주세요.
-
-        1. **기사 요약**: 기사의 핵심 내용을 객관적으로 2~3문장으로 요약합니다.
-        2. **AI 인사이트**: 요약된 내용을 바탕으로, 이 정보가 니켈 가격(수급, 시장 심리 등)에 미칠 수 있는 영향을 분석합니다. 이 부분은 반드시 "**[AI 인사이트]**" 라는 말로 시작해야 합니다.
+def build_shap_keywords(top_features):
+    """Maps the top SHAP features to news search keywords."""
+    PREFIX_KEYWORD_MAP = {'lag': ['니켈 가격'], 'ma': ['기술적 분석'], 'ret': ['니켈 변동성'], 'PC_fin': ['금융 시장'], 'PC_COM': ['원자재', '비철금속', 'LME'], 'PMI': ['PMI', '제조업'], 'CPI': ['CPI', '물가'], 'PPI': ['PPI'], 'GB': ['국채 금리'], 'VIX': ['VIX 지수'], 'Dollar': ['달러 인덱스'], 'NASDAQ': ['나스닥'], 'Gold': ['금 가격'], 'Cu': ['구리 가격'], 'Al': ['알루미늄 가격'], 'Dubai_Oil': ['유가']}
+    shap_keywords = []
+    for feature in top_features:
+        found_prefix = False
+        for prefix, keywords in PREFIX_KEYWORD_MAP.items():
+            if feature.startswith(prefix):
+                shap_keywords.extend(keywords)
+                found_prefix = True; break
+        if not found_prefix and KEYWORD_MAP.get(feature):
+            shap_keywords.append(KEYWORD_MAP.get(feature))
+    if not shap_keywords: shap_keywords.append('니켈 가격')
+    return list(set(filter(None, shap_keywords)))
+
+def prefetch_latest_news(df_full, feature_cols, model, scaler):
+    """Starts a background news search for the latest date so the first analysis request hits the cache."""
+    client = news_utils.get_client()
+    if not client.api_key or not client.cse_id or df_full is None: return None
+    explainer = load_shap_explainer(model, scaler, df_full[feature_cols])
+    latest = df_full.iloc[-1]
+    top_features = get_top_shap_features(explainer, pd.DataFrame([latest[feature_cols].values], columns=feature_cols), feature_cols, top_n=3, date=latest.name)
+    if isinstance(top_features, dict): return None
+    return client.prefetch_latest(build_news_query(build_shap_keywords(top_features)), df_full.index.max())
 
-        ---
-        [기사 본문]
-        {text_to_summarize}
-        ---
+def summarize_url_content(url):
+    """Fetches content from a URL and summarizes it using OpenAI (cached by URL + content hash)."""
+    return summarizer.summarize_url(url)
 
-        분석 결과:
-        """
-        
-        summary_response = client.chat.completions.create(
-            model="gpt-4o",
-            messages=[{"role": "user", "content": summary_prompt}]
-        )
-        return summary_response.choices[0].message.content
-
-    except requests.exceptions.HTTPError as e:
-        return f"URL에 접근할 수 없습니다 (HTTP 오류 {e.response.status_code}). URL을 확인해주세요."
-    except requests.exceptions.RequestException as e:
-        return f"URL에서 콘텐츠를 가져오는 중 네트워크 오류가 발생했습니다: {e}"
-    except Exception as e:
-        import traceback
-        return f"링크 요약 중 예상치 못한 오류가 발생했습니다: {e}\n{traceback.format_exc()}"
+def summarize_news_items(news_items):
+    """Summarizes several news links concurrently and formats them as one chat message."""
+    summaries = summarizer.summarize_urls([item.get('link') for item in news_items])
+    blocks = [f"#### [{item.get('title')}]({item.get('link')})\n{summaries.get(item.get('link'), '')}" for item in news_items if item.get('link')]
+    return "\n\n---\n".join(blocks) if blocks else "요약할 뉴스 링크가 없습니다."
 
 
 # --- Conversational AI (Not used by agent, for UI only) ---
@@ -250,27 +198,29 @@ def get_conversational_response(prompt):
 - 답변을 지어내지 마세요. 항상 제공된 도구와 토큰을 사용하세요.
 """
     try:
-        if not OPENAI_API_KEY or "YOUR_OPENAI_API_KEY" in OPENAI_API_KEY:
+        gateway = llm_gateway.get_gateway()
+        if not gateway.configured:
             return "OpenAI API 키가 구성되지 않았거나 플레이스홀더입니다. .env 파일을 확인하고 'YOUR_OPENAI_API_KEY_HERE'를 실제 키로 교체해주세요."
-        client = openai.OpenAI(api_key=OPENAI_API_KEY)
         messages = [{"role": "system", "content": system_prompt}]
         messages.extend(st.session_state.get('messages', []))
         messages.append({"role": "user", "content": prompt})
-        response = client.chat.completions.create(model="gpt-3.5-turbo", messages=messages)
-        return response.choices[0].message.content
+        return gateway.chat(messages, model="gpt-3.5-turbo", site="p2.conversation")
     except Exception as e:
         return f"OpenAI와 통신하는 중 오류가 발생했습니다: {e}"
 
 # --- UI Components (for UI page2 only) ---
 def draw_price_graph(current_price, predicted_price):
+    import plotly.graph_objects as go
     dates = ['현재', '7일 후']; prices = [current_price, predicted_price]
     fig = go.Figure(data=go.Scatter(x=dates, y=prices, mode='lines+markers', name='니켈 가격'))
     fig.update_layout(title="AI 기반 7일 가격 예측", yaxis_range=[min(prices)*0.95, max(prices)*1.05])
     st.plotly_chart(fig, use_container_width=True)
 
 def draw_inventory_graph(current_stock, daily_usage, safety_stock, lead_time, simulation_weeks):
+    import plotly.graph_objects as go
     days = np.arange(simulation_weeks * 7 + 1)
-    projected_stock = current_stock - (daily_usage * days)
+    simulated = stock_simulation.simulate_stock(current_stock, daily_usage * 7, 0, 0.0, simulation_weeks * 7)
+    projected_stock = np.concatenate(([current_stock], simulated['stock'][0]))
     fig = go.Figure()
     fig.add_trace(go.Scatter(x=days, y=projected_stock, name='예상 재고'))
     fig.add_trace(go.Scatter(x=days, y=[safety_stock]*len(days), name='안전 재고', line=dict(dash='dash')))
@@ -279,11 +229,15 @@ def draw_inventory_graph(current_stock, daily_usage, safety_stock, lead_time, si
 
 # --- Main page2 UI function ---
 def page2():
+    from streamlit_chat import message
     st.header("2. 구매 (AI 의사결정 지원)")
     with st.spinner("데이터와 모델을 로드하는 중입니다..."):
         df_full, feature_cols = load_full_processed_data()
         model, scaler = load_model_and_scaler()
     if df_full is None: st.error("데이터 로딩 실패."); st.stop()
+    if 'news_prefetched' not in st.session_state:
+        prefetch_latest_news(df_full, feature_cols, model, scaler)
+        st.session_state.news_prefetched = True
 
     # Session State
     if 'selected_date' not in st.session_state:
@@ -329,6 +283,13 @@ def page2():
                 st.session_state.messages.append({"role": "assistant", "content": summary})
             st.rerun()
 
+        # 0-1. User asked to summarize the news from the last analysis
+        elif "요약" in prompt and st.session_state.get('last_relevant_news'):
+            with st.spinner("관련 뉴스를 동시에 가져와 요약하는 중입니다..."):
+                summary = summarize_news_items(st.session_state.last_relevant_news)
+                st.session_state.messages.append({"role": "assistant", "content": summary})
+            st.rerun()
+
         # 1. User asked for a price prediction (without analysis)
         elif any(keyword in prompt for keyword in price_keywords) and not any(keyword in prompt for keyword in analysis_keywords):
             price_change_percent = ((predicted_price - current_price) / current_price) * 100
@@ -351,10 +312,12 @@ def page2():
                     if analysis_result.get('top_features'):
                         response_text += f"\n`(주요 변수: {', '.join(analysis_result['top_features'])})`\n\n"
                     if analysis_result.get('relevant_news'):
+                        st.session_state.last_relevant_news = analysis_result['relevant_news']
                         response_text += "관련 뉴스는 다음과 같습니다:\n\n---\n"
                         for item in analysis_result['relevant_news']:
                             score_display = "⭐" * item.get('relevance_score', 0)
                             response_text += f"#### [{item.get('title')}]({item.get('link')})\n**관련도 점수**: {score_display} ({item.get('relevance_score', 0)})\n> _{item.get('snippet', '')}_ \n\n"
+                        response_text += "기사 내용을 한 번에 요약하려면 '뉴스 요약해줘'라고 말씀해주세요."
                     else:
                         response_text += "\n\n관련된 뉴스를 찾지 못했습니다."
             st.session_state.messages.append({"role": "assistant", "content": response_text})
@@ -371,7 +334,11 @@ def page2():
 def run_p2_purchase(state: dict) -> dict:
     """
     p8_agent를 위한 가격 예측 및 뉴스 분석 실행 함수.
+    state['cancel_events']['p2']가 설정되면(제한 시간 초과) 남은 단계를 건너뛰고 가격 예측 결과만 반환합니다.
     """
+    cancel_event = (state.get('cancel_events') or {}).get('p2')
+    def cancelled():
+        return cancel_event is not None and cancel_event.is_set()
     try:
         df_full, feature_cols = load_full_processed_data()
         model, scaler = load_model_and_scaler()
@@ -397,7 +364,9 @@ def run_p2_purchase(state: dict) -> dict:
 
         # 2. SHAP 및 뉴스 분석 실행 (가격 상승 또는 하락 시에만)
         if price_trend in ["up", "down"]:
+            if cancelled(): return {**price_result, "partial": True}
             explainer = load_shap_explainer(model, scaler, df_full[feature_cols])
+            if cancelled(): return {**price_result, "partial": True}
             if explainer:
                 analysis_result = perform_price_analysis(current_context_data, explainer, feature_cols, selected_date)
                 if 'error' not in analysis_result:
@@ -310,7 +310,13 @@ def _get_rag_engine_for_agent():
 
 
 def run_p3_customs(state: dict) -> dict:
-    """p8_agent를 위한 통관/관세 리스크 분석 실행 함수"""
+    """
+    p8_agent를 위한 통관/관세 리스크 분석 실행 함수.
+    state['cancel_events']['p3']가 설정되면(제한 시간 초과) RAG 엔진 준비 / LLM 단계 사이에서 멈추고 반환합니다.
+    """
+    cancel_event = (state.get('cancel_events') or {}).get('p3')
+    def cancelled():
+        return cancel_event is not None and cancel_event.is_set()
     try:
         # 3번 페이지 UI에서 사용자가 선택한 국가를 우선적으로 사용
         origin_country = st.session_state.get('p3_selected_country', '중국')
@@ -318,13 +324,16 @@ def run_p3_customs(state: dict) -> dict:
             origin_country = '중국'
         
         # 1. RAG 엔진 가져오기
+        if cancelled(): return {"error": "p3: 취소됨", "cancelled": True}
         rag_engine = _get_rag_engine_for_agent()
         if rag_engine is None:
             return {"error": "RAG 엔진을 초기화하지 못했습니다."}
 
-        # 2. 표준 질문 실행
+        # 2. 표준 질문 실행 (Router → 답변 생성 LLM 단계 사이에서도 취소 확인)
+        if cancelled(): return {"error": "p3: 취소됨", "cancelled": True}
         question = f"{origin_country}에서 니켈(nickel) 수입 시 MFN 관세율은 몇 %인가요?"
-        result = rag_engine.generate_answer(question)
+        result = rag_engine.generate_answer(question, cancelled=cancelled)
+        if result.get("cancelled"): return {"error": "p3: 취소됨", "cancelled": True}
         
         # 3. 결과 파싱 및 리스크 분석 (page3 UI와 동일한 방식으로 수정)
         analysis = result.get("analysis", {})
@@ -2,7 +2,6 @@
 import streamlit as st
 import datetime
 import pandas as pd
-import altair as alt
 # -----------------------------
 # 🔹 모듈 로드
 # -----------------------------
@@ -62,7 +61,7 @@ def to_float(value):
 # 🔹 DB 초기화
 # -----------------------------
 if not MODULE_ERROR:
-    qm.load_or_create_db()
+    qm.get_store()
     im.load_or_create_inventory_db()
 
 # -----------------------------
@@ -185,7 +184,18 @@ def page5():
             del st.session_state.inspection_result, st.session_state.srm_status, st.session_state.last_inputs
 
     elif tab_choice == "📊 이력 조회 및 분석":
+        import altair as alt
         st.subheader("검사 이력 조회 및 분석")
+        with st.expander("🏷️ 공급사별 SRM 현황", expanded=False):
+            stages = qm.get_all_supplier_stages()
+            if stages:
+                st.dataframe(pd.DataFrame([
+                    {'공급사': name, 'SRM 단계': s['stage'], '등급': s['status'], '연속 불합격': s['consecutive_failures'],
+                     '최근 검사일': s['last_date'], '권고 조치': s['action']}
+                    for name, s in stages.items()
+                ]).sort_values('SRM 단계', ascending=False, kind='stable'), hide_index=True, width='stretch')
+            else:
+                st.info("등록된 검사 이력이 없습니다.")
         with st.form("history_filter_form"):
             c1, c2 = st.columns([1, 1])
             today = datetime.date.today()
@@ -196,12 +206,9 @@ def page5():
             search_clicked = st.form_submit_button("조회하기", type="primary", use_container_width=True)
 
         if search_clicked:
-            df = qm.load_or_create_db()
-            df['날짜'] = pd.to_datetime(df['날짜']).dt.date
-            mask = (df['날짜'] >= start_date) & (df['날짜'] <= end_date)
-            if selected_supplier != "전체":
-                mask &= (df['공급사명'] == selected_supplier)
-            filtered_df = df[mask]
+            filtered_df = qm.get_records_by_date_range(
+                start_date, end_date, None if selected_supplier == "전체" else selected_supplier)
+            filtered_df['날짜'] = filtered_df['날짜'].dt.date
             if filtered_df.empty:
                 st.session_state.history_df = None
                 st.warning("선택한 조건에 해당하는 데이터가 없습니다.")
@@ -280,15 +287,18 @@ def run_p5_quality(state: dict) -> dict:
                 "error": "분석할 공급사 정보가 지정되지 않았습니다."
             }
 
-        # DB 초기화 및 리스크 분석
-        qm.load_or_create_db()
-        srm_status = qm.get_supplier_risk_and_stage(supplier)
+        # 리스크 분석 (공급사별 연속 불합격 상태 조회)
+        stages = qm.get_all_supplier_stages()
+        srm_status = stages.get(supplier) or qm.get_supplier_risk_and_stage(supplier)
 
         return {
             "supplier": supplier,
             "status": srm_status.get('status'),
             "stage": srm_status.get('stage'),
-            "action": srm_status.get('action')
+            "action": srm_status.get('action'),
+            "consecutive_failures": srm_status.get('consecutive_failures', 0),
+            # 경고(2단계) 이상인 다른 공급사 (P8 권고용)
+            "at_risk_suppliers": {name: s['status'] for name, s in stages.items() if s['stage'] >= 2 and name != supplier}
         }
     except Exception as e:
         return {"error": f"p5 실행 중 예외 발생: {str(e)}"}
\ No newline at end of file
@@ -1,18 +1,48 @@
 # mypages/p8_agent.py
 
 import streamlit as st
-from typing import TypedDict, Any, Dict, List
+from typing import TypedDict, Any, Dict, List, Optional
 import time
 import os
+import importlib
+import threading
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
 import pandas as pd
+from mypages import agent_cache
+from mypages import order_optimizer
 
-# 1. 각 전문 에이전트(Skill Agent)의 실행 함수 임포트
-from mypages.p2_purchase import run_p2_purchase
-from mypages.p3_customs import run_p3_customs
-from mypages.p4_logistics import run_p4_logistics
-from mypages.p5_quality import run_p5_quality
-from mypages.p6_finance import run_p6_finance
-from mypages.p7_inventory import run_p7_inventory
+# 1. 각 전문 에이전트(Skill Agent)의 실행 함수 (실제 실행 시점에 지연 import)
+def _lazy_agent(module_name: str, func_name: str):
+    def runner(state):
+        return getattr(importlib.import_module(module_name), func_name)(state)
+    runner.__name__ = func_name
+    return runner
+
+run_p2_purchase = _lazy_agent('mypages.p2_purchase', 'run_p2_purchase')
+run_p3_customs = _lazy_agent('mypages.p3_customs', 'run_p3_customs')
+run_p4_logistics = _lazy_agent('mypages.p4_logistics', 'run_p4_logistics')
+run_p5_quality = _lazy_agent('mypages.p5_quality', 'run_p5_quality')
+run_p6_finance = _lazy_agent('mypages.p6_finance', 'run_p6_finance')
+run_p7_inventory = _lazy_agent('mypages.p7_inventory', 'run_p7_inventory')
+
+# 병렬 실행 설정: 준비된(의존성이 충족된) 에이전트는 스레드 풀에서 동시에 실행
+MAX_PARALLEL_AGENTS = 6
+DEFAULT_AGENT_TIMEOUT = 60  # 초
+AGENT_TIMEOUTS = {'p2': 90, 'p3': 120}  # 뉴스/RAG처럼 외부 호출이 많은 에이전트는 여유 있게
+GLOBAL_DEADLINE = 150  # 초, 질문 하나에 대한 전체 응답 제한 시간
+
+def _script_run_ctx():
+    """현재 Streamlit 스크립트 실행 컨텍스트 (워커 스레드에서 st.cache_*/session_state를 쓰기 위해 전달)"""
+    try:
+        from streamlit.runtime.scriptrunner import get_script_run_ctx
+        return get_script_run_ctx()
+    except ImportError:
+        return None
+
+def _attach_ctx(ctx):
+    if ctx is not None:
+        from streamlit.runtime.scriptrunner import add_script_run_ctx
+        add_script_run_ctx(threading.current_thread(), ctx)
 
 # 2. 공유 상태(AgentState) 정의
 class AgentState(TypedDict, total=False):
@@ -25,6 +55,10 @@ class AgentState(TypedDict, total=False):
     recommendations: List[str]
     confidence: Dict[str, Any]
     agent_summaries: Dict[str, Dict[str, Any]]
+    agent_timings: Dict[str, Optional[float]]
+    cached_agents: List[str]
+    order_plan: Dict[str, Any]  # 비용 최적 발주 일정 (order_optimizer 결과, 입력이 부족하면 None)
+    cancel_events: Dict[str, threading.Event]  # 에이전트별 협조적 취소 신호 (제한 시간 초과 시 set)
 
 # 3. Meta Agent (Orchestrator) 정의
 class MetaAgent:
@@ -33,13 +67,18 @@ class MetaAgent:
             "user_question": user_question,
             "p1_plan": p1_plan,
             "executed_agents": ['p1'], "pending_agents": [], "agent_outputs": {},
-            "conclusion": {}, "recommendations": [], "confidence": {}, "agent_summaries": {}
+            "conclusion": {}, "recommendations": [], "confidence": {}, "agent_summaries": {}, "agent_timings": {}, "cached_agents": [],
+            "order_plan": None, "cancel_events": {}
         }
         self.agent_map = {
             'p2': run_p2_purchase, 'p3': run_p3_customs, 'p4': run_p4_logistics,
             'p5': run_p5_quality, 'p6': run_p6_finance, 'p7': run_p7_inventory,
         }
         self.agent_dependencies = {'p6': ['p2', 'p3', 'p7']}
+        self.agent_timeouts = {name: AGENT_TIMEOUTS.get(name, DEFAULT_AGENT_TIMEOUT) for name in self.agent_map}
+        self.running = {}  # 실행 중인 에이전트: name -> (future, deadline)
+        self._started_at = {}  # 실행 중인 에이전트의 시작 시각 (time.monotonic)
+        self.global_deadline = GLOBAL_DEADLINE
         self.agent_info = {
             'p2': {'icon': '📈', 'title': '구매 가격 분석'}, 'p3': {'icon': '🚢', 'title': '수입 통관 분석'},
             'p4': {'icon': '🚚', 'title': '운송 및 물류 분석'}, 'p5': {'icon': '🔬', 'title': '품질 관리 분석'},
@@ -64,17 +103,20 @@ class MetaAgent:
             full_plan.update(self.agent_dependencies.get(agent, []))
         self.state['pending_agents'] = sorted(list(full_plan))
 
+    def _is_scheduled(self, agent):
+        return agent in self.state['executed_agents'] or agent in self.state['pending_agents'] or agent in self.running
+
     def _evaluate_and_replan(self):
         outputs = self.state['agent_outputs']
         newly_added = set()
 
         if outputs.get('p7', {}).get('risk_level') == 'warning':
             for agent in ['p2', 'p6', 'p4']:
-                if agent not in self.state['executed_agents'] and agent not in self.state['pending_agents']:
+                if not self._is_scheduled(agent):
                     newly_added.add(agent)
         
         if outputs.get('p2', {}).get('price_trend') in ['up', 'down']:
-            if 'p6' not in self.state['executed_agents'] and 'p6' not in self.state['pending_agents']:
+            if not self._is_scheduled('p6'):
                 newly_added.add('p6')
         
         if newly_added:
@@ -83,19 +125,22 @@ class MetaAgent:
                 st.toast(f"ℹ️ 연관 분석: {self.agent_info[agent]['title']}을 추가 실행합니다.")
                 final_new.update(self.agent_dependencies.get(agent, []))
             
-            self.state['pending_agents'].extend([a for a in final_new if a not in self.state['executed_agents'] and a not in self.state['pending_agents']])
+            self.state['pending_agents'].extend([a for a in final_new if not self._is_scheduled(a)])
             self.state['pending_agents'] = sorted(list(set(self.state['pending_agents'])))
 
     def _generate_structured_report(self):
         outputs = self.state['agent_outputs']
         all_agents = set(self.agent_map.keys())
         executed = set(a for a in self.state['executed_agents'] if a != 'p1')
+        timed_out = set(a for a in executed if (outputs.get(a) or {}).get('timed_out'))
         
-        # Confidence
-        executed_count, total_count = len(executed), len(all_agents)
+        # Confidence (제한 시간을 넘긴 에이전트는 실행되지 않은 것으로 간주)
+        completed = executed - timed_out
+        executed_count, total_count = len(completed), len(all_agents)
         level = "낮음" if executed_count < total_count / 2 else "보통" if executed_count < total_count else "높음"
         missing = [self.agent_info[a]['title'] for a in sorted(all_agents - executed) if a in self.agent_info]
         reason = f"총 {total_count}개 중 {executed_count}개 에이전트 실행." + (f" ({', '.join(missing)} 미실행)" if missing else "")
+        if timed_out: reason += f" ({', '.join(self.agent_info[a]['title'] for a in sorted(timed_out))} 시간 초과 - 완료된 결과만으로 판단)"
         self.state['confidence'] = {"level": level, "reason": reason, "executed_count": executed_count, "total_count": total_count}
 
         # Summaries
@@ -104,7 +149,9 @@ class MetaAgent:
             info = self.agent_info.get(name, {})
             result = outputs.get(name)
             summary, status, details = "분석 계획에 포함되지 않음.", "skipped", {}
-            if name in executed:
+            if name in timed_out:
+                status, summary = "timeout", f"⏱ {result.get('error')}"
+            elif name in executed:
                 if result and not result.get('error'):
                     status, details = "success", result
                     if name == 'p7': summary = f"재고 리스크: {result.get('risk_level', 'N/A').upper()}"
@@ -114,6 +161,8 @@ class MetaAgent:
                     elif name == 'p3': summary = f"관세 리스크: {result.get('risk_level', 'N/A').upper()}"
                     elif name == 'p6': summary = f"예상 총 원가: ₩{result.get('total_cost', 0):,.0f}"
                 else: status, summary = "error", f"오류: {result.get('error', '알수없음') if result else '결과없음'}"
+                if status == "success" and name in self.state['cached_agents']: summary += " · 이전 결과 재사용"
+            elif name in self.running: status, summary = "running", "분석 중..."
             elif name in self.state['pending_agents']: status, summary = "pending", "의존성 대기"
             self.state['agent_summaries'][name] = {'icon': info.get('icon'), 'title': info.get('title'), 'summary': summary, 'status': status, 'details': details}
 
@@ -151,27 +200,166 @@ class MetaAgent:
                 conclusion = {"level": "success", "message": "재고와 가격 모두 안정적인 상황입니다."}
                 recs = ["[권고] 긴급 구매 요인은 없으며, 현재 가격 수준에서 필요에 따라 구매를 진행할 수 있습니다."]
         
+        # 비용 최적 발주 일정 (가격 예측 + 수요 계획 + 리드타임)
+        order_plan = self._optimize_orders(outputs)
+        self.state['order_plan'] = order_plan
+        if order_plan and order_plan['schedule']:
+            first = order_plan['schedule'][0]
+            when = "오늘" if first['order_day'] == 0 else f"{first['order_date']} (D+{first['order_day']})"
+            recs.append(f"[최적화] {when} {first['qty'] / 1000:,.2f}t 발주가 비용 최소입니다. (입고 {first['arrival_date']}, "
+                        f"{order_plan['horizon_days']}일간 {len(order_plan['schedule'])}회 발주, 오늘 일괄 발주 대비 {order_plan['savings']:,.0f} 절감)")
+        if order_plan and order_plan['unavoidable_shortage'] > 0:
+            recs.append(f"[주의] 리드타임({order_plan['lead_time']}일) 안에 현재고로 부족한 {order_plan['unavoidable_shortage'] / 1000:,.2f}t은 신규 발주로 메울 수 없어 긴급 조달이 필요합니다.")
+        if order_plan and order_plan.get('safety_stock_use', 0) > 0:
+            recs.append(f"[주의] 리드타임({order_plan['lead_time']}일) 동안 안전재고 {order_plan['safety_stock_use'] / 1000:,.2f}t을 사용하게 됩니다. 안전재고 보충 시점을 확인하세요.")
+
+        # 품질 SRM: 경고 이상 공급사는 발주 배분에서 제외/감축 검토
+        p5_out = outputs.get('p5') or {}
+        if p5_out.get('stage', 0) >= 2:
+            recs.append(f"[주의] 공급사 '{p5_out.get('supplier')}'는 {p5_out.get('consecutive_failures', 0)}회 연속 품질 불합격으로 "
+                        f"SRM {p5_out.get('status')} 단계입니다. ({p5_out.get('action')})")
+        if p5_out.get('at_risk_suppliers'):
+            names = ", ".join(f"{name}({status})" for name, status in p5_out['at_risk_suppliers'].items())
+            recs.append(f"[주의] SRM 경고 이상 공급사: {names} — 발주 배분 시 제외 또는 물량 축소를 검토하세요.")
+
         self.state['conclusion'], self.state['recommendations'] = conclusion, recs
 
-    def run(self):
+    def _optimize_orders(self, outputs):
+        """P2 가격 예측, P1 계획(없으면 P7 재고 분석), 리드타임으로 비용 최적 발주 일정을 계산합니다. 입력이 부족하면 None."""
+        p2_out, p7_out = outputs.get('p2') or {}, outputs.get('p7') or {}
+        plan = self.state.get('p1_plan') or {}
+        if p2_out.get('error') or p2_out.get('current_price') is None or p2_out.get('predicted_price') is None:
+            return None
+        daily_demand = plan['weekly_usage'] / 7 if plan.get('weekly_usage') else p7_out.get('avg_daily_usage')
+        current_stock = plan.get('current_stock', p7_out.get('current_inventory'))
+        if daily_demand is None or current_stock is None:
+            return None
+        lead_time = plan.get('lead_time')
+        try:
+            if not lead_time:
+                from mypages import stockout_risk
+                lead_time = int(stockout_risk.lead_time_pool(stockout_risk.shipment_lead_times()).mean())
+            return order_optimizer.optimize_order_schedule(
+                p2_out['current_price'], p2_out['predicted_price'], daily_demand, current_stock,
+                safety_stock=plan.get('safety_stock', 0.0), lead_time=lead_time)
+        except Exception:
+            return None
+
+    def _ready_agents(self):
+        """대기 중인 에이전트 중 의존성이 모두 실행 완료되어 바로 시작할 수 있는 것들."""
+        return [a for a in sorted(self.state['pending_agents'])
+                if all(d in self.state['executed_agents'] for d in self.agent_dependencies.get(a, []))]
+
+    def _timeout(self, name, message, elapsed=None):
+        """
+        에이전트에 취소 신호를 보내고 시간 초과 결과로 기록합니다. (스레드는 협조적으로 종료)
+        elapsed: 실제 실행 시간. 시작하지 못하고 전체 마감된 에이전트는 None으로 기록합니다.
+        """
+        event = self.state['cancel_events'].get(name)
+        if event is not None: event.set()
+        self._complete(name, {"error": message, "timed_out": True}, elapsed)
+
+    def _call_agent(self, name):
+        started = time.perf_counter()
+        try: result = self.agent_map[name](self.state) or {"error": "결과 없음"}
+        except Exception as e: result = {"error": f"실행 중 예외: {e}"}
+        return result, time.perf_counter() - started
+
+    def _complete(self, name, result, elapsed, cached=False):
+        self.state['agent_outputs'][name] = result
+        self.state['agent_timings'][name] = round(elapsed, 2) if elapsed is not None else None
+        self.state['executed_agents'].append(name)
+        if cached: self.state['cached_agents'].append(name)
+        else: agent_cache.put(name, self.state, result)
+
+    def _snapshot(self, event):
+        """현재까지의 결과로 잠정 보고서를 갱신하고 이벤트에 상태를 붙입니다."""
+        self._generate_structured_report()
+        event['state'] = self.state
+        return event
+
+    def run_iter(self):
+        """
+        의존성 그래프(agent_dependencies)에 따라 준비된 에이전트를 모두 동시에 실행하면서 이벤트를 내보냅니다.
+          {"type": "started", "agents": [...]}                  - 에이전트 실행 시작
+          {"type": "finished", "agent": name, "result": {...}}  - 에이전트 완료 (잠정 보고서 포함, 캐시 재사용 시 "cached": True)
+          {"type": "done"}                                      - 전체 완료 (최종 보고서)
+        모든 이벤트의 "state"에는 그 시점까지의 결과로 만든 보고서가 담깁니다.
+        재계획(_evaluate_and_replan)과 st.toast는 이벤트를 소비하는 메인 스레드에서 수행되며,
+        새로 추가된 에이전트도 의존성이 충족되는 즉시 시작합니다. 제한 시간을 넘긴 에이전트는 오류로 처리합니다.
+        입력이 바뀌지 않은 에이전트는 이전 대화 턴의 결과(agent_cache)를 재사용합니다.
+        """
         self._initial_planning()
         if not self.state['pending_agents']:
             self.state.update({"conclusion": {"level": "info", "message": "실행할 분석 에이전트가 없습니다."},"confidence": {"level": "낮음", "reason": "분석할 에이전트가 없습니다.", "executed_count": 0, "total_count": len(self.agent_map)}})
-            return self.state
-        for _ in range(10):
-            if not self.state['pending_agents']: break
-            executable = next((a for a in sorted(self.state['pending_agents']) if all(d in self.state['executed_agents'] for d in self.agent_dependencies.get(a, []))), None)
-            if executable:
-                self.state['pending_agents'].remove(executable)
-                with st.spinner(f"💡 {self.agent_info[executable]['title']} 분석 실행 중..."):
-                    try: result = self.agent_map[executable](self.state) or {"error": "결과 없음"}
-                    except Exception as e: result = {"error": f"실행 중 예외: {e}"}
-                self.state['agent_outputs'][executable] = result
-                self.state['executed_agents'].append(executable)
-                self._evaluate_and_replan()
-            else: break
-        
-        self._generate_structured_report()
+            yield {"type": "done", "state": self.state}
+            return
+
+        request_deadline = time.monotonic() + self.global_deadline
+        ctx = _script_run_ctx()
+        pool = ThreadPoolExecutor(max_workers=MAX_PARALLEL_AGENTS, thread_name_prefix="agent", initializer=_attach_ctx, initargs=(ctx,))
+        running = self.running
+        try:
+            while True:
+                started, reused = [], []
+                for name in self._ready_agents():
+                    self.state['pending_agents'].remove(name)
+                    cached = agent_cache.get(name, self.state)
+                    if cached is not None:
+                        self._complete(name, cached, 0.0, cached=True)
+                        reused.append(name)
+                    else:
+                        self.state['cancel_events'][name] = threading.Event()
+                        deadline = min(time.monotonic() + self.agent_timeouts[name], request_deadline)
+                        running[name] = (pool.submit(self._call_agent, name), deadline)
+                        self._started_at[name] = time.monotonic()
+                        started.append(name)
+                if started:
+                    yield self._snapshot({"type": "started", "agents": started})
+                if reused:
+                    self._evaluate_and_replan()
+                    for name in reused:
+                        yield self._snapshot({"type": "finished", "agent": name, "result": self.state['agent_outputs'][name], "cached": True})
+                    continue  # 캐시로 의존성이 충족된 에이전트를 바로 시작
+                if not running: break
+
+                next_deadline = min(deadline for _, deadline in running.values())
+                done, _ = wait([f for f, _ in running.values()], timeout=max(0.0, next_deadline - time.monotonic()), return_when=FIRST_COMPLETED)
+                now = time.monotonic()
+                finished = []
+                for name, (future, deadline) in list(running.items()):
+                    if future in done:
+                        del running[name]
+                        self._started_at.pop(name, None)
+                        self._complete(name, *future.result())
+                        finished.append(name)
+                    elif now >= deadline:
+                        del running[name]
+                        future.cancel()
+                        limit = self.agent_timeouts[name] if now < request_deadline else self.global_deadline
+                        self._timeout(name, f"제한 시간({limit}초) 초과", now - self._started_at.pop(name, now))
+                        finished.append(name)
+                if now >= request_deadline:
+                    # 전체 마감: 아직 시작하지 못한 에이전트도 시간 초과로 정리하고 보고서를 만든다
+                    for name in list(self.state['pending_agents']):
+                        self.state['pending_agents'].remove(name)
+                        self._timeout(name, f"전체 제한 시간({self.global_deadline}초) 초과로 실행하지 않음")
+                        finished.append(name)
+                else:
+                    self._evaluate_and_replan()
+                for name in finished:
+                    yield self._snapshot({"type": "finished", "agent": name, "result": self.state['agent_outputs'][name]})
+        finally:
+            # 제한 시간을 넘긴 에이전트 스레드는 기다리지 않고 백그라운드에서 끝나도록 둡니다.
+            pool.shutdown(wait=False, cancel_futures=True)
+
+        yield self._snapshot({"type": "done"})
+
+    def run(self):
+        """run_iter를 끝까지 실행하고 최종 상태를 반환합니다."""
+        with st.spinner("💡 전문 에이전트들이 병렬로 분석 중입니다..."):
+            for _ in self.run_iter():
+                pass
         return self.state
 
 # --- 4. UI 렌더링 함수들 ---
@@ -192,6 +380,8 @@ def render_details_content(agent_name, details):
         st.metric(label="재주문점 (ROP)", value=f"{details.get('reorder_point', 0) / 1000:,.2f} t")
         shortage = details.get('shortage_qty', 0) / 1000
         st.metric(label="부족 또는 여유 수량", value=f"{abs(shortage):,.2f} t", delta=f"{-shortage:,.2f} t", delta_color="inverse" if shortage > 0 else "normal")
+        if details.get('stockout_probability') is not None:
+            st.metric(label="리드타임 내 결품 확률", value=f"{details['stockout_probability']:.1%}")
     elif agent_name == 'p3':
         st.metric(label="예상 관세율 (MFN)", value=f"{details.get('mfn_rate', 0):.1f} %")
         st.markdown(f"**관세 리스크**: `{details.get('risk_level', 'N/A').capitalize()}`")
@@ -205,32 +395,53 @@ def render_details_content(agent_name, details):
         st.markdown(f"**분석 대상 공급사**: `{details.get('supplier', 'N/A')}`")
         st.metric(label="SRM 등급", value=details.get('status', '정보 없음'))
         st.markdown(f"**권고 조치**: {details.get('action', 'N/A')}")
+        if details.get('at_risk_suppliers'):
+            st.markdown("**경고 이상 공급사**: " + ", ".join(f"`{n}` ({s})" for n, s in details['at_risk_suppliers'].items()))
     elif agent_name == 'p6':
         st.metric(label="예상 총 구매원가", value=f"₩ {details.get('total_cost', 0):,.0f}")
         st.info(f"**AI 추천 공급사**: `{details.get('best_supplier', 'N/A')}` (단가: `${details.get('selected_price_usd', 0):,.2f}`)")
     else: st.json(details)
 
-def render_dashboard(state):
+def render_dashboard(state, provisional=False):
+    """provisional=True이면 진행 중 화면: 잠정 결론과 에이전트 카드만 그리고 상세 위젯은 최종 렌더링에서만 그립니다."""
     st.title("🤖 AI 구매 의사결정 대시보드")
-    if state.get('conclusion'): st.info(f"**종합 결론**: {state['conclusion'].get('message', '')}")
+    if provisional:
+        done_count = len([a for a in state.get('executed_agents', []) if a != 'p1'])
+        total = done_count + sum(1 for d in state.get('agent_summaries', {}).values() if d['status'] in ('running', 'pending'))
+        st.caption(f"⏳ 분석 진행 중... ({done_count}/{total} 완료) - 결과가 도착하는 대로 결론이 갱신됩니다.")
+        if state.get('conclusion'): st.info(f"**잠정 결론**: {state['conclusion'].get('message', '')}")
+    elif state.get('conclusion'): st.info(f"**종합 결론**: {state['conclusion'].get('message', '')}")
     st.markdown("---")
     if state.get('agent_summaries'):
         st.subheader("📊 에이전트별 상세 분석")
         cols = st.columns(3)
         for i, (name, data) in enumerate(sorted(state['agent_summaries'].items())):
             with cols[i % 3]:
-                color = {"success": "#28a745", "error": "#dc3545", "pending": "#ffc107"}.get(data['status'], "#6c757d")
+                color = {"success": "#28a745", "error": "#dc3545", "pending": "#ffc107", "running": "#17a2b8", "timeout": "#fd7e14"}.get(data['status'], "#6c757d")
                 st.markdown(f"""<div style="border: 1.5px solid {color}; border-radius: 10px; padding: 15px; margin-bottom: 10px; min-height: 110px;">
                     <h6>{data['icon']} {data['title']}</h6>
                     <small>{data['summary']}</small>
                 </div>""", unsafe_allow_html=True)
+                if provisional: continue
                 if data['status'] == 'success' and data['details']:
                     with st.expander("자세히 보기"): render_details_content(name, data['details'])
                 elif data['status'] == 'error':
                     with st.expander("오류 상세", expanded=True): st.error(data['summary'])
+                elif data['status'] == 'timeout':
+                    st.warning(f"{data['summary']} - 이 에이전트 결과 없이 보고서를 작성했습니다.")
     st.markdown("---")
+    if provisional: return
     if state.get('recommendations'):
         st.subheader("💡 행동 제안"); [st.markdown(f"- {rec}") for rec in state['recommendations']]
+    order_plan = state.get('order_plan')
+    if order_plan and order_plan['schedule']:
+        st.subheader("🧮 비용 최적 발주 일정")
+        st.dataframe(pd.DataFrame([{
+            "발주일": o['order_date'], "입고일": o['arrival_date'], "충당 기간(~)": o['covers_until'],
+            "수량 (t)": round(o['qty'] / 1000, 2), "예상 단가": round(o['unit_price'], 1), "비용": round(o['cost']),
+        } for o in order_plan['schedule']]), use_container_width=True)
+        st.caption(f"총 비용 {order_plan['total_cost']:,.0f} = 구매 {order_plan['purchase_cost']:,.0f} + 발주 고정비 {order_plan['order_cost']:,.0f} "
+                   f"+ 보관 {order_plan['holding_cost']:,.0f} (계획 기간 {order_plan['horizon_days']}일, 리드타임 {order_plan['lead_time']}일)")
     if state.get('confidence'):
         conf = state['confidence']
         st.subheader("✅ 최종 판단 신뢰도")
@@ -248,5 +459,10 @@ def p8_agent_main(user_question: str):
         st.stop()
     
     meta_agent = MetaAgent(user_question, st.session_state.plan_values)
-    final_state = meta_agent.run()
-    render_dashboard(final_state)
+    dashboard = st.empty()
+    final_state = meta_agent.state
+    for event in meta_agent.run_iter():
+        final_state = event['state']
+        if event['type'] != 'done':
+            with dashboard.container(): render_dashboard(final_state, provisional=True)
+    with dashboard.container(): render_dashboard(final_state)
@@ -2,56 +2,43 @@
 import streamlit as st
 import pandas as pd
 import numpy as np
-import joblib
 import os
 from dotenv import load_dotenv
-import plotly.graph_objects as go
 from datetime import datetime
+from mypages import model_bundle as mb
+from mypages import inference
+from mypages import stock_simulation
 
 # .env 파일에서 환경 변수 로드 (파일이 없어도 에러 없음)
 load_dotenv()
 
-# --- 상수 정의 ---
-DF_MODEL_PATH = './df_model.pkl'
-MODEL_PATH = './final_model.pkl'
-FEATURE_COLS_PATH = './feature_cols.pkl'
-SCALER_PATH = './scaler.pkl'
-
 # --- 데이터/모델 로딩 함수 (캐싱) ---
-@st.cache_data
-def load_full_processed_data():
-    """모델링에 사용된 전체 데이터를 로드하고 전처리합니다."""
+# 모든 페이지와 P8 에이전트가 같은 모델 번들(mypages/model_bundle.py)을 공유합니다.
+@st.cache_resource
+def load_model_bundle():
+    """모델 번들(데이터 행렬 + 모델 + 스케일러 + feature_cols)을 한 번만 로드합니다."""
     try:
-        df = pd.read_pickle(DF_MODEL_PATH)
-        feature_cols = joblib.load(FEATURE_COLS_PATH)
+        return mb.load_bundle()
     except FileNotFoundError:
-        st.error(f"필수 데이터 파일(df_model.pkl 또는 feature_cols.pkl)을 찾을 수 없습니다.")
-        return None, None
-    if 'date' in df.columns:
-        df['date'] = pd.to_datetime(df['date'], errors='coerce')
-    else:
-        st.error("df_model.pkl에 'date' 컬럼이 없어 날짜 기반 조회를 할 수 없습니다.")
-        return None, None
-    
-    df.dropna(subset=['Ni_price'], inplace=True)
-    df_filtered = df.dropna(subset=feature_cols).copy()
+        st.error("필수 모델 파일(df_model.pkl, final_model.pkl, scaler.pkl, feature_cols.pkl)을 찾을 수 없습니다.")
+    except (KeyError, ValueError) as e:
+        st.error(f"모델 번들 생성 중 오류 발생: {e}")
+    return None
 
-    if df_filtered.empty:
-        st.error("모델 예측에 사용할 수 있는 유효한 데이터가 없습니다.")
+@st.cache_resource
+def load_full_processed_data():
+    """모델링에 사용된 전체 데이터(date 인덱스)와 feature_cols를 반환합니다."""
+    bundle = load_model_bundle()
+    if bundle is None:
         return None, None
-    df_filtered = df_filtered.sort_values(by='date').drop_duplicates(subset=['date'], keep='first').set_index('date')
-    return df_filtered, feature_cols
+    return bundle.frame(), bundle.feature_cols
 
-@st.cache_resource
 def load_model_and_scaler():
-    """ML 모델과 스케일러를 로드합니다."""
-    try:
-        model = joblib.load(MODEL_PATH)
-        scaler = joblib.load(SCALER_PATH)
-        return model, scaler
-    except FileNotFoundError:
-        st.error("모델 또는 스케일러 파일(final_model.pkl, scaler.pkl)을 찾을 수 없습니다.")
+    """ML 모델과 스케일러를 반환합니다."""
+    bundle = load_model_bundle()
+    if bundle is None:
         return None, None
+    return bundle.model, bundle.scaler
 
 def get_common_data():
     """
@@ -100,17 +87,16 @@ def predict_price(model, features, data, scaler):
     """주어진 데이터를 사용하여 7일 후 가격을 예측합니다."""
     if data is None: return None
     try:
-        input_data = data[features].values.reshape(1, -1)
-        scaled_input_data = scaler.transform(input_data)
+        input_data = data if isinstance(data, np.ndarray) else data[features].to_numpy()
+        return inference.get_predictor(model, scaler).predict_one(input_data)
     except Exception as e:
-        st.error(f"데이터 스케일링 중 오류 발생: {e}")
+        st.error(f"가격 예측 중 오류 발생: {e}")
         return None
-    prediction = model.predict(scaled_input_data)
-    return prediction[0]
 
 # --- UI 컴포넌트 ---
 def draw_price_graph(current_price, predicted_price):
     """현재 가격과 예측 가격을 그래프로 시각화합니다."""
+    import plotly.graph_objects as go
     dates = ['현재', '7일 후']
     prices = [current_price, predicted_price]
     fig = go.Figure()
@@ -124,9 +110,12 @@ def draw_price_graph(current_price, predicted_price):
 
 def draw_inventory_graph(current_stock, daily_usage, safety_stock, lead_time, simulation_weeks):
     """재고 변화 예측 그래프를 생성합니다."""
+    import plotly.graph_objects as go
     days_to_plot = simulation_weeks * 7
     days = np.arange(days_to_plot + 1)
-    projected_stock = current_stock - (daily_usage * days)
+    # 0일차는 현재고, 이후는 시뮬레이션 엔진의 일별 재고 (0 미만으로 내려가지 않음)
+    simulated = stock_simulation.simulate_stock(current_stock, daily_usage * 7, 0, 0.0, days_to_plot)
+    projected_stock = np.concatenate(([current_stock], simulated['stock'][0]))
     
     fig = go.Figure()
     fig.add_trace(go.Scatter(x=days, y=projected_stock, mode='lines', name='예상 재고량', line=dict(color='#1f77b4', width=2)))
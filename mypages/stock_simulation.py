@@ -0,0 +1,111 @@
+# mypages/stock_simulation.py
+"""
+여러 재고 시나리오를 2차원 배열(시나리오 × 일)로 한 번에 계산하는 재고 시뮬레이션 엔진.
+
+일별 규칙 (p1 계획 페이지의 기존 루프와 동일):
+    1) 일 소모량 차감, 0 미만이면 0으로 (부족분은 미충족 수요로 집계)
+    2) 그날 입고 예정 물량 반영
+
+바닥(0) 처리는 누적합과 누적 최솟값으로 계산합니다.
+    S_d = 현재고 - (d+1)·일소모량 + (d일 전까지 입고 누적)
+    소모 후 재고 z_d = S_d - min(0, min_{k≤d} S_k),  기말 재고 = z_d + 입고_d
+따라서 시나리오 수 × 기간 크기의 배열 연산 몇 번으로 수백 개 계획을 동시에 비교할 수 있습니다.
+
+사용법:
+    from mypages import stock_simulation as ss
+    params = ss.scenario_grid(weekly_usage=[300, 350, 400], lead_time=[7, 10, 14], order_qty=[500, 800])
+    result = ss.simulate_stock(current_stock=1000, total_days=140, safety_stock=200, **params)
+    table = ss.summarize(result, params, start_date=date.today())
+"""
+import itertools
+from datetime import timedelta
+import numpy as np
+import pandas as pd
+
+NO_STOCKOUT = -1
+
+
+def scenario_grid(**axes):
+    """파라미터별 후보 값의 모든 조합을 시나리오 배열(dict of 1-D array)로 만듭니다."""
+    names = list(axes)
+    combos = list(itertools.product(*(np.atleast_1d(axes[n]) for n in names)))
+    return {n: np.array([c[i] for c in combos]) for i, n in enumerate(names)}
+
+
+def _receipt_matrix(n_scenarios, total_days, lead_time, order_qty, receipt_days, receipt_qtys):
+    """시나리오별 일자 입고량 행렬 (n_scenarios, total_days). 기간 밖 입고는 무시합니다."""
+    receipts = np.zeros((n_scenarios, total_days))
+    days = [np.broadcast_to(np.asarray(lead_time, dtype=int).reshape(-1, 1), (n_scenarios, 1))]
+    qtys = [np.broadcast_to(np.asarray(order_qty, dtype=float).reshape(-1, 1), (n_scenarios, 1))]
+    if receipt_days is not None:
+        extra_days = np.atleast_2d(np.asarray(receipt_days, dtype=int))
+        extra_qtys = np.atleast_2d(np.asarray(receipt_qtys, dtype=float))
+        days.append(np.broadcast_to(extra_days, (n_scenarios, extra_days.shape[1])))
+        qtys.append(np.broadcast_to(extra_qtys, (n_scenarios, extra_qtys.shape[1])))
+    days, qtys = np.hstack(days), np.hstack(qtys)
+    rows = np.broadcast_to(np.arange(n_scenarios).reshape(-1, 1), days.shape)
+    valid = (days >= 0) & (days < total_days)
+    np.add.at(receipts, (rows[valid], days[valid]), qtys[valid])
+    return receipts
+
+
+def simulate_stock(current_stock, weekly_usage, lead_time, order_qty, total_days,
+                   safety_stock=0.0, receipt_days=None, receipt_qtys=None):
+    """
+    시나리오별 일별 재고를 계산합니다.
+    current_stock / weekly_usage / lead_time / order_qty / safety_stock: 스칼라 또는 시나리오 길이의 1-D 배열
+    receipt_days / receipt_qtys: 추가 입고 일정 (입고 일차, 수량). (K,) 이면 모든 시나리오 공통, (S, K) 이면 시나리오별
+    반환: stock (S, total_days) 와 시나리오별 요약 배열을 담은 dict
+    """
+    current_stock, weekly_usage, lead_time, order_qty, safety_stock = np.broadcast_arrays(
+        np.asarray(current_stock, dtype=float), np.asarray(weekly_usage, dtype=float),
+        np.asarray(lead_time), np.asarray(order_qty, dtype=float), np.asarray(safety_stock, dtype=float))
+    current_stock, weekly_usage, lead_time, order_qty, safety_stock = (
+        np.atleast_1d(a) for a in (current_stock, weekly_usage, lead_time, order_qty, safety_stock))
+    n_scenarios = len(current_stock)
+    daily_usage = weekly_usage / 7
+
+    receipts = _receipt_matrix(n_scenarios, total_days, lead_time, order_qty, receipt_days, receipt_qtys)
+    received_before = np.cumsum(receipts, axis=1) - receipts
+    elapsed = np.arange(1, total_days + 1)
+    unfloored = current_stock[:, None] - daily_usage[:, None] * elapsed + received_before
+    shortfall = -np.minimum(np.minimum.accumulate(unfloored, axis=1), 0.0)
+    after_usage = unfloored + shortfall
+    stock = after_usage + receipts
+
+    empty = after_usage <= 1e-9
+    stockout_day = np.where(empty.any(axis=1), empty.argmax(axis=1), NO_STOCKOUT)
+    below_safety = stock < safety_stock[:, None]
+    return {
+        "stock": stock,
+        "daily_usage": daily_usage,
+        "stockout_day": stockout_day,
+        "unmet_demand": shortfall[:, -1],
+        "min_stock": stock.min(axis=1),
+        "min_stock_day": stock.argmin(axis=1),
+        "end_stock": stock[:, -1],
+        "days_below_safety": below_safety.sum(axis=1),
+        "first_below_safety_day": np.where(below_safety.any(axis=1), below_safety.argmax(axis=1), NO_STOCKOUT),
+    }
+
+
+def summarize(result, params, start_date):
+    """
+    시나리오별 결과를 표(DataFrame)로 정리합니다. 결품이 이른 순, 최소 재고가 낮은 순으로 정렬하며
+    인덱스('시나리오')는 result 배열의 행 번호입니다.
+    """
+    table = pd.DataFrame({k: np.asarray(v) for k, v in params.items()})
+
+    def to_date(days):
+        return [start_date + timedelta(days=int(d)) if d != NO_STOCKOUT else None for d in days]
+
+    table['결품일'] = to_date(result['stockout_day'])
+    table['안전재고 하회일'] = to_date(result['first_below_safety_day'])
+    table['최소 재고'] = result['min_stock']
+    table['최소 재고일'] = to_date(result['min_stock_day'])
+    table['안전재고 하회 일수'] = result['days_below_safety']
+    table['미충족 수요'] = result['unmet_demand']
+    table['기말 재고'] = result['end_stock']
+    order = np.lexsort((result['min_stock'], np.where(result['stockout_day'] == NO_STOCKOUT, np.iinfo(np.int64).max,
+                                                      result['stockout_day'])))
+    return table.iloc[order].rename_axis('시나리오')
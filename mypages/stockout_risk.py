@@ -0,0 +1,120 @@
+# mypages/stockout_risk.py
+"""
+리드타임 × 수요 몬테카를로 결품 위험 엔진.
+
+- 수요: 재고 원장의 일별 소모량 이력(최근 DEMAND_HISTORY_DAYS일)에서 일 단위로 복원 추출(bootstrap)합니다.
+        이력이 부족하면 일평균 × (1 ± DEFAULT_DEMAND_CV) 정규분포로 대신합니다.
+        계획값(일평균)이 주어지면 이력의 변동 모양은 유지하고 수준만 계획값에 맞춥니다.
+- 리드타임: P4 선적 이력(MOCK_SHIPMENTS)의 접수 → 반출(완료) / ETA(운송 중) 기간에서 추출합니다.
+           계획 리드타임이 주어지면 같은 방식으로 평균을 계획값에 맞춥니다.
+- 경로 N개의 리드타임 동안 누적 수요를 배치 단위 NumPy 배열(경로 × 일)로 한 번에 계산합니다.
+
+결과:
+    stockout_probability : 지금 발주하면 입고 전에 현재고가 바닥날 확률 P(리드타임 수요 > 현재고)
+    reorder_points       : 서비스 수준별 재주문점 (리드타임 수요의 분위수)
+    risk_level           : 결품 확률이 STOCKOUT_WARNING 이상이면 'warning', 아니면 'safe' (P8 MetaAgent 입력)
+"""
+import math
+import time
+from datetime import datetime
+import numpy as np
+
+# --- 상수 정의 ---
+N_PATHS = 20000
+BATCH_SIZE = 10000
+MC_SEED = 42                       # 같은 입력이면 리런마다 같은 결과
+SERVICE_LEVELS = (0.90, 0.95, 0.99)
+TARGET_SERVICE_LEVEL = 0.95
+STOCKOUT_WARNING = 1 - TARGET_SERVICE_LEVEL
+DEMAND_HISTORY_DAYS = 90
+MIN_DEMAND_DAYS = 14               # 소모가 있었던 날이 이보다 적으면 정규분포 대체
+DEFAULT_DEMAND_CV = 0.25
+DEMAND_POOL_SIZE = 4096
+DEFAULT_LEAD_TIME = 14
+STATUS_TIME_FORMAT = "%Y-%m-%d %H:%M"
+
+
+def shipment_lead_times():
+    """P4 선적 이력에서 리드타임(일, 올림) 표본을 만듭니다. 완료 건은 마지막 상태 시각, 운송 중은 ETA까지."""
+    from mypages.p4_logistics import MOCK_SHIPMENTS
+    samples = []
+    for shipment in MOCK_SHIPMENTS.values():
+        log = shipment.get('status_log') or []
+        if not log:
+            continue
+        start = datetime.strptime(log[0][1], STATUS_TIME_FORMAT)
+        completed = shipment.get('current_status_index', 0) >= len(log) - 1
+        end = datetime.strptime(log[-1][1] if completed else shipment['eta'], STATUS_TIME_FORMAT)
+        days = (end - start).total_seconds() / 86400
+        if days > 0:
+            samples.append(math.ceil(days))
+    return samples
+
+
+def lead_time_pool(samples=None, lead_time=None):
+    """리드타임 표본 배열. lead_time(계획값)이 있으면 표본 평균을 계획값에 맞춥니다."""
+    samples = np.asarray(samples if samples is not None else [], dtype=float).ravel()
+    if samples.size == 0:
+        samples = np.asarray([lead_time or DEFAULT_LEAD_TIME], dtype=float)
+    if lead_time:
+        samples = samples * (lead_time / samples.mean())
+    return np.maximum(np.ceil(samples), 1).astype(int)
+
+
+def demand_pool(history, mean_daily=None, rng=None):
+    """일 수요 표본 배열. 이력이 충분하면 이력 그대로(수준만 mean_daily에 맞춤), 아니면 정규분포 표본."""
+    history = np.asarray(history, dtype=float)
+    active_days = int((history > 0).sum())
+    if active_days >= MIN_DEMAND_DAYS:
+        if mean_daily is not None and history.mean() > 0:
+            history = history * (mean_daily / history.mean())
+        return history, "history"
+    mean = mean_daily if mean_daily is not None else (history.mean() if len(history) else 0.0)
+    rng = rng or np.random.default_rng(MC_SEED)
+    return np.maximum(rng.normal(mean, DEFAULT_DEMAND_CV * mean, DEMAND_POOL_SIZE), 0.0), "parametric"
+
+
+def simulate_lead_time_demand(demand, lead_times, n_paths=N_PATHS, batch_size=BATCH_SIZE, rng=None):
+    """경로별 리드타임 동안의 누적 수요 (n_paths,). 배치마다 (경로 × 최대 리드타임) 수요 행렬을 한 번에 추출합니다."""
+    rng = rng or np.random.default_rng(MC_SEED)
+    totals = np.empty(n_paths)
+    for start in range(0, n_paths, batch_size):
+        size = min(batch_size, n_paths - start)
+        lead = rng.choice(lead_times, size)
+        daily = rng.choice(demand, (size, int(lead.max())))
+        cumulative = np.cumsum(daily, axis=1)
+        totals[start:start + size] = cumulative[np.arange(size), lead - 1]
+    return totals
+
+
+def assess_stockout_risk(current_stock, history, mean_daily=None, lead_time=None, lead_time_samples=None,
+                         n_paths=N_PATHS, service_levels=SERVICE_LEVELS, seed=MC_SEED):
+    """
+    현재고로 다음 입고까지 버틸 수 있는지 몬테카를로로 평가합니다.
+    history: 일별 소모량 이력 / mean_daily, lead_time: 계획값(선택) / lead_time_samples: 없으면 P4 선적 이력 사용
+    """
+    started = time.perf_counter()
+    rng = np.random.default_rng(seed)
+    if lead_time_samples is None:
+        try:
+            lead_time_samples = shipment_lead_times()
+        except Exception:
+            lead_time_samples = []
+    lead_times = lead_time_pool(lead_time_samples, lead_time)
+    demand, demand_source = demand_pool(history, mean_daily, rng)
+    lead_time_demand = simulate_lead_time_demand(demand, lead_times, n_paths, rng=rng)
+
+    probability = float((lead_time_demand > current_stock).mean())
+    reorder_points = {level: float(q) for level, q in zip(service_levels, np.quantile(lead_time_demand, service_levels))}
+    return {
+        "stockout_probability": probability,
+        "expected_shortage": float(np.maximum(lead_time_demand - current_stock, 0).mean()),
+        "reorder_points": reorder_points,
+        "service_reorder_point": float(np.quantile(lead_time_demand, TARGET_SERVICE_LEVEL)),
+        "lead_time_demand_mean": float(lead_time_demand.mean()),
+        "lead_time_mean": float(lead_times.mean()),
+        "demand_source": demand_source,
+        "n_paths": n_paths,
+        "elapsed_ms": (time.perf_counter() - started) * 1000,
+        "risk_level": "warning" if probability >= STOCKOUT_WARNING else "safe",
+    }
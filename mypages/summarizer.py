@@ -0,0 +1,235 @@
+# mypages/summarizer.py
+"""
+뉴스 링크 일괄 요약 파이프라인.
+
+- 수집: 연결 풀을 갖는 requests.Session 하나로 여러 URL을 동시에 가져옵니다.
+- 파싱: lxml이 있으면 lxml.html로 본문을 추출하고, 없으면 BeautifulSoup(html.parser)로 대체합니다.
+- 토큰 예산: tiktoken이 있으면 토큰 단위로, 없으면 문자 수(토큰당 약 4자)로 본문을 자릅니다.
+- 요약: URL별 요약 요청을 스레드 풀에서 동시에 실행합니다.
+- 캐시: 요약은 (URL, 본문 해시) 키로 저장하고, URL → 본문 해시 색인을 두어 같은 링크를
+        다시 누르면 페이지 수집 없이 바로 응답합니다. 색인이 만료된 뒤 본문이 바뀌지 않았으면 요약을 재사용합니다.
+"""
+import os
+import re
+import json
+import time
+import hashlib
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from mypages.explain_utils import CACHE_DIR
+from mypages.llm_gateway import get_gateway
+
+# --- 상수 정의 ---
+SUMMARY_CACHE_DIR = os.path.join(CACHE_DIR, 'summaries')
+SUMMARY_MODEL = "gpt-4o"
+TOKEN_BUDGET = 2000
+URL_INDEX_TTL_SECONDS = 6 * 60 * 60
+FETCH_TIMEOUT = 15
+MAX_WORKERS = 4
+REQUEST_HEADERS = {
+    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/58.0.3029.110 Safari/537.36',
+    'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,image/apng,*/*;q=0.8',
+    'Accept-Language': 'en-US,en;q=0.9,ko;q=0.8'
+}
+CONTENT_CLASS_RE = re.compile("post|article|content")
+logger = logging.getLogger(__name__)
+NO_TEXT_MESSAGE = "기사 본문을 추출할 수 없었습니다. 웹사이트의 구조가 복잡하거나 콘텐츠가 동적으로 로드될 수 있습니다."
+
+SUMMARY_PROMPT = """당신은 원자재, 특히 니켈 구매를 담당하는 전문 매니저를 위한 AI 어시스턴트입니다.
+        다음 뉴스 기사를 두 부분으로 나누어 분석해주세요.
+
+        1. **기사 요약**: 기사의 핵심 내용을 객관적으로 2~3문장으로 요약합니다.
+        2. **AI 인사이트**: 요약된 내용을 바탕으로, 이 정보가 니켈 가격(수급, 시장 심리 등)에 미칠 수 있는 영향을 분석합니다. 이 부분은 반드시 "**[AI 인사이트]**" 라는 말로 시작해야 합니다.
+
+        ---
+        [기사 본문]
+        {text}
+        ---
+
+        분석 결과:
+        """
+
+_session = None
+_encoder = None
+_lock = threading.Lock()
+
+
+# --- 수집 ---
+def get_session():
+    """연결 풀을 공유하는 requests.Session을 반환합니다."""
+    global _session
+    if _session is None:
+        import requests
+        from requests.adapters import HTTPAdapter
+        with _lock:
+            if _session is None:
+                session = requests.Session()
+                adapter = HTTPAdapter(pool_connections=MAX_WORKERS, pool_maxsize=MAX_WORKERS * 2)
+                session.mount('http://', adapter)
+                session.mount('https://', adapter)
+                session.headers.update(REQUEST_HEADERS)
+                _session = session
+    return _session
+
+
+def fetch_html(url, timeout=FETCH_TIMEOUT):
+    response = get_session().get(url, timeout=timeout)
+    response.raise_for_status()
+    return response.content
+
+
+# --- 파싱 ---
+def _extract_with_lxml(content):
+    import lxml.html
+    root = lxml.html.fromstring(content)
+    for bad in root.xpath('//script|//style|//noscript'):
+        bad.drop_tree()
+    main = root.xpath('//article') or root.xpath('//main') or [
+        el for el in root.xpath('//div[@class]') if CONTENT_CLASS_RE.search(el.get('class', ''))
+    ]
+    scope = main[0] if main else root.find('body')
+    if scope is None:
+        scope = root
+    text = ' '.join(p.text_content().strip() for p in scope.iter('p'))
+    if not text.strip():
+        body = root.find('body')
+        text = ' '.join((body if body is not None else root).text_content().split())
+    return text
+
+
+def _extract_with_bs4(content):
+    from bs4 import BeautifulSoup
+    soup = BeautifulSoup(content, 'html.parser')
+    main_content = soup.find('article') or soup.find('main') or soup.find("div", class_=CONTENT_CLASS_RE)
+    if main_content:
+        paragraphs = main_content.find_all('p')
+    else:
+        paragraphs = soup.body.find_all('p') if soup.body else []
+    text = ' '.join([p.get_text(strip=True) for p in paragraphs])
+    if not text.strip() and soup.body:
+        text = ' '.join(soup.body.get_text(separator=' ', strip=True).split())
+    return text
+
+
+def extract_text(content):
+    """HTML에서 기사 본문을 추출합니다. (lxml 우선, 없으면 html.parser) 추출할 수 없으면 빈 문자열."""
+    try:
+        from lxml import etree
+    except ImportError:
+        return _extract_with_bs4(content)
+    try:
+        return _extract_with_lxml(content)
+    except (etree.ParserError, etree.XMLSyntaxError, ValueError):
+        # 빈 응답이나 HTML이 아닌 본문(PDF 링크 등) - html.parser로 한 번 더 시도
+        try:
+            return _extract_with_bs4(content)
+        except Exception:
+            return ''
+
+
+def truncate_to_tokens(text, budget=TOKEN_BUDGET):
+    """본문을 토큰 예산 이내로 자릅니다."""
+    global _encoder
+    try:
+        if _encoder is None:
+            import tiktoken
+            _encoder = tiktoken.get_encoding("o200k_base")
+        tokens = _encoder.encode(text)
+        return text if len(tokens) <= budget else _encoder.decode(tokens[:budget])
+    except ImportError:
+        return text[:budget * 4]
+
+
+# --- 캐시 ---
+def _cache_path(name):
+    return os.path.join(SUMMARY_CACHE_DIR, f"{name}.json")
+
+
+def _read_json(name):
+    try:
+        with open(_cache_path(name), 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def _write_json(name, data):
+    os.makedirs(SUMMARY_CACHE_DIR, exist_ok=True)
+    path = _cache_path(name)
+    tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(data, f, ensure_ascii=False)
+    os.replace(tmp_path, path)
+
+
+def _url_id(url):
+    return "url_" + hashlib.sha256(url.encode('utf-8')).hexdigest()[:16]
+
+
+def _summary_id(url, content_hash):
+    return "sum_" + hashlib.sha256(f"{url}|{content_hash}".encode('utf-8')).hexdigest()[:16]
+
+
+def cached_summary(url):
+    """URL 색인이 유효하면 페이지를 다시 가져오지 않고 저장된 요약을 반환합니다."""
+    index = _read_json(_url_id(url))
+    if not index or time.time() - index.get('indexed_at', 0) >= URL_INDEX_TTL_SECONDS:
+        return None
+    entry = _read_json(_summary_id(url, index['content_hash']))
+    return entry.get('summary') if entry else None
+
+
+# --- 요약 ---
+def summarize_text(text):
+    """본문 요약 LLM 호출. 키가 없으면 안내 문구를 반환합니다."""
+    gateway = get_gateway()
+    if not gateway.configured:
+        return None
+    return gateway.chat([{"role": "user", "content": SUMMARY_PROMPT.format(text=text)}],
+                        model=SUMMARY_MODEL, site="p2.news_summary")
+
+
+def summarize_url(url):
+    """URL 하나를 가져와 요약합니다. 오류는 사용자에게 보여줄 문자열로 반환합니다."""
+    import requests
+    summary = cached_summary(url)
+    if summary:
+        return summary
+    try:
+        content = fetch_html(url)
+        text = extract_text(content)
+        if not text.strip():
+            return NO_TEXT_MESSAGE
+        text = truncate_to_tokens(text)
+        content_hash = hashlib.sha256(text.encode('utf-8')).hexdigest()[:16]
+        summary_id = _summary_id(url, content_hash)
+
+        entry = _read_json(summary_id)
+        if entry is None:
+            summary = summarize_text(text)
+            if summary is None:
+                return "OpenAI API 키가 구성되지 않았습니다. 요약 기능을 사용할 수 없습니다."
+            entry = {"url": url, "content_hash": content_hash, "summary": summary}
+            _write_json(summary_id, entry)
+        _write_json(_url_id(url), {"url": url, "content_hash": content_hash, "indexed_at": time.time()})
+        return entry['summary']
+
+    except requests.exceptions.HTTPError as e:
+        return f"URL에 접근할 수 없습니다 (HTTP 오류 {e.response.status_code}). URL을 확인해주세요."
+    except requests.exceptions.RequestException as e:
+        return f"URL에서 콘텐츠를 가져오는 중 네트워크 오류가 발생했습니다: {e}"
+    except Exception as e:
+        logger.exception("링크 요약 실패: %s", url)
+        return f"링크 요약 중 예상치 못한 오류가 발생했습니다: {e}"
+
+
+def summarize_urls(urls, max_workers=MAX_WORKERS):
+    """여러 URL을 동시에 수집·요약하여 {url: 요약} 딕셔너리를 입력 순서대로 반환합니다."""
+    urls = list(dict.fromkeys(u for u in urls if u))
+    if not urls:
+        return {}
+    with ThreadPoolExecutor(max_workers=min(max_workers, len(urls)), thread_name_prefix="summarizer") as pool:
+        summaries = list(pool.map(summarize_url, urls))
+    return dict(zip(urls, summaries))
@@ -0,0 +1,211 @@
+# mypages/sweep.py
+"""
+구매 타이밍 임계값(threshold) · 대기 기간(horizon) · 재주문 파라미터 병렬 스윕 엔진.
+
+run_p2_purchase의 가격 추세 규칙(±threshold)과 get_purchase_recommendation의 재주문점 규칙
+(ROP = 일평균 소모량 × (리드타임 + 안전재고 일수))을 결합하여 전체 이력에 대해 재고/구매를 시뮬레이션합니다.
+
+일별 시뮬레이션 규칙 (설정별로 독립, 여러 설정을 배열로 동시에 계산):
+    1) 입고 예정 물량 반영 → 일 소모량 차감 (재고 부족 시 결품일로 집계)
+    2) 재고 포지션(현재고 + 발주잔량) < ROP 이면 발주 필요
+    3) 가격 하락(down) 예측이고, 하루 더 기다려도 리드타임 동안 결품이 없으며, 대기 일수 < horizon 이면 발주 보류
+    4) 그 외에는 당일 가격으로 order_qty 만큼 발주 (리드타임 뒤 입고, 리드타임 0이면 즉시 현재고에 반영)
+기준(naive)은 같은 재고 파라미터에서 가격 신호 없이 즉시 발주하는 전략입니다.
+
+가격/예측 배열은 실행마다 cache/sweep/ 아래 임시 디렉터리에 .npy로 한 번 저장하고, 각 워커 프로세스가 mmap으로
+공유하여 읽습니다. (동시에 도는 다른 스윕의 파일을 덮어쓰지 않도록 실행별로 분리, 종료 후 삭제)
+
+사용법:
+    python -m mypages.sweep --thresholds 0.005 0.01 0.02 --horizons 3 7 14 --lead-times 7 14 --safety-days 3 7
+"""
+import argparse
+import itertools
+import os
+import shutil
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+import pandas as pd
+
+from mypages import model_bundle as mb
+from mypages.backtest import batch_predict
+from mypages.explain_utils import CACHE_DIR
+
+SWEEP_DIR = os.path.join(CACHE_DIR, 'sweep')
+
+# P1 계획 페이지의 예시 값과 동일한 기본 재고 조건
+DEFAULT_DAILY_USAGE = 350 / 7
+DEFAULT_ORDER_QTY = 500.0
+DEFAULT_INITIAL_STOCK = 1000.0
+
+
+def simulate_configs(prices, preds, thresholds, horizons, lead_times, safety_days,
+                     daily_usage, order_qty, initial_stock, use_signal):
+    """
+    여러 설정(C개)을 한 번에 시뮬레이션합니다. 모든 설정 인자는 길이 C의 배열입니다.
+    반환: dict(cost, bought, n_orders, stockout_days, deferred_days) 각 길이 C 배열
+    """
+    prices = np.asarray(prices, dtype=np.float64)
+    preds = np.asarray(preds, dtype=np.float64)
+    n_days, n_cfg = len(prices), len(thresholds)
+    lead_times = np.asarray(lead_times, dtype=np.int64)
+    if (lead_times < 0).any():
+        raise ValueError(f"리드타임은 0 이상이어야 합니다: {sorted(set(lead_times[lead_times < 0].tolist()))}")
+    usage = np.asarray(daily_usage, dtype=np.float64)
+    qty = np.asarray(order_qty, dtype=np.float64)
+    rop = usage * (lead_times + np.asarray(safety_days, dtype=np.float64))
+    lower = 1 - np.asarray(thresholds, dtype=np.float64)
+    horizons = np.asarray(horizons, dtype=np.int64)
+    use_signal = np.asarray(use_signal, dtype=bool)
+
+    on_hand = np.asarray(initial_stock, dtype=np.float64).copy()
+    on_order = np.zeros(n_cfg)
+    pipeline = np.zeros((n_cfg, n_days + int(lead_times.max()) + 1))
+    waited = np.zeros(n_cfg, dtype=np.int64)
+    cost = np.zeros(n_cfg); bought = np.zeros(n_cfg)
+    n_orders = np.zeros(n_cfg, dtype=np.int64); stockout_days = np.zeros(n_cfg, dtype=np.int64)
+    deferred_days = np.zeros(n_cfg, dtype=np.int64)
+    cfg_idx = np.arange(n_cfg)
+
+    for t in range(n_days):
+        arrivals = pipeline[:, t]
+        on_hand += arrivals
+        on_order -= arrivals
+
+        on_hand -= usage
+        stockout_days += on_hand < 0
+        np.maximum(on_hand, 0, out=on_hand)
+
+        position = on_hand + on_order
+        need = position < rop
+        down = preds[t] < prices[t] * lower
+        can_wait = (waited < horizons) & (position - usage * (lead_times + 1) > 0)
+        defer = need & use_signal & down & can_wait
+        order = need & ~defer
+
+        waited = np.where(defer, waited + 1, 0)
+        deferred_days += defer
+        if order.any():
+            idx = cfg_idx[order]
+            cost[idx] += qty[idx] * prices[t]
+            bought[idx] += qty[idx]
+            n_orders[idx] += 1
+            # 리드타임 0: 오늘 입고분은 이미 반영했으므로 바로 현재고에 더함
+            now = idx[lead_times[idx] == 0]
+            on_hand[now] += qty[now]
+            later = idx[lead_times[idx] > 0]
+            on_order[later] += qty[later]
+            pipeline[later, t + lead_times[later]] += qty[later]
+
+    return {"cost": cost, "bought": bought, "n_orders": n_orders,
+            "stockout_days": stockout_days, "deferred_days": deferred_days}
+
+
+def _sweep_worker(shared_dir, configs):
+    """워커 프로세스: 공유 mmap 배열을 열어 설정 묶음(dict of arrays)을 시뮬레이션합니다."""
+    prices = np.load(os.path.join(shared_dir, 'prices.npy'), mmap_mode='r')
+    preds = np.load(os.path.join(shared_dir, 'preds.npy'), mmap_mode='r')
+    return simulate_configs(prices, preds, **configs)
+
+
+def prepare_shared_arrays(bundle=None, shared_dir=None):
+    """가격과 배치 예측 결과를 워커들이 공유할 .npy 파일로 저장합니다. shared_dir이 없으면 실행별 임시 디렉터리를 만듭니다."""
+    bundle = bundle or mb.load_bundle()
+    if shared_dir is None:
+        os.makedirs(SWEEP_DIR, exist_ok=True)
+        shared_dir = tempfile.mkdtemp(prefix='run-', dir=SWEEP_DIR)
+    else:
+        os.makedirs(shared_dir, exist_ok=True)
+    np.save(os.path.join(shared_dir, 'prices.npy'), np.asarray(bundle.column('Ni_price'), dtype=np.float64))
+    np.save(os.path.join(shared_dir, 'preds.npy'), batch_predict(bundle).astype(np.float64))
+    return shared_dir
+
+
+def build_grid(thresholds, horizons, lead_times, safety_days,
+               daily_usage=DEFAULT_DAILY_USAGE, order_qty=DEFAULT_ORDER_QTY, initial_stock=DEFAULT_INITIAL_STOCK):
+    """파라미터 조합 DataFrame을 만듭니다. 재고 파라미터별 naive 기준 설정(use_signal=False)이 함께 포함됩니다."""
+    rows = [
+        {"threshold": thr, "horizon": h, "lead_time": lt, "safety_days": sd, "use_signal": True}
+        for thr, h, lt, sd in itertools.product(thresholds, horizons, lead_times, safety_days)
+    ]
+    rows += [
+        {"threshold": 0.0, "horizon": 0, "lead_time": lt, "safety_days": sd, "use_signal": False}
+        for lt, sd in itertools.product(lead_times, safety_days)
+    ]
+    grid = pd.DataFrame(rows)
+    grid["daily_usage"] = float(daily_usage)
+    grid["order_qty"] = float(order_qty)
+    grid["initial_stock"] = float(initial_stock)
+    return grid
+
+
+def run_sweep(thresholds=(0.005, 0.01, 0.02), horizons=(3, 7, 14), lead_times=(7, 14), safety_days=(3, 7),
+              daily_usage=DEFAULT_DAILY_USAGE, order_qty=DEFAULT_ORDER_QTY, initial_stock=DEFAULT_INITIAL_STOCK,
+              max_workers=None, chunk_size=None, bundle=None):
+    """
+    전체 그리드를 프로세스 풀로 병렬 평가합니다.
+    결과 DataFrame에는 naive 대비 평균 구매단가 절감률(savings_pct)이 포함되며,
+    attrs['runtime_sec']에 실행 시간이 기록됩니다.
+    """
+    t0 = time.perf_counter()
+    if min(lead_times) < 0:
+        raise ValueError(f"리드타임은 0 이상이어야 합니다: {list(lead_times)}")
+    grid = build_grid(thresholds, horizons, lead_times, safety_days, daily_usage, order_qty, initial_stock)
+
+    max_workers = max_workers or os.cpu_count() or 1
+    chunk_size = chunk_size or max(1, -(-len(grid) // max_workers))
+    arg_cols = {"threshold": "thresholds", "horizon": "horizons", "lead_time": "lead_times", "safety_days": "safety_days",
+                "daily_usage": "daily_usage", "order_qty": "order_qty", "initial_stock": "initial_stock", "use_signal": "use_signal"}
+    chunks = [grid.iloc[i:i + chunk_size] for i in range(0, len(grid), chunk_size)]
+    payloads = [{arg: chunk[col].to_numpy() for col, arg in arg_cols.items()} for chunk in chunks]
+
+    shared_dir = prepare_shared_arrays(bundle)
+    try:
+        if max_workers == 1 or len(chunks) == 1:
+            outputs = [_sweep_worker(shared_dir, p) for p in payloads]
+        else:
+            with ProcessPoolExecutor(max_workers=max_workers) as pool:
+                outputs = list(pool.map(_sweep_worker, [shared_dir] * len(payloads), payloads))
+    finally:
+        shutil.rmtree(shared_dir, ignore_errors=True)
+
+    for key in outputs[0]:
+        grid[key] = np.concatenate([o[key] for o in outputs])
+    grid["avg_unit_price"] = np.where(grid["bought"] > 0, grid["cost"] / grid["bought"].where(grid["bought"] > 0, 1), np.nan)
+
+    baseline = grid[~grid["use_signal"]].set_index(["lead_time", "safety_days"])["avg_unit_price"]
+    result = grid[grid["use_signal"]].copy()
+    naive_price = baseline.reindex(pd.MultiIndex.from_frame(result[["lead_time", "safety_days"]])).to_numpy()
+    result["naive_avg_unit_price"] = naive_price
+    result["savings_pct"] = (naive_price - result["avg_unit_price"]) / naive_price * 100
+    result = result.drop(columns=["use_signal"]).sort_values("savings_pct", ascending=False).reset_index(drop=True)
+    result.attrs['runtime_sec'] = time.perf_counter() - t0
+    result.attrs['workers'] = max_workers
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="구매 타이밍 / 재주문 파라미터 병렬 스윕")
+    parser.add_argument('--thresholds', type=float, nargs='+', default=[0.005, 0.01, 0.02])
+    parser.add_argument('--horizons', type=int, nargs='+', default=[3, 7, 14])
+    parser.add_argument('--lead-times', type=int, nargs='+', default=[7, 14])
+    parser.add_argument('--safety-days', type=int, nargs='+', default=[3, 7])
+    parser.add_argument('--daily-usage', type=float, default=DEFAULT_DAILY_USAGE)
+    parser.add_argument('--order-qty', type=float, default=DEFAULT_ORDER_QTY)
+    parser.add_argument('--initial-stock', type=float, default=DEFAULT_INITIAL_STOCK)
+    parser.add_argument('--workers', type=int)
+    parser.add_argument('--top', type=int, default=20)
+    args = parser.parse_args()
+
+    result = run_sweep(args.thresholds, args.horizons, args.lead_times, args.safety_days,
+                       args.daily_usage, args.order_qty, args.initial_stock, max_workers=args.workers)
+    cols = ["threshold", "horizon", "lead_time", "safety_days", "n_orders", "deferred_days",
+            "stockout_days", "avg_unit_price", "naive_avg_unit_price", "savings_pct"]
+    with pd.option_context('display.width', 200):
+        print(result[cols].head(args.top).to_string(index=False, float_format=lambda v: f"{v:,.4f}"))
+    print(f"\n{len(result)}개 설정, 워커 {result.attrs['workers']}개, 실행 시간 {result.attrs['runtime_sec']:.2f}초")
+
+
+if __name__ == '__main__':
+    main()
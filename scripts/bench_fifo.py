@@ -0,0 +1,95 @@
+# scripts/bench_fifo.py
+"""
+FIFO Lot 차감 벤치마크: 기존 iterrows 루프 vs 누적합 + searchsorted 할당(allocate_fifo).
+
+사용법:
+    python scripts/bench_fifo.py [--lots 50000] [--repeat 20]
+
+- iterrows : 예전 process_production_input 방식 (정렬된 열린 Lot을 한 행씩 돌며 df.loc 차감)
+- vectorized: allocate_fifo로 차감량 계산 후 한 번의 배열 연산으로 반영
+- store     : 임시 SQLite 원장에 Lot을 채운 뒤 InventoryStore.post_production 한 건 (트랜잭션 포함)
+"""
+import argparse
+import os
+import sys
+import time
+import tempfile
+import timeit
+import numpy as np
+import pandas as pd
+
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir))
+sys.path.insert(0, PROJECT_ROOT)
+
+from gayoung.inventory_store import InventoryStore, allocate_fifo, KIND_INBOUND  # noqa: E402
+
+
+def make_lots(n, seed=0):
+    rng = np.random.default_rng(seed)
+    dates = pd.Timestamp('2020-01-01') + pd.to_timedelta(np.sort(rng.integers(0, 3650, n)), unit='D')
+    return pd.DataFrame({
+        '날짜': dates.strftime('%Y-%m-%d'), '구분': KIND_INBOUND, 'Lot_No': [f"LOT-{i:06d}" for i in range(n)],
+        '잔여수량': rng.integers(50, 500, n).astype(float),
+    })
+
+
+def consume_iterrows(df, qty_to_use):
+    df = df.copy()
+    available_stock = df[(df['구분'] == KIND_INBOUND) & (df['잔여수량'] > 0)].sort_values(by='날짜', ascending=True)
+    qty_needed = qty_to_use
+    for index, lot in available_stock.iterrows():
+        if qty_needed <= 0: break
+        amount_to_take = min(lot['잔여수량'], qty_needed)
+        df.loc[index, '잔여수량'] -= amount_to_take
+        qty_needed -= amount_to_take
+    return df
+
+
+def consume_vectorized(df, qty_to_use):
+    df = df.copy()
+    open_lots = df[(df['구분'] == KIND_INBOUND) & (df['잔여수량'] > 0)].sort_values(by='날짜', kind='stable')
+    open_idx = open_lots.index
+    remaining = open_lots['잔여수량'].to_numpy()
+    takes = allocate_fifo(remaining, qty_to_use)
+    df.loc[open_idx[:len(takes)], '잔여수량'] = remaining[:len(takes)] - takes
+    return df
+
+
+def bench(label, fn, repeat):
+    best = min(timeit.repeat(fn, number=repeat, repeat=3)) / repeat
+    print(f"{label:<22} {best * 1e3:>10.3f} ms")
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description="FIFO Lot 차감 벤치마크")
+    parser.add_argument('--lots', type=int, default=50000)
+    parser.add_argument('--repeat', type=int, default=20)
+    args = parser.parse_args()
+
+    df = make_lots(args.lots)
+    qty = float(df['잔여수량'].sum()) * 0.5  # 절반 정도의 Lot을 소진하는 큰 투입
+    print(f"lots={args.lots:,}  qty={qty:,.0f}kg")
+
+    expected = consume_iterrows(df, qty)['잔여수량'].to_numpy()
+    actual = consume_vectorized(df, qty)['잔여수량'].to_numpy()
+    assert np.allclose(expected, actual), "vectorized 결과가 iterrows 결과와 다릅니다."
+
+    slow = bench("iterrows", lambda: consume_iterrows(df, qty), max(1, args.repeat // 10))
+    fast = bench("vectorized", lambda: consume_vectorized(df, qty), args.repeat)
+    print(f"speedup                {slow / fast:>10.1f}x")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        store = InventoryStore(os.path.join(tmp, 'bench.sqlite3'))
+        with store.transaction() as conn:
+            conn.executemany(
+                "INSERT INTO ledger (date, kind, item, qty, memo, lot_no, remaining) VALUES (?, ?, '니켈', ?, 'bench', ?, ?)",
+                [(d, KIND_INBOUND, r, lot, r) for d, lot, r in zip(df['날짜'], df['Lot_No'], df['잔여수량'])])
+            store._rebuild_balance(conn)
+        started = time.perf_counter()
+        used = store.post_production('2030-01-01', '니켈', qty)
+        print(f"{'store':<22} {(time.perf_counter() - started) * 1e3:>10.3f} ms  ({len(used):,} lots used)")
+
+
+if __name__ == '__main__':
+    main()
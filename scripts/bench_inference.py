@@ -0,0 +1,78 @@
+# scripts/bench_inference.py
+"""
+기존 추론 경로(scaler.transform → model.predict)와 결합 추론 경로(mypages.inference)를 비교하는 마이크로 벤치마크.
+
+사용법:
+    python scripts/bench_inference.py [--repeat 2000]
+
+- single: 1행 예측 (predict_price 호출 1회에 해당)
+- batch : 전체 이력 행렬 예측 (백테스트 / SHAP 배치에 해당)
+"""
+import argparse
+import os
+import sys
+import timeit
+import numpy as np
+import joblib
+
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir))
+sys.path.insert(0, PROJECT_ROOT)
+
+from mypages import model_bundle as mb  # noqa: E402
+from mypages.inference import FusedPredictor, NUMBA_AVAILABLE  # noqa: E402
+
+
+class _NonLinearView:
+    """선형 모델을 '비선형'처럼 취급하여 numba 표준화 커널 경로를 측정하기 위한 래퍼."""
+    def __init__(self, model):
+        self._model = model
+        self.n_features_in_ = model.n_features_in_
+
+    def predict(self, X):
+        return self._model.predict(X)
+
+
+def bench(label, fn, repeat):
+    fn()  # warm-up (numba JIT 포함)
+    best = min(timeit.repeat(fn, number=repeat, repeat=3)) / repeat
+    print(f"{label:<34} {best * 1e6:>12.2f} us")
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description="결합 추론 경로 마이크로 벤치마크")
+    parser.add_argument('--repeat', type=int, default=2000)
+    args = parser.parse_args()
+
+    bundle = mb.load_bundle()
+    sk_scaler = joblib.load(mb.SCALER_PATH)
+    model = bundle.model
+    X32 = np.ascontiguousarray(bundle.features)
+    X64 = X32.astype(np.float64)
+    row32 = X32[-1]
+
+    fused = FusedPredictor(model, bundle.scaler)
+    kernel = FusedPredictor(_NonLinearView(model), bundle.scaler)
+
+    # 정확도 확인
+    legacy_pred = model.predict(sk_scaler.transform(X64))
+    print(f"max |legacy - fused|  = {np.abs(legacy_pred - fused.predict(X32)).max():.6f}")
+    print(f"max |legacy - kernel| = {np.abs(legacy_pred - kernel.predict(X32)).max():.6f}")
+    print(f"numba available: {NUMBA_AVAILABLE}, rows: {len(X32)}, features: {X32.shape[1]}\n")
+
+    print("[single row]")
+    t_legacy = bench("legacy scaler.transform+predict", lambda: model.predict(sk_scaler.transform(row32.reshape(1, -1)))[0], args.repeat)
+    t_fused = bench("fused linear", lambda: fused.predict_one(row32), args.repeat)
+    bench("standardize kernel + predict", lambda: kernel.predict_one(row32), args.repeat)
+    print(f"-> x{t_legacy / t_fused:.1f}\n")
+
+    print("[batch: full history]")
+    n = max(1, args.repeat // 100)
+    t_legacy = bench("legacy scaler.transform+predict", lambda: model.predict(sk_scaler.transform(X64)), n)
+    t_fused = bench("fused linear (float32 input)", lambda: fused.predict(X32), n)
+    bench("standardize kernel + predict", lambda: kernel.predict(X32), n)
+    print(f"-> x{t_legacy / t_fused:.1f}")
+
+
+if __name__ == '__main__':
+    main()
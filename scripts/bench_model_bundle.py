@@ -0,0 +1,83 @@
+# scripts/bench_model_bundle.py
+"""
+기존 pickle 4개 로딩 방식과 모델 번들(mmap) 로딩 방식의 로딩 시간 / 메모리(RSS)를 비교합니다.
+
+사용법:
+    python scripts/bench_model_bundle.py [--repeat 5]
+
+각 방식은 별도 프로세스에서 측정하므로 서로의 캐시나 메모리에 영향을 주지 않습니다.
+"""
+import argparse
+import os
+import subprocess
+import sys
+import json
+
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir))
+
+_WORKER = r'''
+import json, os, sys, time
+sys.path.insert(0, {root!r})
+
+def rss_kb():
+    with open('/proc/self/status') as f:
+        for line in f:
+            if line.startswith('VmRSS:'):
+                return int(line.split()[1])
+    import resource
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+import numpy, pandas, joblib, sklearn.linear_model  # 라이브러리 import 비용은 측정에서 제외
+from mypages import model_bundle as mb
+base = rss_kb()
+t0 = time.perf_counter()
+if {mode!r} == 'legacy':
+    df = pandas.read_pickle(mb.DF_MODEL_PATH)
+    feature_cols = joblib.load(mb.FEATURE_COLS_PATH)
+    model = joblib.load(mb.MODEL_PATH)
+    scaler = joblib.load(mb.SCALER_PATH)
+    df = mb._prepare_frame(df, feature_cols)
+    row = df.iloc[-1][feature_cols].to_numpy()
+else:
+    bundle = mb.load_bundle()
+    row = bundle.features[-1]
+elapsed = time.perf_counter() - t0
+print(json.dumps({{'seconds': elapsed, 'rss_delta_kb': rss_kb() - base}}))
+'''
+
+
+def run_once(mode):
+    code = _WORKER.format(root=PROJECT_ROOT, mode=mode)
+    out = subprocess.run([sys.executable, '-c', code], cwd=PROJECT_ROOT, capture_output=True, text=True, check=True)
+    return json.loads(out.stdout.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description="모델 번들 로딩 벤치마크")
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    sys.path.insert(0, PROJECT_ROOT)
+    from mypages import model_bundle as mb
+    if mb.is_bundle_stale():
+        mb.build_bundle()
+
+    results = {}
+    for mode in ('legacy', 'bundle'):
+        runs = [run_once(mode) for _ in range(args.repeat)]
+        results[mode] = {
+            'seconds': min(r['seconds'] for r in runs),
+            'rss_delta_kb': min(r['rss_delta_kb'] for r in runs),
+        }
+
+    legacy, bundle = results['legacy'], results['bundle']
+    print(f"{'mode':<8} {'load(ms)':>10} {'RSS +MB':>9}")
+    for mode, r in results.items():
+        print(f"{mode:<8} {r['seconds'] * 1000:>10.1f} {r['rss_delta_kb'] / 1024:>9.2f}")
+    if bundle['seconds'] > 0:
+        print(f"\n속도 향상: x{legacy['seconds'] / bundle['seconds']:.1f}, "
+              f"RSS 절감: {(legacy['rss_delta_kb'] - bundle['rss_delta_kb']) / 1024:.2f} MB")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,114 @@
+# scripts/importtime_report.py
+"""
+페이지 모듈별 cold-start import 시간을 측정합니다. (`python -X importtime` 기반)
+
+사용법:
+    python scripts/importtime_report.py                 # 전체 페이지 모듈 측정
+    python scripts/importtime_report.py mypages.p2_purchase --top 20
+    python scripts/importtime_report.py --json report.json
+
+각 모듈을 새 인터프리터에서 import 하므로 캐시 영향 없이 Streamlit 서버의 최초 로딩 시간을 추적할 수 있습니다.
+app_shell 항목은 app.py 자체를 runpy로 실행하여 사이드바 메뉴 선택 직전까지(모듈 수준 import와 설정)를 측정합니다.
+(st.set_page_config / 사이드바 호출은 스텁으로 대체하고, 선택된 페이지 모듈은 로드하지 않음)
+"""
+import argparse
+import json
+import os
+import re
+import subprocess
+import sys
+
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir))
+
+DEFAULT_MODULES = [
+    "app_shell",  # app.py 모듈 수준 코드 (페이지 로드 전까지)
+    "mypages.p1_plan",
+    "mypages.p2_purchase",
+    "mypages.p3_customs",
+    "mypages.p4_logistics",
+    "mypages.p5_quality",
+    "mypages.p6_finance",
+    "mypages.p7_inventory",
+    "mypages.p8_agent",
+]
+
+# app.py를 사이드바 메뉴(st.sidebar.radio) 호출 직전까지 실행하는 스크립트
+APP_SHELL_STMT = """
+import runpy
+import streamlit as st
+
+class _StopAtMenu(Exception):
+    pass
+
+def _stop(*args, **kwargs):
+    raise _StopAtMenu
+
+st.set_page_config = lambda *args, **kwargs: None
+st.sidebar.title = lambda *args, **kwargs: None
+st.sidebar.radio = _stop
+try:
+    runpy.run_path("app.py", run_name="__main__")
+except _StopAtMenu:
+    pass
+"""
+
+LINE_RE = re.compile(r"^import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s*)(\S+)")
+
+
+def profile_module(module_name, python=sys.executable):
+    """모듈 하나를 새 프로세스에서 import 하고 (self_us, cumulative_us, depth, name) 목록을 반환합니다."""
+    stmt = APP_SHELL_STMT if module_name == "app_shell" else f"import {module_name}"
+    proc = subprocess.run(
+        [python, "-X", "importtime", "-c", stmt],
+        cwd=PROJECT_ROOT, capture_output=True, text=True,
+        env={**os.environ, "PYTHONPATH": PROJECT_ROOT},
+    )
+    records = []
+    for line in proc.stderr.splitlines():
+        m = LINE_RE.match(line)
+        if m:
+            records.append((int(m.group(1)), int(m.group(2)), len(m.group(3)) // 2, m.group(4)))
+    return records, proc.returncode, proc.stderr if proc.returncode else ""
+
+
+def summarize(module_name, records, top):
+    total_us = sum(r[0] for r in records)
+    top_level = sorted((r for r in records if r[2] == 0), key=lambda r: r[1], reverse=True)[:top]
+    return {
+        "module": module_name,
+        "total_ms": round(total_us / 1000, 1),
+        "modules_loaded": len(records),
+        "heaviest": [{"name": r[3], "cumulative_ms": round(r[1] / 1000, 1)} for r in top_level],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="페이지 모듈별 import 시간 리포트")
+    parser.add_argument("modules", nargs="*", default=DEFAULT_MODULES)
+    parser.add_argument("--top", type=int, default=10, help="모듈별로 표시할 상위 import 개수")
+    parser.add_argument("--json", dest="json_path", help="결과를 JSON 파일로 저장")
+    args = parser.parse_args()
+
+    report = []
+    for module_name in args.modules:
+        records, code, err = profile_module(module_name)
+        summary = summarize(module_name, records, args.top)
+        summary["ok"] = code == 0
+        if code:
+            summary["error"] = err.strip().splitlines()[-1] if err.strip() else f"exit {code}"
+        report.append(summary)
+
+    print(f"{'module':<24} {'total(ms)':>10} {'#mods':>7}  heaviest top-level imports")
+    print("-" * 90)
+    for s in report:
+        heavy = ", ".join(f"{h['name']}({h['cumulative_ms']:.0f})" for h in s["heaviest"][:5])
+        status = "" if s["ok"] else f"  [ERROR: {s.get('error')}]"
+        print(f"{s['module']:<24} {s['total_ms']:>10.1f} {s['modules_loaded']:>7}  {heavy}{status}")
+
+    if args.json_path:
+        with open(args.json_path, "w", encoding="utf-8") as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,115 @@
+# scripts/news_fixture_server.py
+"""
+Custom Search JSON API를 흉내 내는 로컬 fixture 서버. (네트워크 없이 뉴스 조회 계층 확인용)
+
+사용법:
+    python scripts/news_fixture_server.py --port 8765 [--delay 0.5] [--fixture items.json]
+    GOOGLE_CSE_ENDPOINT=http://127.0.0.1:8765/customsearch/v1 GOOGLE_API_KEY=x GOOGLE_CSE_ID=x streamlit run app.py
+
+    python scripts/news_fixture_server.py --selfcheck   # 캐시/요청 병합/프리페치 동작 점검
+
+--delay로 응답 지연을 주면 동일 요청 병합(coalescing) 효과를 확인할 수 있습니다.
+요청 수는 GET /stats 로 확인합니다.
+"""
+import argparse
+import json
+import os
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse, parse_qs
+
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir))
+sys.path.insert(0, PROJECT_ROOT)
+
+DEFAULT_ITEMS = [
+    {"title": "LME 니켈 가격, 인도네시아 공급 확대에 하락", "link": "https://example.com/news/1", "snippet": "원자재 시장에서 니켈 가격이 약세를 보였다."},
+    {"title": "중국 PMI 반등… 비철금속 수요 기대", "link": "https://example.com/news/2", "snippet": "제조업 PMI 개선으로 비철금속 전반이 상승했다."},
+    {"title": "달러 인덱스 강세에 원자재 전반 약세", "link": "https://example.com/news/3", "snippet": "달러 인덱스 상승이 니켈 가격에 부담으로 작용했다."},
+]
+
+
+def make_server(port=0, items=None, delay=0.0):
+    """fixture 서버를 생성합니다. server.request_log에 받은 검색 파라미터가 기록됩니다."""
+    items = items or DEFAULT_ITEMS
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            parsed = urlparse(self.path)
+            if parsed.path == '/stats':
+                body = {"requests": len(self.server.request_log)}
+            else:
+                params = {k: v[0] for k, v in parse_qs(parsed.query).items()}
+                self.server.request_log.append(params)
+                if delay: time.sleep(delay)
+                num = int(params.get('num', len(items)))
+                body = {"items": items[:num]}
+            payload = json.dumps(body, ensure_ascii=False).encode('utf-8')
+            self.send_response(200)
+            self.send_header('Content-Type', 'application/json; charset=utf-8')
+            self.send_header('Content-Length', str(len(payload)))
+            self.end_headers()
+            self.wfile.write(payload)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(('127.0.0.1', port), Handler)
+    server.request_log = []
+    return server
+
+
+def selfcheck():
+    from mypages.news_utils import NewsClient, news_window
+
+    server = make_server(delay=0.3)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    endpoint = f"http://127.0.0.1:{server.server_address[1]}/customsearch/v1"
+    with tempfile.TemporaryDirectory() as cache_dir:
+        client = NewsClient("test-key", "test-cx", endpoint=endpoint, cache_dir=cache_dir)
+        start, end = news_window("2024-01-15")
+
+        with ThreadPoolExecutor(max_workers=8) as pool:
+            results = list(pool.map(lambda _: client.search("니켈 (LME)", start, end), range(8)))
+        assert all(r == results[0] for r in results) and len(results[0]) == 3, results
+        assert len(server.request_log) == 1, f"coalescing failed: {len(server.request_log)} requests"
+        print(f"[ok] 동시 요청 8건 → 서버 요청 {len(server.request_log)}건 (병합 {client.stats['coalesced']}건)")
+
+        client.search("니켈 (LME)", start, end)
+        assert len(server.request_log) == 1 and client.stats['disk_hits'] == 1
+        print("[ok] 동일 (검색어, 구간) 재조회는 디스크 캐시에서 응답")
+
+        future = client.prefetch_latest("니켈 (PMI)", "2024-01-15")
+        future.result(timeout=5)
+        assert client.prefetch_latest("니켈 (PMI)", "2024-01-15") is None
+        client.search("니켈 (PMI)", start, end)
+        assert len(server.request_log) == 2
+        print("[ok] 최신 구간 프리페치 후 검색은 캐시 적중")
+    server.shutdown()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Custom Search JSON API 로컬 fixture 서버")
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--delay', type=float, default=0.0)
+    parser.add_argument('--fixture', help="items 리스트가 담긴 JSON 파일")
+    parser.add_argument('--selfcheck', action='store_true')
+    args = parser.parse_args()
+
+    if args.selfcheck:
+        selfcheck()
+        return
+    items = None
+    if args.fixture:
+        with open(args.fixture, 'r', encoding='utf-8') as f:
+            items = json.load(f)
+    server = make_server(args.port, items, args.delay)
+    print(f"fixture 서버 실행 중: http://127.0.0.1:{args.port}/customsearch/v1")
+    server.serve_forever()
+
+
+if __name__ == '__main__':
+    main()
@@ -3,6 +3,12 @@ from typing import Any, Dict, List
 
 from openai import OpenAI
 
+try:
+    # 메인 앱에서 실행될 때는 공유 LLM 게이트웨이(연결 풀/재시도/캐시)를 사용
+    from mypages.llm_gateway import get_gateway
+except ImportError:  # 관세율2 단독 실행
+    get_gateway = None
+
 from .hybrid_search import HybridSearcher
 from .agent_tools import CustomsTools
 
@@ -28,7 +34,16 @@ class AdvancedRAG:
 
         self.searcher = HybridSearcher(df, chroma_collection)
         self.tools = CustomsTools(df)
-        self.client = OpenAI()
+        self.gateway = get_gateway() if get_gateway else None
+        self.client = None if self.gateway and self.gateway.configured else OpenAI()
+
+    def _chat(self, site: str, cache: bool = False, validate=None, **kwargs) -> str:
+        """게이트웨이가 있으면 게이트웨이로, 없으면 자체 클라이언트로 chat completion을 호출한다.
+        validate: 응답 검증 함수 - 통과한 응답만 게이트웨이 캐시에 저장된다."""
+        if self.client is None:
+            return self.gateway.chat(site=site, cache=cache, validate=validate, **kwargs)
+        res = self.client.chat.completions.create(**kwargs)
+        return res.choices[0].message.content
 
     # ============================================================
     # 0) 행동 정규화 헬퍼
@@ -115,7 +130,10 @@ class AdvancedRAG:
         }
 
         try:
-            res = self.client.chat.completions.create(
+            content = self._chat(
+                "p3.router",
+                cache=True,
+                validate=json.loads,
                 model="gpt-4o-mini",
                 messages=[
                     {"role": "system", "content": system_prompt},
@@ -126,7 +144,7 @@ class AdvancedRAG:
                     "json_schema": {"name": "router", "schema": schema},
                 },
             )
-            parsed = json.loads(res.choices[0].message.content)
+            parsed = json.loads(content)
         except Exception:
             parsed = {"행동": "SEARCH", "국가": "", "품목": "", "율": None, "금액": None}
 
@@ -259,7 +277,9 @@ class AdvancedRAG:
 
         context = "\n".join(context_lines)
 
-        final = self.client.chat.completions.create(
+        answer = self._chat(
+            "p3.rag_answer",
+            cache=True,
             model="gpt-4o-mini",
             messages=[
                 {
@@ -276,7 +296,7 @@ class AdvancedRAG:
         )
 
         return {
-            "answer": final.choices[0].message.content,
+            "answer": answer,
             "sources": source_info,
         }
 
@@ -284,9 +304,15 @@ class AdvancedRAG:
     # 4) 엔트리 포인트 (Streamlit에서 호출)
     # ============================================================
 
-    def generate_answer(self, question: str) -> Dict[str, Any]:
+    def generate_answer(self, question: str, cancelled=None) -> Dict[str, Any]:
+        """
+        cancelled: 호출부의 취소 여부 함수 (예: p8 제한 시간 초과).
+        Router 호출 뒤 True이면 답변 생성 LLM 호출을 하지 않고 바로 반환한다.
+        """
         analysis = self.analyze_query(question)
         mode = analysis.get("mode", "SEARCH")
+        if cancelled is not None and cancelled():
+            return {"answer": "요청이 취소되었습니다.", "sources": [], "analysis": analysis, "cancelled": True}
 
         # 1) 계산 모드
         if mode in ("TOOL_CALCULATE", "CALCULATE", "계산"):